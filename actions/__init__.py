@@ -5,53 +5,56 @@ File:
 
 About:
     Initializing the "actions" module.
+    The actions are imported on first use.
 """
 
-from .actions import (
-    Error,
-    RejectAccess,
-    CloseMenu,
-    SetMark,
-    UpdatePeerData,
-    DropMark,
-    SetPermission,
-    DropPermission,
-    GameCoinflip,
-    GameRoll,
-    SystemsSettings,
-    FiltersSettings,
-    ChangeDelay,
-    SystemsPunishment,
-    FiltersPunishment,
-    ChangePunishment,
+from .base import AsyncBaseAction, SyncActionAdapter
+from .coalesce import Coalescer, Step, click_coalescer
+from .registry import ActionList, Registry, build_registry
+
+
+action_list = ActionList(
+    "actions.actions",
+    {
+        # system ------------------------------------
+        "error": "Error",
+        "reject_access": "RejectAccess",
+        "close_menu": "CloseMenu",
+        # mark --------------------------------------
+        "set_mark": "SetMark",
+        "update_peer_data": "UpdatePeerData",
+        "drop_mark": "DropMark",
+        # permission --------------------------------
+        "set_permission": "SetPermission",
+        "drop_permission": "DropPermission",
+        # Game  -------------------------------------
+        "game_coinflip": "GameCoinflip",
+        "game_roll": "GameRoll",
+        # Settings ----------------------------------
+        "systems_settings": "SystemsSettings",
+        "filters_settings": "FiltersSettings",
+        # Delay\Expire ------------------------------
+        "change_delay": "ChangeDelay",
+        # Punishment --------------------------------
+        "systems_punishment": "SystemsPunishment",
+        "filters_punishment": "FiltersPunishment",
+        "change_punishment": "ChangePunishment",
+    },
 )
 
+# Actions merging rapid +/- clicks, see COALESCE_WINDOW.
+coalesced_actions = frozenset({"change_delay", "change_punishment"})
 
-action_list = {
-    # system ------------------------------------
-    Error.NAME: Error,
-    RejectAccess.NAME: RejectAccess,
-    CloseMenu.NAME: CloseMenu,
-    # mark --------------------------------------
-    SetMark.NAME: SetMark,
-    UpdatePeerData.NAME: UpdatePeerData,
-    DropMark.NAME: DropMark,
-    # permission --------------------------------
-    SetPermission.NAME: SetPermission,
-    DropPermission.NAME: DropPermission,
-    # Game  -------------------------------------
-    GameCoinflip.NAME: GameCoinflip,
-    GameRoll.NAME: GameRoll,
-    # Settings ----------------------------------
-    SystemsSettings.NAME: SystemsSettings,
-    FiltersSettings.NAME: FiltersSettings,
-    # Delay\Expire ------------------------------
-    ChangeDelay.NAME: ChangeDelay,
-    # Punishment --------------------------------
-    SystemsPunishment.NAME: SystemsPunishment,
-    FiltersPunishment.NAME: FiltersPunishment,
-    ChangePunishment.NAME: ChangePunishment,
-}
-
-
-__all__ = ("action_list",)
+
+__all__ = (
+    "action_list",
+    "coalesced_actions",
+    "click_coalescer",
+    "build_registry",
+    "ActionList",
+    "Registry",
+    "AsyncBaseAction",
+    "SyncActionAdapter",
+    "Coalescer",
+    "Step",
+)
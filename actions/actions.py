@@ -7,7 +7,10 @@ About:
     File describing possible button response actions.
 """
 
+import asyncio
 import random
+from typing import Optional, Tuple
+from loguru import logger
 from funcka_bots.events import BaseEvent
 from funcka_bots.keyboards import Keyboard, ButtonColor, Callback
 from toaster.enums import (
@@ -16,7 +19,7 @@ from toaster.enums import (
     SettingStatus,
     PeerMark,
 )
-from toaster.scripts import (
+from db import (
     get_peer_mark,
     set_peer_mark,
     drop_peer_mark,
@@ -27,17 +30,39 @@ from toaster.scripts import (
     get_destinated_settings_status,
     update_setting_status,
     get_setting_points,
-    update_setting_points,
+    increment_setting_points,
     get_setting_delay,
-    update_setting_delay,
+    increment_setting_delay,
     close_menu_session,
+    aio,
+)
+from cache import MISSING
+from .base import BaseAction, AsyncBaseAction
+from .coalesce import Step, click_coalescer
+from .menus import (
+    PaginatedMenu,
+    SYSTEMS,
+    FILTERS,
+    status_button,
+    punishment_button,
+    rendered_keyboards,
 )
-from .base import BaseAction
 
 
 # ------------------------------------------------------------------------
+class AsyncError(AsyncBaseAction):
+    NAME = "error"
+
+    async def _handle(self, event: BaseEvent) -> bool:
+        snackbar_message = "⚠️ Что-то пошло не так."
+        await self.snackbar(event, snackbar_message)
+
+        return False
+
+
 class Error(BaseAction):
     NAME = "error"
+    ASYNC = AsyncError
 
     def _handle(self, event: BaseEvent) -> bool:
         snackbar_message = "⚠️ Что-то пошло не так."
@@ -46,8 +71,19 @@ class Error(BaseAction):
         return False
 
 
+class AsyncRejectAccess(AsyncBaseAction):
+    NAME = "reject_access"
+
+    async def _handle(self, event: BaseEvent) -> bool:
+        snackbar_message = "⚠️ Отказано в доступе."
+        await self.snackbar(event, snackbar_message)
+
+        return False
+
+
 class RejectAccess(BaseAction):
     NAME = "reject_access"
+    ASYNC = AsyncRejectAccess
 
     def _handle(self, event: BaseEvent) -> bool:
         snackbar_message = "⚠️ Отказано в доступе."
@@ -56,18 +92,39 @@ class RejectAccess(BaseAction):
         return False
 
 
+class AsyncCloseMenu(AsyncBaseAction):
+    NAME = "close_menu"
+
+    async def _handle(self, event: BaseEvent) -> bool:
+        snackbar_message = "❌ Меню закрыто."
+        await asyncio.gather(
+            self.snackbar(event, snackbar_message),
+            self.api.messages.delete(
+                peer_id=event.peer.bpid,
+                cmids=event.button.cmid,
+                delete_for_all=1,
+            ),
+        )
+
+        await aio.close_menu_session(bpid=event.peer.bpid, cmid=event.button.cmid)
+
+        return True
+
+
 class CloseMenu(BaseAction):
     NAME = "close_menu"
+    ASYNC = AsyncCloseMenu
 
     def _handle(self, event: BaseEvent) -> bool:
-        self.api.messages.delete(
+        snackbar_message = "❌ Меню закрыто."
+        delete = self.submit(
+            self.api.messages.delete,
             peer_id=event.peer.bpid,
             cmids=event.button.cmid,
             delete_for_all=1,
         )
-
-        snackbar_message = "❌ Меню закрыто."
         self.snackbar(event, snackbar_message)
+        delete.result()
 
         close_menu_session(bpid=event.peer.bpid, cmid=event.button.cmid)
 
@@ -205,15 +262,8 @@ class GameRoll(BaseAction):
             )
         )
 
-        self.api.messages.edit(
-            peer_id=event.peer.bpid,
-            conversation_message_id=event.button.cmid,
-            message=new_msg_text,
-            keyboard=keyboard.json,
-        )
-
         snackbar_message = "🎲 Рулетка прокручена!"
-        self.snackbar(event, snackbar_message)
+        self.respond(event, snackbar_message, new_msg_text, keyboard.json)
 
         return True
 
@@ -238,15 +288,8 @@ class GameCoinflip(BaseAction):
             )
         )
 
-        self.api.messages.edit(
-            peer_id=event.peer.bpid,
-            conversation_message_id=event.button.cmid,
-            message=new_msg_text,
-            keyboard=keyboard.json,
-        )
-
         snackbar_message = "🎲 Монета брошена!"
-        self.snackbar(event, snackbar_message)
+        self.respond(event, snackbar_message, new_msg_text, keyboard.json)
 
         return True
 
@@ -254,6 +297,7 @@ class GameCoinflip(BaseAction):
 # ------------------------------------------------------------------------
 class SystemsSettings(BaseAction):
     NAME = "systems_settings"
+    MENU = PaginatedMenu(NAME, SYSTEMS, status_button(NAME, "system_name"))
 
     def _handle(self, event: BaseEvent) -> bool:
         payload = event.button.payload
@@ -281,136 +325,33 @@ class SystemsSettings(BaseAction):
             )
 
         else:
-            snackbar_message = f"⚙️ Меню систем модерации ({page}/2)."
-
-        if page == 1:
-            keyboard = (
-                Keyboard(inline=True, one_time=False, owner_id=event.user.uuid)
-                .add_row()
-                .add_button(
-                    Callback(
-                        label=f"Возраст аккаунта: {'Вкл.' if systems['account_age'].value else 'Выкл.'}",
-                        payload={
-                            "action_name": "systems_settings",
-                            "action_context": "change_status",
-                            "system_name": "account_age",
-                            "page": "1",
-                        },
-                    ),
-                    color_by_status[systems["account_age"]],
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label=f"Запрещенные слова: {'Вкл.' if systems['curse_words'].value else 'Выкл.'}",
-                        payload={
-                            "action_name": "systems_settings",
-                            "action_context": "change_status",
-                            "system_name": "curse_words",
-                            "page": "1",
-                        },
-                    ),
-                    color_by_status[systems["curse_words"]],
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label=f"Открытое ЛС: {'Вкл.' if systems['open_pm'].value else 'Выкл.'}",
-                        payload={
-                            "action_name": "systems_settings",
-                            "action_context": "change_status",
-                            "system_name": "open_pm",
-                            "page": "1",
-                        },
-                    ),
-                    color_by_status[systems["open_pm"]],
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label=f"Медленный режим: {'Вкл.' if systems['slow_mode'].value else 'Выкл.'}",
-                        payload={
-                            "action_name": "systems_settings",
-                            "action_context": "change_status",
-                            "system_name": "slow_mode",
-                            "page": "1",
-                        },
-                    ),
-                    color_by_status[systems["slow_mode"]],
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label="-->",
-                        payload={"action_name": "systems_settings", "page": "2"},
-                    ),
-                    ButtonColor.SECONDARY,
-                )
-                .add_row()
-                .add_button(
-                    Callback(label="Закрыть", payload={"action_name": "close_menu"}),
-                    ButtonColor.SECONDARY,
-                )
-            )
-
-        if page == 2:
-            keyboard = (
-                Keyboard(inline=True, one_time=False, owner_id=event.user.uuid)
-                .add_row()
-                .add_button(
-                    Callback(
-                        label=f"Фильтрация URL: {'Вкл.' if systems['link_filter'].value else 'Выкл.'}",
-                        payload={
-                            "action_name": "systems_settings",
-                            "action_context": "change_status",
-                            "system_name": "link_filter",
-                            "page": "2",
-                        },
-                    ),
-                    color_by_status[systems["link_filter"]],
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label=f"Усиленная фильтрация URL: {'Вкл.' if systems['hard_link_filter'].value else 'Выкл.'}",
-                        payload={
-                            "action_name": "systems_settings",
-                            "action_context": "change_status",
-                            "system_name": "hard_link_filter",
-                            "page": "2",
-                        },
-                    ),
-                    color_by_status[systems["hard_link_filter"]],
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label="<--",
-                        payload={"action_name": "systems_settings", "page": "1"},
-                    ),
-                    ButtonColor.SECONDARY,
-                )
-                .add_row()
-                .add_button(
-                    Callback(label="Закрыть", payload={"action_name": "close_menu"}),
-                    ButtonColor.SECONDARY,
-                )
-            )
+            snackbar_message = f"⚙️ Меню систем модерации ({page}/{self.MENU.pages})."
+
+        template = self.MENU.templates[page]
+        flags = {name: bool(status.value) for name, status in systems.items()}
+        key = (self.NAME, page, event.user.uuid, template.bitmap(flags))
+
+        keyboard = rendered_keyboards.get(key)
+        if keyboard is MISSING:
+            labels = {
+                name: "Вкл." if status.value else "Выкл."
+                for name, status in systems.items()
+            }
+            colors = {
+                name: color_by_status[status] for name, status in systems.items()
+            }
+            keyboard = template.render(event.user.uuid, labels, colors)
+            rendered_keyboards.set(key, keyboard)
 
         new_msg_text = "⚙️ Включение\\Выключение систем модерации:"
-        self.api.messages.edit(
-            peer_id=event.peer.bpid,
-            conversation_message_id=event.button.cmid,
-            message=new_msg_text,
-            keyboard=keyboard.json,
-        )
-        self.snackbar(event, snackbar_message)
+        self.respond(event, snackbar_message, new_msg_text, keyboard)
 
         return True
 
 
 class FiltersSettings(BaseAction):
     NAME = "filters_settings"
+    MENU = PaginatedMenu(NAME, FILTERS, status_button(NAME, "filter_name"))
 
     def _handle(self, event: BaseEvent) -> bool:
         payload = event.button.payload
@@ -438,285 +379,26 @@ class FiltersSettings(BaseAction):
             )
 
         else:
-            snackbar_message = f"⚙️ Меню фильтров сообщений ({page}/4)."
-
-        if page == 1:
-            keyboard = (
-                Keyboard(inline=True, one_time=False, owner_id=event.user.uuid)
-                .add_row()
-                .add_button(
-                    Callback(
-                        label=f"Приложения: {'Запр.' if filters['app_action'].value else 'Раз.'}",
-                        payload={
-                            "action_name": "filters_settings",
-                            "action_context": "change_status",
-                            "filter_name": "app_action",
-                            "page": "1",
-                        },
-                    ),
-                    color_by_status[filters["app_action"]],
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label=f"Музыка: {'Запр.' if filters['audio'].value else 'Раз.'}",
-                        payload={
-                            "action_name": "filters_settings",
-                            "action_context": "change_status",
-                            "filter_name": "audio",
-                            "page": "1",
-                        },
-                    ),
-                    color_by_status[filters["audio"]],
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label=f"Аудио: {'Запр.' if filters['audio_message'].value else 'Раз.'}",
-                        payload={
-                            "action_name": "filters_settings",
-                            "action_context": "change_status",
-                            "filter_name": "audio_message",
-                            "page": "1",
-                        },
-                    ),
-                    color_by_status[filters["audio_message"]],
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label=f"Файлы: {'Запр.' if filters['doc'].value else 'Раз.'}",
-                        payload={
-                            "action_name": "filters_settings",
-                            "action_context": "change_status",
-                            "filter_name": "doc",
-                            "page": "1",
-                        },
-                    ),
-                    color_by_status[filters["doc"]],
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label="-->",
-                        payload={"action_name": "filters_settings", "page": "2"},
-                    ),
-                    ButtonColor.SECONDARY,
-                )
-                .add_row()
-                .add_button(
-                    Callback(label="Закрыть", payload={"action_name": "close_menu"}),
-                    ButtonColor.SECONDARY,
-                )
-            )
-
-        elif page == 2:
-            keyboard = (
-                Keyboard(inline=True, one_time=False, owner_id=event.user.uuid)
-                .add_row()
-                .add_button(
-                    Callback(
-                        label=f"Пересыл: {'Запр.' if filters['forward'].value else 'Раз.'}",
-                        payload={
-                            "action_name": "filters_settings",
-                            "action_context": "change_status",
-                            "filter_name": "forward",
-                            "page": "2",
-                        },
-                    ),
-                    color_by_status[filters["forward"]],
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label=f"Ответ: {'Запр.' if filters['reply'].value else 'Раз.'}",
-                        payload={
-                            "action_name": "filters_settings",
-                            "action_context": "change_status",
-                            "filter_name": "reply",
-                            "page": "2",
-                        },
-                    ),
-                    color_by_status[filters["reply"]],
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label=f"Граффити: {'Запр.' if filters['graffiti'].value else 'Раз.'}",
-                        payload={
-                            "action_name": "filters_settings",
-                            "action_context": "change_status",
-                            "filter_name": "graffiti",
-                            "page": "2",
-                        },
-                    ),
-                    color_by_status[filters["graffiti"]],
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label=f"Стикеры: {'Запр.' if filters['sticker'].value else 'Раз.'}",
-                        payload={
-                            "action_name": "filters_settings",
-                            "action_context": "change_status",
-                            "filter_name": "sticker",
-                            "page": "2",
-                        },
-                    ),
-                    color_by_status[filters["sticker"]],
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label="<--",
-                        payload={"action_name": "filters_settings", "page": "1"},
-                    ),
-                    ButtonColor.SECONDARY,
-                )
-                .add_button(
-                    Callback(
-                        label="-->",
-                        payload={"action_name": "filters_settings", "page": "3"},
-                    ),
-                    ButtonColor.SECONDARY,
-                )
-                .add_row()
-                .add_button(
-                    Callback(label="Закрыть", payload={"action_name": "close_menu"}),
-                    ButtonColor.SECONDARY,
-                )
-            )
-
-        elif page == 3:
-            keyboard = (
-                Keyboard(inline=True, one_time=False, owner_id=event.user.uuid)
-                .add_row()
-                .add_button(
-                    Callback(
-                        label=f"Линки: {'Запр.' if filters['link'].value else 'Раз.'}",
-                        payload={
-                            "action_name": "filters_settings",
-                            "action_context": "change_status",
-                            "filter_name": "link",
-                            "page": "3",
-                        },
-                    ),
-                    color_by_status[filters["link"]],
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label=f"Изображения: {'Запр.' if filters['photo'].value else 'Раз.'}",
-                        payload={
-                            "action_name": "filters_settings",
-                            "action_context": "change_status",
-                            "filter_name": "photo",
-                            "page": "3",
-                        },
-                    ),
-                    color_by_status[filters["photo"]],
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label=f"Опросы: {'Запр.' if filters['poll'].value else 'Раз.'}",
-                        payload={
-                            "action_name": "filters_settings",
-                            "action_context": "change_status",
-                            "filter_name": "poll",
-                            "page": "3",
-                        },
-                    ),
-                    color_by_status[filters["poll"]],
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label=f"Видео: {'Запр.' if filters['video'].value else 'Раз.'}",
-                        payload={
-                            "action_name": "filters_settings",
-                            "action_context": "change_status",
-                            "filter_name": "video",
-                            "page": "3",
-                        },
-                    ),
-                    color_by_status[filters["video"]],
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label="<--",
-                        payload={"action_name": "filters_settings", "page": "2"},
-                    ),
-                    ButtonColor.SECONDARY,
-                )
-                .add_button(
-                    Callback(
-                        label="-->",
-                        payload={"action_name": "filters_settings", "page": "4"},
-                    ),
-                    ButtonColor.SECONDARY,
-                )
-                .add_row()
-                .add_button(
-                    Callback(label="Закрыть", payload={"action_name": "close_menu"}),
-                    ButtonColor.SECONDARY,
-                )
-            )
-
-        elif page == 4:
-            keyboard = (
-                Keyboard(inline=True, one_time=False, owner_id=event.user.uuid)
-                .add_row()
-                .add_button(
-                    Callback(
-                        label=f"Записи: {'Запр.' if filters['wall'].value else 'Раз.'}",
-                        payload={
-                            "action_name": "filters_settings",
-                            "action_context": "change_status",
-                            "filter_name": "wall",
-                            "page": "4",
-                        },
-                    ),
-                    color_by_status[filters["wall"]],
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label=f"Геопозиция: {'Запр.' if filters['geo'].value else 'Раз.'}",
-                        payload={
-                            "action_name": "filters_settings",
-                            "action_context": "change_status",
-                            "filter_name": "geo",
-                            "page": "4",
-                        },
-                    ),
-                    color_by_status[filters["geo"]],
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label="<--",
-                        payload={"action_name": "filters_settings", "page": "3"},
-                    ),
-                    ButtonColor.SECONDARY,
-                )
-                .add_row()
-                .add_button(
-                    Callback(label="Закрыть", payload={"action_name": "close_menu"}),
-                    ButtonColor.SECONDARY,
-                )
-            )
+            snackbar_message = f"⚙️ Меню фильтров сообщений ({page}/{self.MENU.pages})."
+
+        template = self.MENU.templates[page]
+        flags = {name: bool(status.value) for name, status in filters.items()}
+        key = (self.NAME, page, event.user.uuid, template.bitmap(flags))
+
+        keyboard = rendered_keyboards.get(key)
+        if keyboard is MISSING:
+            labels = {
+                name: "Запр." if status.value else "Раз."
+                for name, status in filters.items()
+            }
+            colors = {
+                name: color_by_status[status] for name, status in filters.items()
+            }
+            keyboard = template.render(event.user.uuid, labels, colors)
+            rendered_keyboards.set(key, keyboard)
 
         new_msg_text = "⚙️ Включение\\Выключение фильтров сообщений:"
-        self.api.messages.edit(
-            peer_id=event.peer.bpid,
-            conversation_message_id=event.button.cmid,
-            message=new_msg_text,
-            keyboard=keyboard.json,
-        )
-
-        self.snackbar(event, snackbar_message)
+        self.respond(event, snackbar_message, new_msg_text, keyboard)
 
         return True
 
@@ -724,31 +406,75 @@ class FiltersSettings(BaseAction):
 # ------------------------------------------------------------------------
 class ChangeDelay(BaseAction):
     NAME = "change_delay"
+    clicks = click_coalescer
 
     def _handle(self, event: BaseEvent) -> bool:
         payload = event.button.payload
         setting_name = payload.get("setting_name")
 
-        delay = get_setting_delay(name=setting_name, bpid=event.peer.bpid)
-
         action_context = payload.get("action_context")
         if action_context is not None:
             time = int(payload.get("time"))
 
             if action_context == "subtract_time":
-                delay = delay - time
-                delay = delay if delay > 0 else 0
+                step = Step(-time, minimum=0)
                 snackbar_message = "⚠️ Время уменьшено."
 
             elif action_context == "add_time":
-                delay = delay + time
+                step = Step(time)
                 snackbar_message = "⚠️ Время увеличено."
 
-            update_setting_delay(name=setting_name, bpid=event.peer.bpid, delay=delay)
+            if self.clicks.window > 0 and self.clicks.healthy:
+                # The menu is edited once for a series of clicks.
+                self.snackbar(event, snackbar_message)
+                key = (self.NAME, event.peer.bpid, event.button.cmid, setting_name)
+                self.clicks.add(key, step, event, self._commit)
+                return True
+
+            delay = self._increment(event, setting_name, step)
 
         else:
+            delay = get_setting_delay(name=setting_name, bpid=event.peer.bpid)
             snackbar_message = "⚙️ Меню установки задержки."
 
+        self.respond(event, snackbar_message, *self._menu(event, setting_name, delay))
+
+        return True
+
+    def _commit(self, key: tuple, step: Step, event: BaseEvent) -> None:
+        # Only a failed write raises: the coalescer pauses on it.
+        setting_name = key[-1]
+        try:
+            delay = self._increment(event, setting_name, step)
+
+        except Exception:
+            # The snackbars already told of a change: show what is stored.
+            self._show(event, setting_name)
+            raise
+
+        self._show(event, setting_name, delay)
+
+    def _show(self, event: BaseEvent, setting_name: str, delay: Optional[int] = None) -> None:
+        try:
+            if delay is None:
+                delay = get_setting_delay(name=setting_name, bpid=event.peer.bpid)
+            self.edit(event, *self._menu(event, setting_name, delay))
+
+        except Exception as error:
+            # E.g. the menu was closed within the window.
+            logger.error(f"Could not show merged clicks of '{setting_name}': {error}")
+
+    @staticmethod
+    def _increment(event: BaseEvent, setting_name: str, step: Step) -> int:
+        return increment_setting_delay(
+            name=setting_name,
+            bpid=event.peer.bpid,
+            delta=step.delta,
+            minimum=step.minimum,
+            maximum=step.maximum,
+        )
+
+    def _menu(self, event: BaseEvent, setting_name: str, delay: int) -> Tuple[str, str]:
         descriptions = {
             "slow_mode": (
                 "⚙️ Задержка для данного чата установлена на:",
@@ -838,16 +564,7 @@ class ChangeDelay(BaseAction):
         text, declension = descriptions[setting_name]
         new_msg_text = f"{text} {delay} {declension(delay)}"
 
-        self.api.messages.edit(
-            peer_id=event.peer.bpid,
-            conversation_message_id=event.button.cmid,
-            message=new_msg_text,
-            keyboard=keyboard.json,
-        )
-
-        self.snackbar(event, snackbar_message)
-
-        return True
+        return new_msg_text, keyboard.json
 
     @staticmethod
     def _get_min_declension(minutes: int) -> str:
@@ -877,440 +594,111 @@ class ChangeDelay(BaseAction):
 # ------------------------------------------------------------------------
 class SystemsPunishment(BaseAction):
     NAME = "systems_punishment"
+    MENU = PaginatedMenu(NAME, SYSTEMS, punishment_button)
 
     def _handle(self, event: BaseEvent) -> bool:
         payload = event.button.payload
         page = int(payload.get("page", 1))
 
-        snackbar_message = f"⚙️ Меню систем модерации ({page}/2).."
-
-        if page == 1:
-            keyboard = (
-                Keyboard(inline=True, one_time=False, owner_id=event.user.uuid)
-                .add_row()
-                .add_button(
-                    Callback(
-                        label="Возраст аккаунта",
-                        payload={
-                            "action_name": "change_punishment",
-                            "setting_name": "account_age",
-                            "page": "1",
-                        },
-                    ),
-                    ButtonColor.PRIMARY,
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label="Запрещенные слова",
-                        payload={
-                            "action_name": "change_punishment",
-                            "setting_name": "curse_words",
-                            "page": "1",
-                        },
-                    ),
-                    ButtonColor.PRIMARY,
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label="Открытое ЛС",
-                        payload={
-                            "action_name": "change_punishment",
-                            "setting_name": "open_pm",
-                            "page": "1",
-                        },
-                    ),
-                    ButtonColor.PRIMARY,
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label="Медленный режим",
-                        payload={
-                            "action_name": "change_punishment",
-                            "setting_name": "slow_mode",
-                            "page": "1",
-                        },
-                    ),
-                    ButtonColor.PRIMARY,
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label="-->",
-                        payload={"action_name": "systems_punishment", "page": "2"},
-                    ),
-                    ButtonColor.SECONDARY,
-                )
-                .add_row()
-                .add_button(
-                    Callback(label="Закрыть", payload={"action_name": "close_menu"}),
-                    ButtonColor.SECONDARY,
-                )
-            )
+        snackbar_message = f"⚙️ Меню систем модерации ({page}/{self.MENU.pages}).."
 
-        if page == 2:
-            keyboard = (
-                Keyboard(inline=True, one_time=False, owner_id=event.user.uuid)
-                .add_row()
-                .add_button(
-                    Callback(
-                        label="Фильтрация URL",
-                        payload={
-                            "action_name": "change_punishment",
-                            "setting_name": "link_filter",
-                            "page": "2",
-                        },
-                    ),
-                    ButtonColor.PRIMARY,
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label="Усиленная фильтрация URL",
-                        payload={
-                            "action_name": "change_punishment",
-                            "setting_name": "hard_link_filter",
-                            "page": "2",
-                        },
-                    ),
-                    ButtonColor.PRIMARY,
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label="<--",
-                        payload={"action_name": "systems_punishment", "page": "1"},
-                    ),
-                    ButtonColor.SECONDARY,
-                )
-                .add_row()
-                .add_button(
-                    Callback(label="Закрыть", payload={"action_name": "close_menu"}),
-                    ButtonColor.SECONDARY,
-                )
-            )
+        keyboard = self.MENU.render(page, event.user.uuid)
 
         new_msg_text = "⚙️ Выберете необходимую систему:"
-        self.api.messages.edit(
-            peer_id=event.peer.bpid,
-            conversation_message_id=event.button.cmid,
-            message=new_msg_text,
-            keyboard=keyboard.json,
-        )
-
-        self.snackbar(event, snackbar_message)
+        self.respond(event, snackbar_message, new_msg_text, keyboard)
 
         return True
 
 
 class FiltersPunishment(BaseAction):
     NAME = "filters_punishment"
+    MENU = PaginatedMenu(NAME, FILTERS, punishment_button)
 
     def _handle(self, event: BaseEvent) -> bool:
         payload = event.button.payload
         page = int(payload.get("page", 1))
 
-        snackbar_message = f"⚙️ Меню фильтров сообщений ({page}/4)."
-
-        if page == 1:
-            keyboard = (
-                Keyboard(inline=True, one_time=False, owner_id=event.user.uuid)
-                .add_row()
-                .add_button(
-                    Callback(
-                        label="Приложения",
-                        payload={
-                            "action_name": "change_punishment",
-                            "setting_name": "app_action",
-                            "page": "1",
-                        },
-                    ),
-                    ButtonColor.PRIMARY,
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label="Музыка",
-                        payload={
-                            "action_name": "change_punishment",
-                            "setting_name": "audio",
-                            "page": "1",
-                        },
-                    ),
-                    ButtonColor.PRIMARY,
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label="Аудио",
-                        payload={
-                            "action_name": "change_punishment",
-                            "setting_name": "audio_message",
-                            "page": "1",
-                        },
-                    ),
-                    ButtonColor.PRIMARY,
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label="Файлы",
-                        payload={
-                            "action_name": "change_punishment",
-                            "setting_name": "doc",
-                            "page": "1",
-                        },
-                    ),
-                    ButtonColor.PRIMARY,
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label="-->",
-                        payload={"action_name": "filters_punishment", "page": "2"},
-                    ),
-                    ButtonColor.SECONDARY,
-                )
-                .add_row()
-                .add_button(
-                    Callback(label="Закрыть", payload={"action_name": "close_menu"}),
-                    ButtonColor.SECONDARY,
-                )
-            )
-
-        elif page == 2:
-            keyboard = (
-                Keyboard(inline=True, one_time=False, owner_id=event.user.uuid)
-                .add_row()
-                .add_button(
-                    Callback(
-                        label="Пересыл",
-                        payload={
-                            "action_name": "change_punishment",
-                            "setting_name": "forward",
-                            "page": "2",
-                        },
-                    ),
-                    ButtonColor.PRIMARY,
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label="Ответ",
-                        payload={
-                            "action_name": "change_punishment",
-                            "setting_name": "reply",
-                            "page": "2",
-                        },
-                    ),
-                    ButtonColor.PRIMARY,
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label="Граффити",
-                        payload={
-                            "action_name": "change_punishment",
-                            "setting_name": "graffiti",
-                            "page": "2",
-                        },
-                    ),
-                    ButtonColor.PRIMARY,
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label="Стикеры",
-                        payload={
-                            "action_name": "change_punishment",
-                            "setting_name": "sticker",
-                            "page": "2",
-                        },
-                    ),
-                    ButtonColor.PRIMARY,
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label="<--",
-                        payload={"action_name": "filters_punishment", "page": "1"},
-                    ),
-                    ButtonColor.SECONDARY,
-                )
-                .add_button(
-                    Callback(
-                        label="-->",
-                        payload={"action_name": "filters_punishment", "page": "3"},
-                    ),
-                    ButtonColor.SECONDARY,
-                )
-                .add_row()
-                .add_button(
-                    Callback(label="Закрыть", payload={"action_name": "close_menu"}),
-                    ButtonColor.SECONDARY,
-                )
-            )
-
-        elif page == 3:
-            keyboard = (
-                Keyboard(inline=True, one_time=False, owner_id=event.user.uudi)
-                .add_row()
-                .add_button(
-                    Callback(
-                        label="Линки",
-                        payload={
-                            "action_name": "change_punishment",
-                            "setting_name": "link",
-                            "page": "3",
-                        },
-                    ),
-                    ButtonColor.PRIMARY,
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label="Изображения",
-                        payload={
-                            "action_name": "change_punishment",
-                            "setting_name": "photo",
-                            "page": "3",
-                        },
-                    ),
-                    ButtonColor.PRIMARY,
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label="Опросы",
-                        payload={
-                            "action_name": "change_punishment",
-                            "setting_name": "poll",
-                            "page": "3",
-                        },
-                    ),
-                    ButtonColor.PRIMARY,
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label="Видео",
-                        payload={
-                            "action_name": "change_punishment",
-                            "setting_name": "video",
-                            "page": "3",
-                        },
-                    ),
-                    ButtonColor.PRIMARY,
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label="<--",
-                        payload={"action_name": "filters_punishment", "page": "2"},
-                    ),
-                    ButtonColor.SECONDARY,
-                )
-                .add_button(
-                    Callback(
-                        label="-->",
-                        payload={"action_name": "filters_punishment", "page": "4"},
-                    ),
-                    ButtonColor.SECONDARY,
-                )
-                .add_row()
-                .add_button(
-                    Callback(label="Закрыть", payload={"action_name": "close_menu"}),
-                    ButtonColor.SECONDARY,
-                )
-            )
+        snackbar_message = f"⚙️ Меню фильтров сообщений ({page}/{self.MENU.pages})."
 
-        elif page == 4:
-            keyboard = (
-                Keyboard(inline=True, one_time=False, owner_id=event.user.uuid)
-                .add_row()
-                .add_button(
-                    Callback(
-                        label="Записи",
-                        payload={
-                            "action_name": "change_punishment",
-                            "setting_name": "wall",
-                            "page": "4",
-                        },
-                    ),
-                    ButtonColor.PRIMARY,
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label="Геопозиция",
-                        payload={
-                            "action_name": "change_punishment",
-                            "setting_name": "geo",
-                            "page": "4",
-                        },
-                    ),
-                    ButtonColor.PRIMARY,
-                )
-                .add_row()
-                .add_button(
-                    Callback(
-                        label="<--",
-                        payload={"action_name": "filters_punishment", "page": "3"},
-                    ),
-                    ButtonColor.SECONDARY,
-                )
-                .add_row()
-                .add_button(
-                    Callback(label="Закрыть", payload={"action_name": "close_menu"}),
-                    ButtonColor.SECONDARY,
-                )
-            )
+        keyboard = self.MENU.render(page, event.user.uuid)
 
         new_msg_text = "⚙️ Выберете необходимый фильтр:"
-        self.api.messages.edit(
-            peer_id=event.peer.bpid,
-            conversation_message_id=event.button.cmid,
-            message=new_msg_text,
-            keyboard=keyboard.json,
-        )
-
-        self.snackbar(event, snackbar_message)
+        self.respond(event, snackbar_message, new_msg_text, keyboard)
 
         return True
 
 
 class ChangePunishment(BaseAction):
     NAME = "change_punishment"
+    clicks = click_coalescer
 
     def _handle(self, event: BaseEvent) -> bool:
         payload = event.button.payload
         setting_name = payload.get("setting_name")
 
-        points = get_setting_points(bpid=event.peer.bpid, name=setting_name)
-
         action_context = payload.get("action_context")
         if action_context is not None:
             points_delta = payload.get("points")
 
             if action_context == "subtract_points":
-                points = points - points_delta
-                points = points if points > 0 else 0
+                step = Step(-points_delta, minimum=0)
                 snackbar_message = "⚠️ Наказание уменьшено."
 
             elif action_context == "add_points":
-                points = points + points_delta
-                points = points if points <= 10 else 10
+                step = Step(points_delta, maximum=10)
                 snackbar_message = "⚠️ Наказание увеличено."
 
-            update_setting_points(
-                bpid=event.peer.bpid, name=setting_name, points=points
-            )
+            if self.clicks.window > 0 and self.clicks.healthy:
+                # The menu is edited once for a series of clicks.
+                self.snackbar(event, snackbar_message)
+                key = (self.NAME, event.peer.bpid, event.button.cmid, setting_name)
+                self.clicks.add(key, step, event, self._commit)
+                return True
+
+            points = self._increment(event, setting_name, step)
 
         else:
+            points = get_setting_points(bpid=event.peer.bpid, name=setting_name)
             snackbar_message = "⚙️ Меню установки наказания."
 
+        self.respond(event, snackbar_message, *self._menu(event, setting_name, points))
+
+        return True
+
+    def _commit(self, key: tuple, step: Step, event: BaseEvent) -> None:
+        # Only a failed write raises: the coalescer pauses on it.
+        setting_name = key[-1]
+        try:
+            points = self._increment(event, setting_name, step)
+
+        except Exception:
+            # The snackbars already told of a change: show what is stored.
+            self._show(event, setting_name)
+            raise
+
+        self._show(event, setting_name, points)
+
+    def _show(self, event: BaseEvent, setting_name: str, points: Optional[int] = None) -> None:
+        try:
+            if points is None:
+                points = get_setting_points(bpid=event.peer.bpid, name=setting_name)
+            self.edit(event, *self._menu(event, setting_name, points))
+
+        except Exception as error:
+            # E.g. the menu was closed within the window.
+            logger.error(f"Could not show merged clicks of '{setting_name}': {error}")
+
+    @staticmethod
+    def _increment(event: BaseEvent, setting_name: str, step: Step) -> int:
+        return increment_setting_points(
+            bpid=event.peer.bpid,
+            name=setting_name,
+            delta=step.delta,
+            minimum=step.minimum,
+            maximum=step.maximum,
+        )
+
+    def _menu(self, event: BaseEvent, setting_name: str, points: int) -> Tuple[str, str]:
         keyboard = (
             Keyboard(inline=True, one_time=False, owner_id=event.user.uuid)
             .add_row()
@@ -1375,16 +763,7 @@ class ChangePunishment(BaseAction):
             f"{points} {self._get_warn_declension(points)}."
         )
 
-        self.api.messages.edit(
-            peer_id=event.peer.bpid,
-            conversation_message_id=event.button.cmid,
-            message=new_msg_text,
-            keyboard=keyboard.json,
-        )
-
-        self.snackbar(event, snackbar_message)
-
-        return True
+        return new_msg_text, keyboard.json
 
     @staticmethod
     def _get_warn_declension(minutes: int) -> str:
@@ -7,10 +7,16 @@ About:
     Initializing the "actions" module.
 """
 
+import asyncio
+import contextvars
+import threading
 from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional, Type
 from vk_api import VkApi
 from funcka_bots.events import BaseEvent
 from funcka_bots.keyboards import SnackbarAnswer
+import config
 
 
 class BaseAction(ABC):
@@ -18,6 +24,14 @@ class BaseAction(ABC):
 
     NAME = "None"
 
+    # Non-blocking variant the asyncio handler uses instead, if any.
+    ASYNC: Optional[Type["AsyncBaseAction"]] = None
+
+    # Shared by all actions to run the slower call of a response while
+    # the snackbar is answered inline, created on the first response.
+    _answers: Optional[ThreadPoolExecutor] = None
+    _answers_lock = threading.Lock()
+
     def __init__(self, api: VkApi) -> None:
         self.api = api
 
@@ -49,3 +63,111 @@ class BaseAction(ABC):
             peer_id=event.peer.bpid,
             event_data=SnackbarAnswer(text).data,
         )
+
+    def submit(self, function: Callable[..., Any], *args, **kwargs) -> Future:
+        """Runs a call alongside the action, in the action context.
+
+        Args:
+            function (Callable): Function to call.
+
+        Returns:
+            Future: Call result.
+        """
+
+        context = contextvars.copy_context()
+        return self._pool().submit(context.run, function, *args, **kwargs)
+
+    @classmethod
+    def _pool(cls) -> ThreadPoolExecutor:
+        if cls._answers is None:
+            with cls._answers_lock:
+                if cls._answers is None:
+                    # One thread per dispatch worker, so every worker can
+                    # have a call in flight; serial dispatch has none.
+                    BaseAction._answers = ThreadPoolExecutor(
+                        max_workers=max(1, config.DISPATCH_WORKERS),
+                        thread_name_prefix="respond",
+                    )
+
+        return cls._answers
+
+    def respond(self, event: BaseEvent, text: str, message: str, keyboard: str) -> None:
+        """Sends a snackbar to the user and edits the menu message.
+        The edit runs in the pool while the snackbar is sent inline.
+
+        Args:
+            event (Event): Custom Event object.
+            text (str): Snackbar text.
+            message (str): New menu message text.
+            keyboard (str): New menu keyboard JSON.
+        """
+
+        edit = self.submit(self.edit, event, message, keyboard)
+        self.snackbar(event, text)
+        edit.result()
+
+    def edit(self, event: BaseEvent, message: str, keyboard: str) -> None:
+        """Edits the menu message.
+
+        Args:
+            event (Event): Custom Event object.
+            message (str): New menu message text.
+            keyboard (str): New menu keyboard JSON.
+        """
+
+        self.api.messages.edit(
+            peer_id=event.peer.bpid,
+            conversation_message_id=event.button.cmid,
+            message=message,
+            keyboard=keyboard,
+        )
+
+
+class AsyncBaseAction(ABC):
+    """Base class of the non-blocking bot button response action."""
+
+    NAME = "None"
+
+    def __init__(self, api) -> None:
+        self.api = api
+
+    async def __call__(self, event: BaseEvent) -> bool:
+        return await self._handle(event)
+
+    @abstractmethod
+    async def _handle(self, event: BaseEvent) -> bool:
+        """The main function of action execution.
+
+        Args:
+            event (Event): Custom Event object.
+
+        Returns:
+            bool: Execution status.
+        """
+
+    async def snackbar(self, event: BaseEvent, text: str) -> None:
+        """Sends a snackbar to the user.
+
+        Args:
+            event (Event): Custom Event object.
+            text (str): Sncakbar text.
+        """
+
+        await self.api.messages.sendMessageEventAnswer(
+            event_id=event.button.beid,
+            user_id=event.user.uuid,
+            peer_id=event.peer.bpid,
+            event_data=SnackbarAnswer(text).data,
+        )
+
+
+class SyncActionAdapter:
+    """Runs a synchronous action in a worker thread,
+    so it can be awaited like an AsyncBaseAction.
+    """
+
+    def __init__(self, action: BaseAction) -> None:
+        self.action = action
+
+    async def __call__(self, event: BaseEvent) -> bool:
+        return await asyncio.to_thread(self.action, event)
@@ -0,0 +1,140 @@
+"""Module "actions".
+
+File:
+    coalesce.py
+
+About:
+    File describing the merging of rapid setting
+    increments into a single one.
+"""
+
+import atexit
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional
+from loguru import logger
+from funcka_bots.events import BaseEvent
+import config
+
+
+def _clamp(value: int, minimum: Optional[int], maximum: Optional[int]) -> int:
+    if minimum is not None:
+        value = max(value, minimum)
+
+    if maximum is not None:
+        value = min(value, maximum)
+
+    return value
+
+
+class Step(NamedTuple):
+    """Increment by `delta`, clamped to [`minimum`, `maximum`].
+    None leaves the bound open."""
+
+    delta: int
+    minimum: Optional[int] = None
+    maximum: Optional[int] = None
+
+    def then(self, step: "Step") -> "Step":
+        """Returns the single step equal to this one followed by `step`.
+
+        Clamping twice is clamping once to the inner bounds moved
+        by the second delta and clamped by the outer bounds.
+        """
+
+        minimum = step.minimum
+        if self.minimum is not None:
+            minimum = _clamp(self.minimum + step.delta, step.minimum, step.maximum)
+
+        maximum = step.maximum
+        if self.maximum is not None:
+            maximum = _clamp(self.maximum + step.delta, step.minimum, step.maximum)
+
+        return Step(self.delta + step.delta, minimum, maximum)
+
+
+# Applies the merged step: (key, step, last event).
+Commit = Callable[[Hashable, Step, BaseEvent], Any]
+
+
+class Coalescer:
+    """Merges the steps added under one key within `window`
+    seconds of the first one, and commits them at once from
+    a background thread, started with the first step.
+
+    A failed commit leaves the coalescer unhealthy for `pause`
+    seconds, so that callers apply steps directly meanwhile and
+    failures reach the user. Pending steps are committed at
+    interpreter exit.
+    """
+
+    def __init__(self, window: float, pause: float = 30) -> None:
+        self.window = window
+        self.pause = pause
+        self.merged = 0
+        self._failed_until = 0.0
+
+        self._cond = threading.Condition()
+        # Key: [merged step, last event, commit time, commit].
+        self._pending: Dict[Hashable, list] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, key: Hashable, step: Step, event: BaseEvent, commit: Commit) -> None:
+        """Adds the step under the key. The merged step is passed to
+        the `commit` of the first step, with the last event."""
+
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="coalescer", daemon=True
+                )
+                self._thread.start()
+                atexit.register(self.flush)
+
+            pending = self._pending.get(key)
+            if pending is None:
+                self._pending[key] = [step, event, time.monotonic() + self.window, commit]
+                self._cond.notify()
+            else:
+                pending[0] = pending[0].then(step)
+                pending[1] = event
+                self.merged += 1
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self._failed_until
+
+    def flush(self) -> None:
+        """Commits every pending step now."""
+
+        with self._cond:
+            pending, self._pending = self._pending, {}
+
+        for key, (step, event, _, commit) in pending.items():
+            self._commit(commit, key, step, event)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                now = time.monotonic()
+                due = [key for key, pending in self._pending.items() if pending[2] <= now]
+                batch = [(key, *self._pending.pop(key)) for key in due]
+                if not batch:
+                    deadlines = [pending[2] for pending in self._pending.values()]
+                    self._cond.wait(min(deadlines) - now if deadlines else None)
+                    continue
+
+            for key, step, event, _, commit in batch:
+                self._commit(commit, key, step, event)
+
+    def _commit(self, commit: Commit, key: Hashable, step: Step, event: BaseEvent) -> None:
+        try:
+            commit(key, step, event)
+
+        except Exception as error:
+            self._failed_until = time.monotonic() + self.pause
+            logger.error(f"Could not commit merged clicks of {key}: {error}")
+
+
+# Shared by the actions merging clicks.
+click_coalescer = Coalescer(config.COALESCE_WINDOW)
@@ -0,0 +1,169 @@
+"""Module "actions".
+
+File:
+    menus.py
+
+About:
+    File describing the settings menus as data and the
+    paginated renderer compiling them into keyboard
+    templates.
+"""
+
+from functools import partial
+from typing import Callable, Dict, NamedTuple, Optional, Sequence, Tuple
+from funcka_bots.keyboards import Keyboard, ButtonColor, Callback
+from cache import LRUCache
+from .templates import KeyboardTemplate, LabelSlot, ColorSlot
+import config
+
+
+# Rendered settings keyboards by (action, page, owner, status bitmap).
+rendered_keyboards = LRUCache(
+    maxsize=config.KEYBOARD_CACHE_SIZE,
+    ttl=config.KEYBOARD_CACHE_TTL,
+)
+
+
+class Setting(NamedTuple):
+    name: str
+    title: str
+
+
+# Moderation systems, in menu order.
+SYSTEMS = (
+    Setting("account_age", "Возраст аккаунта"),
+    Setting("curse_words", "Запрещенные слова"),
+    Setting("open_pm", "Открытое ЛС"),
+    Setting("slow_mode", "Медленный режим"),
+    Setting("link_filter", "Фильтрация URL"),
+    Setting("hard_link_filter", "Усиленная фильтрация URL"),
+)
+
+# Message filters, in menu order.
+FILTERS = (
+    Setting("app_action", "Приложения"),
+    Setting("audio", "Музыка"),
+    Setting("audio_message", "Аудио"),
+    Setting("doc", "Файлы"),
+    Setting("forward", "Пересыл"),
+    Setting("reply", "Ответ"),
+    Setting("graffiti", "Граффити"),
+    Setting("sticker", "Стикеры"),
+    Setting("link", "Линки"),
+    Setting("photo", "Изображения"),
+    Setting("poll", "Опросы"),
+    Setting("video", "Видео"),
+    Setting("wall", "Записи"),
+    Setting("geo", "Геопозиция"),
+)
+
+# Builds the button of a setting on a page: (callback, color).
+ButtonBuilder = Callable[
+    [Setting, int, LabelSlot, ColorSlot], Tuple[Callback, ButtonColor]
+]
+
+
+def status_button(action_name: str, name_key: str) -> ButtonBuilder:
+    """Button switching a setting on and off, labelled
+    and colored by the setting status.
+
+    Args:
+        action_name (str): Action switching the setting.
+        name_key (str): Payload key of the setting name.
+    """
+
+    def button(setting: Setting, page: int, label: LabelSlot, color: ColorSlot):
+        callback = Callback(
+            label=f"{setting.title}: {label(setting.name)}",
+            payload={
+                "action_name": action_name,
+                "action_context": "change_status",
+                name_key: setting.name,
+                "page": str(page),
+            },
+        )
+        return callback, color(setting.name)
+
+    return button
+
+
+def punishment_button(setting: Setting, page: int, label: LabelSlot, color: ColorSlot):
+    """Button opening the punishment menu of a setting."""
+
+    callback = Callback(
+        label=setting.title,
+        payload={
+            "action_name": "change_punishment",
+            "setting_name": setting.name,
+            "page": str(page),
+        },
+    )
+    return callback, ButtonColor.PRIMARY
+
+
+class PaginatedMenu:
+    """Menu of settings split into pages of `page_size` buttons,
+    followed by the page navigation and the close button.
+
+    Every page is compiled into a KeyboardTemplate once,
+    when the menu is created.
+    """
+
+    def __init__(
+        self,
+        action_name: str,
+        settings: Sequence[Setting],
+        button: ButtonBuilder,
+        page_size: int = 4,
+    ) -> None:
+        self.action_name = action_name
+        self.settings = tuple(settings)
+        self.button = button
+        self.page_size = page_size
+        self.pages = max(1, -(-len(self.settings) // page_size))
+        self.templates: Dict[int, KeyboardTemplate] = {
+            page: KeyboardTemplate(partial(self.keyboard, page))
+            for page in range(1, self.pages + 1)
+        }
+
+    def keyboard(
+        self, page: int, owner_id: int, label: LabelSlot, color: ColorSlot
+    ) -> Keyboard:
+        """Builds the keyboard of a page."""
+
+        keyboard = Keyboard(inline=True, one_time=False, owner_id=owner_id)
+
+        start = (page - 1) * self.page_size
+        for setting in self.settings[start : start + self.page_size]:
+            keyboard.add_row().add_button(*self.button(setting, page, label, color))
+
+        if self.pages > 1:
+            keyboard.add_row()
+            if page > 1:
+                keyboard.add_button(self._turn(page - 1, "<--"), ButtonColor.SECONDARY)
+            if page < self.pages:
+                keyboard.add_button(self._turn(page + 1, "-->"), ButtonColor.SECONDARY)
+
+        keyboard.add_row().add_button(
+            Callback(label="Закрыть", payload={"action_name": "close_menu"}),
+            ButtonColor.SECONDARY,
+        )
+
+        return keyboard
+
+    def render(
+        self,
+        page: int,
+        owner_id: int,
+        labels: Optional[Dict[str, str]] = None,
+        colors: Optional[Dict[str, ButtonColor]] = None,
+    ) -> str:
+        """Returns the keyboard JSON of a page."""
+
+        return self.templates[page].render(owner_id, labels, colors)
+
+    def _turn(self, page: int, label: str) -> Callback:
+        return Callback(
+            label=label,
+            payload={"action_name": self.action_name, "page": str(page)},
+        )
@@ -0,0 +1,138 @@
+"""Module "actions".
+
+File:
+    registry.py
+
+About:
+    File describing the catalogue of actions, loaded
+    on first use, and the registry of ready-to-call
+    actions created from it.
+"""
+
+import importlib
+import threading
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional, Type
+from .base import AsyncBaseAction, SyncActionAdapter
+
+
+class ActionList(Mapping):
+    """Action classes by name.
+
+    Names are known upfront, the module defining the classes
+    is imported on the first class lookup.
+    """
+
+    def __init__(self, module: str, classes: Dict[str, str]) -> None:
+        self.module = module
+        self._classes = classes
+        self._loaded: Optional[Dict[str, Type]] = None
+        self._lock = threading.Lock()
+
+    def load(self) -> Dict[str, Type]:
+        """Imports the action module.
+
+        Returns:
+            Dict[str, Type]: Action classes by name.
+        """
+
+        if self._loaded is None:
+            with self._lock:
+                if self._loaded is None:
+                    module = importlib.import_module(self.module)
+                    self._loaded = {
+                        name: getattr(module, class_name)
+                        for name, class_name in self._classes.items()
+                    }
+
+        return self._loaded
+
+    def __getitem__(self, name: str) -> Type:
+        if name not in self._classes:
+            raise KeyError(name)
+
+        return self.load()[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._classes
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._classes)
+
+    def __len__(self) -> int:
+        return len(self._classes)
+
+
+class Registry:
+    """Ready-to-call actions by name.
+
+    Actions keep no per-event state, so one instance, bound to
+    the shared API client, serves all events at the same time.
+    An action is created on its first call.
+    """
+
+    def __init__(
+        self,
+        actions: Mapping[str, Type],
+        api: Any,
+        async_api: Optional[Any] = None,
+    ) -> None:
+        self.actions = actions
+        self.api = api
+        self.async_api = async_api
+        self._created: Dict[str, Callable] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> Optional[Callable]:
+        action = self._created.get(name)
+        if action is None and name in self.actions:
+            with self._lock:
+                action = self._created.get(name)
+                if action is None:
+                    action = self._create(name)
+                    self._created[name] = action
+
+        return action
+
+    def preload(self) -> None:
+        """Creates every action upfront."""
+
+        for name in self.actions:
+            self.get(name)
+
+    def _create(self, name: str) -> Callable:
+        action = self.actions[name]
+        if self.async_api is not None and getattr(action, "ASYNC", None) is not None:
+            action = action.ASYNC
+
+        if issubclass(action, AsyncBaseAction):
+            if self.async_api is None:
+                raise ValueError(f"Action '{name}' requires the non-blocking API.")
+
+            return action(self.async_api)
+
+        if self.async_api is not None:
+            return SyncActionAdapter(action(self.api))
+
+        return action(self.api)
+
+
+def build_registry(
+    actions: Mapping[str, Type],
+    api: Any,
+    async_api: Optional[Any] = None,
+) -> Registry:
+    """Creates the registry of actions bound to the shared API client.
+
+    Args:
+        actions (Mapping[str, Type]): Action classes by name.
+        api (Any): Shared API client.
+        async_api (Any, optional): Shared non-blocking API client.
+            When given, actions with a non-blocking variant (ASYNC)
+            use it, the others are wrapped with SyncActionAdapter
+            so every action can be awaited.
+
+    Returns:
+        Registry: Actions by name.
+    """
+
+    return Registry(actions, api, async_api)
@@ -0,0 +1,122 @@
+"""Module "actions".
+
+File:
+    templates.py
+
+About:
+    File describing precompiled keyboard templates.
+"""
+
+import json
+import re
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+from funcka_bots.keyboards import Keyboard, ButtonColor
+
+
+LabelSlot = Callable[[str], str]
+ColorSlot = Callable[[str], ButtonColor]
+KeyboardBuilder = Callable[[int, LabelSlot, ColorSlot], Keyboard]
+
+# Stands for the keyboard owner while the template is built.
+_OWNER = 918273645501928
+_SLOT = re.compile(r"@@(\d+)@@")
+
+
+@lru_cache(maxsize=256)
+def _escape(text: str) -> str:
+    # Label texts repeat from click to click.
+    return json.dumps(text, ensure_ascii=False)[1:-1]
+
+
+class KeyboardTemplate:
+    """Keyboard JSON built once, with variable slots filled per request.
+
+    The builder receives the owner id and two slot factories:
+    `label(name)` returns a placeholder to put into a button label,
+    `color(name)` marks the color of the button with that label as
+    variable. Rendering substitutes the owner id, label texts and
+    button colors into the prebuilt JSON string.
+    """
+
+    def __init__(self, build: KeyboardBuilder) -> None:
+        self._slots: List[Tuple[str, Optional[str]]] = [("owner", None)]
+        self._colors: Dict[str, None] = {}
+
+        keyboard = json.loads(build(_OWNER, self._label, self._color).json)
+        for row in keyboard["buttons"]:
+            for button in row:
+                self._mark_color(button)
+
+        skeleton = json.dumps(keyboard, ensure_ascii=False, separators=(",", ":"))
+        skeleton = skeleton.replace(str(_OWNER), "@@0@@")
+
+        # Even items are literal JSON, odd items are slot indexes.
+        self._parts = _SLOT.split(skeleton)
+        self._plan = [
+            (index, *self._slots[int(self._parts[index])])
+            for index in range(1, len(self._parts), 2)
+        ]
+        self._names = [name for kind, name in self._slots if kind == "label"]
+
+    @property
+    def names(self) -> List[str]:
+        """Names of the label slots."""
+
+        return list(self._names)
+
+    def bitmap(self, flags: Dict[str, bool]) -> int:
+        """Packs the on/off state of the label slots into an integer.
+
+        Args:
+            flags (Dict[str, bool]): State of each slot.
+
+        Returns:
+            int: Bitmap of the slot states.
+        """
+
+        return sum(1 << index for index, name in enumerate(self._names) if flags[name])
+
+    def render(
+        self,
+        owner_id: int,
+        labels: Optional[Dict[str, str]] = None,
+        colors: Optional[Dict[str, ButtonColor]] = None,
+    ) -> str:
+        """Returns the keyboard JSON.
+
+        Args:
+            owner_id (int): Keyboard owner UUID.
+            labels (Dict[str, str]): Label text of each slot.
+            colors (Dict[str, ButtonColor]): Button color of each slot.
+
+        Returns:
+            str: Keyboard JSON.
+        """
+
+        owner = str(owner_id)
+        parts = self._parts.copy()
+        for index, kind, name in self._plan:
+            if kind == "owner":
+                parts[index] = owner
+            elif kind == "label":
+                parts[index] = _escape(labels[name])
+            else:
+                parts[index] = colors[name].value
+
+        return "".join(parts)
+
+    def _label(self, name: str) -> str:
+        self._slots.append(("label", name))
+        return f"@@{len(self._slots) - 1}@@"
+
+    def _color(self, name: str) -> ButtonColor:
+        self._colors[name] = None
+        return ButtonColor.SECONDARY
+
+    def _mark_color(self, button: dict) -> None:
+        for match in _SLOT.finditer(button["action"].get("label", "")):
+            kind, name = self._slots[int(match.group(1))]
+            if kind == "label" and name in self._colors:
+                self._slots.append(("color", name))
+                button["color"] = f"@@{len(self._slots) - 1}@@"
@@ -0,0 +1,21 @@
+"""Module "api".
+
+File:
+    __init__.py
+
+About:
+    Initializing the "api" module.
+"""
+
+from .session import VkSession
+from .aio import AsyncVkSession
+from .batch import ExecuteBatcher
+from .limiter import RateLimiter
+
+
+__all__ = (
+    "VkSession",
+    "AsyncVkSession",
+    "ExecuteBatcher",
+    "RateLimiter",
+)
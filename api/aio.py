@@ -0,0 +1,139 @@
+"""Module "api".
+
+File:
+    aio.py
+
+About:
+    File describing a non-blocking VK API session
+    with a shared keep-alive connection pool.
+"""
+
+import asyncio
+import importlib
+import time
+from typing import Any, Optional
+from loguru import logger
+from vk_api.exceptions import ApiError, TOO_MANY_RPS_CODE
+from tracing import span
+from metrics import dependency_seconds
+from .session import VK_METHOD_URL
+from .limiter import RateLimiter
+
+
+class AsyncVkSession:
+    """Non-blocking VK API session shared by all events of the service.
+
+    The aiohttp client session is created on the first call,
+    so the object can be constructed outside the event loop.
+    Requests wait for the `limiter`, if any, and fail after
+    `timeout` seconds.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        api_version: str,
+        pool_size: int = 100,
+        base_url: str = VK_METHOD_URL,
+        limiter: Optional[RateLimiter] = None,
+        timeout: float = 10,
+    ) -> None:
+        self.token = token
+        self.api_version = api_version
+        self.pool_size = pool_size
+        self.base_url = base_url
+        self.limiter = limiter
+        self.timeout = timeout
+        self._http: Optional[Any] = None
+
+    def get_api(self) -> "AsyncVkApiMethod":
+        return AsyncVkApiMethod(self)
+
+    async def method(self, method: str, values: Optional[dict] = None, raw: bool = False) -> Any:
+        values = values.copy() if values else {}
+        values.setdefault("v", self.api_version)
+        values["access_token"] = self.token
+
+        while True:
+            response = await self._request(method, values)
+            if "error" not in response:
+                return response if raw else response["response"]
+
+            error = ApiError(self, method, values, raw, response["error"])
+            if error.code != TOO_MANY_RPS_CODE:
+                raise error
+
+            # Same as VkSession: wait and repeat the request.
+            logger.warning("Too many requests! Sleeping 0.5 sec...")
+            await asyncio.sleep(0.5)
+
+    async def _request(self, method: str, values: dict) -> dict:
+        if self.limiter is not None:
+            priority = self.limiter.priority_of(method)
+            if not self.limiter.try_acquire():
+                await asyncio.to_thread(self.limiter.acquire, priority)
+
+        start = time.perf_counter()
+        try:
+            with span(f"vk.{method}"):
+                http = self._get_http()
+                async with http.post(self.base_url + method, data=values) as response:
+                    response.raise_for_status()
+                    return await response.json(content_type=None)
+
+        finally:
+            dependency_seconds.observe(time.perf_counter() - start, "vk", method)
+
+    async def close(self) -> None:
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+
+    def warm(self) -> None:
+        """Imports the HTTP client ahead of the first call.
+        Connections are opened on the event loop."""
+
+        importlib.import_module("aiohttp")
+
+    def _get_http(self) -> Any:
+        if self._http is None or self._http.closed:
+            # Only the asyncio mode pays for importing aiohttp.
+            aiohttp = importlib.import_module("aiohttp")
+            connector = aiohttp.TCPConnector(limit=self.pool_size)
+            self._http = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+
+        return self._http
+
+
+class AsyncVkApiMethod:
+    """Gives access to API methods the same way VkApiMethod does:
+
+    >>> api = AsyncVkSession(...).get_api()
+    >>> await api.messages.edit(peer_id=..., ...)
+    """
+
+    __slots__ = ("_session", "_method")
+
+    def __init__(self, session: AsyncVkSession, method: Optional[str] = None) -> None:
+        self._session = session
+        self._method = method
+
+    def __getattr__(self, method: str) -> "AsyncVkApiMethod":
+        if "_" in method:
+            parts = method.split("_")
+            method = parts[0] + "".join(part.title() for part in parts[1:])
+
+        return AsyncVkApiMethod(
+            self._session,
+            (self._method + "." if self._method else "") + method,
+        )
+
+    async def __call__(self, **kwargs) -> Any:
+        for key, value in kwargs.items():
+            if isinstance(value, (list, tuple)):
+                kwargs[key] = ",".join(str(item) for item in value)
+
+        return await self._session.method(self._method, kwargs)
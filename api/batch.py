@@ -0,0 +1,150 @@
+"""Module "api".
+
+File:
+    batch.py
+
+About:
+    File describing a batcher that merges VK API
+    calls into "execute" requests.
+"""
+
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+from typing import Any, List, Optional, Tuple
+from vk_api.vk_api import VkApiMethod
+from vk_api.exceptions import ApiError
+from tracing import span
+from .session import VkSession
+
+
+Call = Tuple[str, dict, Future]
+
+
+class ExecuteBatcher:
+    """Merges VK API calls made within `window` seconds of each
+    other into one "execute" request of up to `max_calls` calls,
+    then hands each result back to its caller.
+
+    The batcher exposes the same `method` as VkApi, so the usual
+    VkApiMethod interface is available through `get_api`. A caller
+    waits at most `timeout` seconds for its result; a call still
+    queued by then is not sent.
+    """
+
+    MAX_CALLS = 25
+
+    def __init__(
+        self,
+        session: VkSession,
+        window: float = 0.005,
+        max_calls: int = MAX_CALLS,
+        timeout: Optional[float] = None,
+    ) -> None:
+        self.session = session
+        self.window = window
+        self.max_calls = min(max_calls, self.MAX_CALLS)
+        self.timeout = timeout
+
+        self._calls: "queue.Queue[Call]" = queue.Queue()
+        self._senders = ThreadPoolExecutor(
+            max_workers=session.pool_size,
+            thread_name_prefix="execute",
+        )
+        self._collector = threading.Thread(target=self._collect, daemon=True)
+        self._collector.start()
+
+    def get_api(self) -> VkApiMethod:
+        return VkApiMethod(self)
+
+    def method(self, method: str, values: Optional[dict] = None, raw: bool = False) -> Any:
+        future = Future()
+        with span(f"vk.{method}", batched=True):
+            self._calls.put((method, values or {}, future))
+            try:
+                return future.result(self.timeout)
+            except TimeoutError:
+                future.cancel()
+                raise
+
+    def _collect(self) -> None:
+        while True:
+            batch = [self._calls.get()]
+            deadline = time.monotonic() + self.window
+
+            while len(batch) < self.max_calls:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+
+                try:
+                    batch.append(self._calls.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            self._senders.submit(self._send, batch)
+
+    def _send(self, batch: List[Call]) -> None:
+        # Calls whose callers gave up waiting are dropped.
+        batch = [call for call in batch if call[2].set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        if len(batch) == 1:
+            method, values, future = batch[0]
+            try:
+                future.set_result(self.session.method(method, values))
+            except Exception as error:
+                future.set_exception(error)
+            return
+
+        priority = None
+        if self.session.limiter is not None:
+            priority = min(self.session.limiter.priority_of(call[0]) for call in batch)
+
+        try:
+            response = self.session.method(
+                "execute",
+                {"code": self._code(batch)},
+                raw=True,
+                priority=priority,
+            )
+        except Exception as error:
+            for _, _, future in batch:
+                future.set_exception(error)
+            return
+
+        try:
+            self._fan_out(batch, response)
+        except Exception as error:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+
+    def _fan_out(self, batch: List[Call], response: dict) -> None:
+        results = response["response"]
+        if len(results) != len(batch):
+            raise ValueError(
+                f"execute returned {len(results)} results for {len(batch)} calls"
+            )
+
+        # Each failed call returns false and adds an entry naming its
+        # method to execute_errors, in the order the calls were made.
+        # A false result without the matching entry is a real result.
+        errors = list(response.get("execute_errors", []))
+        for (method, values, future), result in zip(batch, results):
+            if result is False and errors and errors[0].get("method") == method:
+                error = errors.pop(0)
+                future.set_exception(ApiError(self.session, method, values, False, error))
+            else:
+                future.set_result(result)
+
+    @staticmethod
+    def _code(batch: List[Call]) -> str:
+        calls = ",".join(
+            f"API.{method}({json.dumps(values, ensure_ascii=False)})"
+            for method, values, _ in batch
+        )
+        return f"return [{calls}];"
@@ -0,0 +1,113 @@
+"""Module "api".
+
+File:
+    limiter.py
+
+About:
+    File describing a client-side VK API rate limiter.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from typing import Dict
+
+
+# Lower value is served first.
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+
+method_priorities: Dict[str, int] = {
+    # Snackbars must be answered within the VK callback window.
+    "messages.sendMessageEventAnswer": PRIORITY_HIGH,
+}
+
+
+class RateLimiter:
+    """Token bucket shared by all VK API requests of the service.
+
+    The bucket holds up to `burst` tokens and refills at `rate`
+    tokens per second. Each request takes one token. Callers
+    wait in line instead of failing, higher priority first.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+
+        self._cond = threading.Condition()
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._waiters = []
+        self._tickets = itertools.count()
+
+        self._waited = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    @staticmethod
+    def priority_of(method: str) -> int:
+        return method_priorities.get(method, PRIORITY_NORMAL)
+
+    def try_acquire(self) -> bool:
+        """Takes a token if one is available and nobody waits.
+
+        Returns:
+            bool: Whether the token was taken.
+        """
+
+        with self._cond:
+            self._refill()
+            if self._waiters or self._tokens < 1:
+                return False
+
+            self._tokens -= 1
+            self._account(0.0)
+            return True
+
+    def acquire(self, priority: int = PRIORITY_NORMAL) -> None:
+        """Takes a token, waiting for it if the bucket is empty.
+
+        Args:
+            priority (int): Place in line, lower is served first.
+        """
+
+        start = time.monotonic()
+        with self._cond:
+            ticket = (priority, next(self._tickets))
+            heapq.heappush(self._waiters, ticket)
+
+            while True:
+                self._refill()
+                first = self._waiters[0] == ticket
+                if first and self._tokens >= 1:
+                    break
+
+                timeout = (1 - self._tokens) / self.rate if first else None
+                self._cond.wait(timeout)
+
+            heapq.heappop(self._waiters)
+            self._tokens -= 1
+            self._account(time.monotonic() - start)
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, float]:
+        with self._cond:
+            self._refill()
+            return {
+                "level": self._tokens,
+                "waiting": len(self._waiters),
+                "wait_avg": self._wait_total / self._waited if self._waited else 0.0,
+                "wait_max": self._wait_max,
+            }
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _account(self, wait: float) -> None:
+        self._waited += 1
+        self._wait_total += wait
+        self._wait_max = max(self._wait_max, wait)
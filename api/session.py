@@ -0,0 +1,160 @@
+"""Module "api".
+
+File:
+    session.py
+
+About:
+    File describing a long-lived VK API session
+    with a pooled keep-alive HTTP connection.
+"""
+
+import threading
+import time
+from typing import Optional
+import requests
+from requests.adapters import HTTPAdapter
+from vk_api import VkApi
+from vk_api.exceptions import ApiError, ApiHttpError
+from vk_api.vk_api import DEFAULT_USERAGENT
+from tracing import span
+from metrics import dependency_seconds
+from .limiter import RateLimiter
+
+
+VK_METHOD_URL = "https://api.vk.com/method/"
+
+
+class VkSession(VkApi):
+    """VK API session shared by all events of the service.
+
+    Unlike the stock VkApi, requests are not serialized by a global
+    lock, and the underlying HTTP session keeps up to `pool_size`
+    connections alive. The HTTP session is rebuilt after a
+    connection failure. Requests wait for the `limiter`, if any,
+    and fail after `timeout` seconds.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        api_version: str,
+        pool_size: int = 10,
+        base_url: str = VK_METHOD_URL,
+        limiter: Optional[RateLimiter] = None,
+        timeout: float = 10,
+    ) -> None:
+        self.pool_size = pool_size
+        self.base_url = base_url
+        self.limiter = limiter
+        self.timeout = timeout
+        self._rebuild_lock = threading.Lock()
+        self._generation = 0
+        super().__init__(
+            token=token,
+            api_version=api_version,
+            session=self._make_http(pool_size),
+        )
+
+    @staticmethod
+    def _make_http(pool_size: int) -> requests.Session:
+        http = requests.Session()
+        http.headers["User-agent"] = DEFAULT_USERAGENT
+
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        http.mount("https://", adapter)
+        http.mount("http://", adapter)
+
+        return http
+
+    def warm(self, timeout: float = 5) -> None:
+        """Opens a pooled connection to the method endpoint,
+        without calling a method."""
+
+        self.http.head(self.base_url, timeout=timeout).close()
+
+    def rebuild(self, generation: Optional[int] = None) -> None:
+        """Replaces the HTTP session, dropping all pooled connections.
+
+        Args:
+            generation (int, optional): Generation of the session that
+                failed. When the session was already replaced since,
+                it is kept: concurrent failures rebuild it only once.
+        """
+
+        with self._rebuild_lock:
+            if generation is not None and generation != self._generation:
+                return
+
+            old_http = self.http
+            self.http = self._make_http(self.pool_size)
+            self._generation += 1
+
+        old_http.close()
+
+    def method(
+        self,
+        method,
+        values=None,
+        captcha_sid=None,
+        captcha_key=None,
+        raw=False,
+        priority=None,
+    ):
+        values = values.copy() if values else {}
+        values.setdefault("v", self.api_version)
+
+        if self.token:
+            values["access_token"] = self.token["access_token"]
+
+        if captcha_sid and captcha_key:
+            values["captcha_sid"] = captcha_sid
+            values["captcha_key"] = captcha_key
+
+        if self.limiter is not None:
+            if priority is None:
+                priority = self.limiter.priority_of(method)
+            self.limiter.acquire(priority)
+
+        response = self._post(method, values)
+
+        if not response.ok:
+            error = ApiHttpError(self, method, values, raw, response)
+            result = self.http_handler(error)
+            if result is not None:
+                return result
+
+            raise error
+
+        response = response.json()
+        if "error" in response:
+            error = ApiError(self, method, values, raw, response["error"])
+            handler = self.error_handlers.get(error.code)
+            if handler is not None:
+                result = handler(error)
+                if result is not None:
+                    return result
+
+            raise error
+
+        return response if raw else response["response"]
+
+    def _post(self, method: str, values: dict) -> requests.Response:
+        start = time.perf_counter()
+        try:
+            with span(f"vk.{method}"):
+                return self._send(self.base_url + method, values)
+
+        finally:
+            dependency_seconds.observe(time.perf_counter() - start, "vk", method)
+
+    def _send(self, url: str, values: dict) -> requests.Response:
+        generation, http = self._generation, self.http
+        try:
+            return http.post(url, values, headers={"Cookie": ""}, timeout=self.timeout)
+
+        except requests.ConnectionError:
+            # The pooled connection is most likely stale: start over
+            # with a fresh pool and repeat the request once. Requests
+            # failing on the same pool share one rebuild.
+            self.rebuild(generation)
+            return self.http.post(url, values, headers={"Cookie": ""}, timeout=self.timeout)
@@ -0,0 +1,16 @@
+"""Module "bench".
+
+File:
+    __init__.py
+
+About:
+    Initializing the "bench" module. Contains offline
+    benchmarks of the service hot path. Benchmarks are
+    started as modules, e.g. `python -m bench.session`.
+"""
+
+import os
+
+# Benchmarks run offline, without the service environment.
+os.environ.setdefault("vk_group_token", "token")
+os.environ.setdefault("vk_group_id", "0")
@@ -0,0 +1,84 @@
+"""Module "bench".
+
+File:
+    answer.py
+
+About:
+    Benchmark of the click-to-snackbar latency with the
+    message edit and the snackbar sent one after the other
+    versus at the same time.
+
+Usage:
+    python -m bench.answer [--events N] [--latency SECONDS]
+"""
+
+import argparse
+import time
+from types import SimpleNamespace
+from statistics import median
+from funcka_bots.events import BaseEvent
+from actions.base import BaseAction
+from api import VkSession
+from .vk_stub import VkStub
+
+
+class _Action(BaseAction):
+    NAME = "bench_answer"
+
+    def __init__(self, api, concurrent: bool) -> None:
+        super().__init__(api)
+        self.concurrent = concurrent
+        self.answered_at = 0.0
+
+    def _handle(self, event: BaseEvent) -> bool:
+        if self.concurrent:
+            self.respond(event, "snackbar", "message", "{}")
+            return True
+
+        self.api.messages.edit(
+            peer_id=event.peer.bpid,
+            conversation_message_id=event.button.cmid,
+            message="message",
+            keyboard="{}",
+        )
+        self.snackbar(event, "snackbar")
+        return True
+
+    def snackbar(self, event: BaseEvent, text: str) -> None:
+        super().snackbar(event, text)
+        self.answered_at = time.perf_counter()
+
+
+def click_to_snackbar(action: _Action, event) -> float:
+    start = time.perf_counter()
+    action(event)
+    return action.answered_at - start
+
+
+def report(name: str, samples: list) -> None:
+    samples = sorted(samples)
+    p99 = samples[int(len(samples) * 0.99) - 1]
+    print(f"{name:<12} p50={median(samples) * 1e3:.3f}ms p99={p99 * 1e3:.3f}ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+
+    event = SimpleNamespace(
+        peer=SimpleNamespace(bpid=1),
+        user=SimpleNamespace(uuid=1),
+        button=SimpleNamespace(cmid=1, beid="beid"),
+    )
+
+    with VkStub(latency=args.latency) as stub:
+        api = VkSession(token="token", api_version="5.199", base_url=stub.url).get_api()
+        for name, concurrent in (("sequential", False), ("concurrent", True)):
+            action = _Action(api, concurrent)
+            report(name, [click_to_snackbar(action, event) for _ in range(args.events)])
+
+
+if __name__ == "__main__":
+    main()
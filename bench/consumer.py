@@ -0,0 +1,124 @@
+"""Module "bench".
+
+File:
+    consumer.py
+
+About:
+    Benchmark of the broker consumer against the in-memory
+    broker stand-in: throughput at several prefetch sizes,
+    and delivery of every event across a consumer restart.
+
+Usage:
+    python -m bench.consumer [--events N] [--prefetch 1,10,50,200]
+        [--workers N] [--work S] [--latency S] [--ack-batch N]
+"""
+
+import argparse
+import itertools
+import pickle
+import threading
+import time
+from collections import Counter
+from types import SimpleNamespace
+from loguru import logger
+from consumer import Consumer, MemoryBroker
+from dispatch import dispatcher_list
+
+
+QUEUE_NAME = "button"
+
+
+def publish(broker: MemoryBroker, events: int) -> None:
+    for event_id in range(events):
+        event = SimpleNamespace(event_id=event_id, peer=SimpleNamespace(bpid=event_id % 50))
+        broker.publish(QUEUE_NAME, pickle.dumps(event))
+
+
+def handler(work: float, handled: Counter, lock: threading.Lock):
+    def handle(event) -> None:
+        time.sleep(work)
+        with lock:
+            handled[event.event_id] += 1
+
+    return handle
+
+
+def run(args, prefetch: int) -> None:
+    broker = MemoryBroker()
+    publish(broker, args.events)
+    broker.close()
+
+    handled, lock = Counter(), threading.Lock()
+    channel = broker.channel(latency=args.latency)
+    consumer = Consumer(channel, QUEUE_NAME, prefetch=prefetch, ack_batch=args.ack_batch)
+    dispatcher = dispatcher_list["thread"](
+        handler(args.work, handled, lock),
+        workers=args.workers,
+        ordering="none",
+        done=consumer.done,
+    )
+
+    start = time.perf_counter()
+    dispatcher.run(consumer.events())
+    consumer.close()
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"prefetch={prefetch:<4} events={len(handled)} "
+        f"throughput={len(handled) / elapsed:.1f}/s acks={channel.acks} "
+        f"left={broker.size(QUEUE_NAME)}"
+    )
+
+
+def restart(args) -> None:
+    """Stops the first consumer abruptly half way,
+    a second one takes over the queue."""
+
+    broker = MemoryBroker()
+    publish(broker, args.events)
+    broker.close()
+    handled, lock = Counter(), threading.Lock()
+
+    for limit in (args.events // 2, None):
+        channel = broker.channel(latency=args.latency)
+        consumer = Consumer(channel, QUEUE_NAME, prefetch=50, ack_batch=args.ack_batch)
+        dispatcher = dispatcher_list["thread"](
+            handler(args.work, handled, lock),
+            workers=args.workers,
+            ordering="none",
+            done=consumer.done,
+        )
+        dispatcher.run(itertools.islice(consumer.events(), limit))
+        if limit is not None:
+            # No final ack: the process is gone.
+            channel.close()
+        else:
+            consumer.close()
+
+    lost = args.events - len(handled)
+    duplicates = sum(count - 1 for count in handled.values())
+    print(
+        f"restart      events={len(handled)} lost={lost} "
+        f"redelivered={broker.redelivered} handled_twice={duplicates}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--prefetch", default="1,10,50,200")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--work", type=float, default=0.005)
+    parser.add_argument("--latency", type=float, default=0.002)
+    parser.add_argument("--ack-batch", type=int, default=20)
+    args = parser.parse_args()
+
+    logger.remove()
+    for prefetch in map(int, args.prefetch.split(",")):
+        run(args, prefetch)
+
+    restart(args)
+
+
+if __name__ == "__main__":
+    main()
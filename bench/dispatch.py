@@ -0,0 +1,59 @@
+"""Module "bench".
+
+File:
+    dispatch.py
+
+About:
+    Microbenchmark of the per-event action dispatch
+    overhead: constructing the action for every event
+    versus calling a prebuilt one from the registry.
+
+Usage:
+    python -m bench.dispatch [--number N]
+"""
+
+import argparse
+import timeit
+from actions import action_list, build_registry
+from actions.base import SyncActionAdapter
+from api import VkSession
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=100000)
+    args = parser.parse_args()
+
+    api = VkSession(token="token", api_version="5.199").get_api()
+    names = list(action_list)
+    registry = build_registry(action_list, api)
+    async_registry = build_registry(action_list, api, async_api=api)
+
+    def constructed() -> None:
+        for name in names:
+            action_list.get(name)(api)
+
+    def constructed_async() -> None:
+        for name in names:
+            SyncActionAdapter(action_list.get(name)(api))
+
+    def prebuilt() -> None:
+        for name in names:
+            registry.get(name)
+
+    def prebuilt_async() -> None:
+        for name in names:
+            async_registry.get(name)
+
+    for label, function in (
+        ("constructed", constructed),
+        ("prebuilt", prebuilt),
+        ("constructed-async", constructed_async),
+        ("prebuilt-async", prebuilt_async),
+    ):
+        elapsed = timeit.timeit(function, number=args.number)
+        print(f"{label:<18} {elapsed / args.number / len(names) * 1e9:.1f}ns/event")
+
+
+if __name__ == "__main__":
+    main()
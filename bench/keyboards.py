@@ -0,0 +1,61 @@
+"""Module "bench".
+
+File:
+    keyboards.py
+
+About:
+    Microbenchmark of the per-click keyboard build and
+    serialisation time of the settings and punishment menus,
+    built with Keyboard versus rendered from a template.
+
+Usage:
+    python -m bench.keyboards [--number N]
+"""
+
+import argparse
+import timeit
+from funcka_bots.keyboards import ButtonColor
+from actions.actions import (
+    SystemsSettings,
+    FiltersSettings,
+    SystemsPunishment,
+    FiltersPunishment,
+)
+
+
+def label(name: str) -> str:
+    return "Вкл."
+
+
+def color(name: str) -> ButtonColor:
+    return ButtonColor.POSITIVE
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=10000)
+    args = parser.parse_args()
+
+    for action in (SystemsSettings, FiltersSettings, SystemsPunishment, FiltersPunishment):
+        page = 1
+        template = action.MENU.templates[page]
+        labels = {name: "Вкл." for name in template.names}
+        colors = {name: ButtonColor.POSITIVE for name in template.names}
+
+        built = timeit.timeit(
+            lambda: action.MENU.keyboard(page, 1, label, color).json,
+            number=args.number,
+        )
+        rendered = timeit.timeit(
+            lambda: template.render(1, labels, colors),
+            number=args.number,
+        )
+        print(
+            f"{action.NAME:<20} "
+            f"build={built / args.number * 1e6:.2f}us "
+            f"template={rendered / args.number * 1e6:.2f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
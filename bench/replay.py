@@ -0,0 +1,415 @@
+"""Module "bench".
+
+File:
+    replay.py
+
+About:
+    Benchmark replaying button events through ButtonHandler
+    against the local VK and SQL stand-ins. Events are read
+    from a JSON Lines recording or generated in the proportions
+    of production traffic.
+
+    Every concurrency level prints one line with fixed fields,
+    so results of two commits compare line by line. With
+    `--processes`, events are also replayed through the
+    supervisor at each number of worker processes.
+
+Usage:
+    python -m bench.replay [--events N] [--record PATH]
+        [--concurrency 1,4,16] [--handler sync|async]
+        [--vk-latency S] [--vk-distribution NAME] [--vk-rate-limit RPS]
+        [--vk-error-rate SHARE] [--sql-latency S] [--seed N] [--json]
+        [--processes 1,2,4,8]
+
+Recording format:
+    One event per line:
+    {"peer": {"bpid": 1, "name": "..."},
+     "user": {"uuid": 1, "name": "..."},
+     "button": {"cmid": 1, "beid": "...", "payload": {...}}}
+"""
+
+import os
+
+# The VK stand-in is not rate limited.
+os.environ.setdefault("vk_rate_limit", "0")
+# The same events are replayed several times.
+os.environ.setdefault("dedup_event_window", "0")
+os.environ.setdefault("dedup_click_window", "0")
+# Every click is measured, not merged into a later edit.
+os.environ.setdefault("coalesce_window", "0")
+
+import argparse
+import asyncio
+import atexit
+import json
+import random
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from types import SimpleNamespace
+from typing import Any, Dict, List
+from loguru import logger
+from toaster.enums import UserPermission, PeerMark
+from actions import action_list
+from actions.actions import SystemsSettings, FiltersSettings
+from handler import ButtonHandler, AsyncButtonHandler
+from dispatch import dispatcher_list, Supervisor
+from db import backend
+from .sql_stub import SqlStub
+from .vk_stub import VkStub
+import config
+
+
+# Share of each action in production traffic, per mille.
+PROPORTIONS = {
+    "systems_settings": 140,
+    "filters_settings": 140,
+    "change_delay": 120,
+    "change_punishment": 120,
+    "systems_punishment": 80,
+    "filters_punishment": 80,
+    "close_menu": 80,
+    "game_roll": 50,
+    "game_coinflip": 50,
+    "set_permission": 30,
+    "drop_permission": 30,
+    "set_mark": 20,
+    "update_peer_data": 20,
+    "drop_mark": 20,
+    "reject_access": 10,
+    "error": 10,
+}
+
+SYSTEMS = {page: t.names for page, t in SystemsSettings.MENU.templates.items()}
+FILTERS = {page: t.names for page, t in FiltersSettings.MENU.templates.items()}
+SETTINGS = [name for names in (*SYSTEMS.values(), *FILTERS.values()) for name in names]
+
+PEERS = 50
+USERS = 200
+
+
+def _payload(action_name: str, rng: random.Random) -> Dict[str, Any]:
+    payload = {"action_name": action_name}
+
+    if action_name in ("systems_settings", "filters_settings"):
+        pages, key = (
+            (SYSTEMS, "system_name")
+            if action_name == "systems_settings"
+            else (FILTERS, "filter_name")
+        )
+        page = rng.choice(list(pages))
+        payload["page"] = str(page)
+        if rng.random() < 0.5:
+            payload["action_context"] = "change_status"
+            payload[key] = rng.choice(pages[page])
+
+    elif action_name == "systems_punishment":
+        payload["page"] = str(rng.choice(list(SYSTEMS)))
+
+    elif action_name == "filters_punishment":
+        payload["page"] = str(rng.choice(list(FILTERS)))
+
+    elif action_name == "change_delay":
+        payload["setting_name"] = rng.choice(("slow_mode", "account_age"))
+        if rng.random() < 0.7:
+            payload["action_context"] = rng.choice(("add_time", "subtract_time"))
+            payload["time"] = rng.choice((1, 10))
+
+    elif action_name == "change_punishment":
+        payload["setting_name"] = rng.choice(SETTINGS)
+        if rng.random() < 0.7:
+            payload["action_context"] = rng.choice(("add_points", "subtract_points"))
+            payload["points"] = rng.choice((1, 3))
+
+    elif action_name == "set_mark":
+        payload["mark"] = rng.choice(list(PeerMark)).value
+
+    elif action_name in ("set_permission", "drop_permission"):
+        payload["target"] = rng.randrange(USERS)
+        payload["permission"] = rng.choice(list(UserPermission)).value
+
+    return payload
+
+
+def synthetic_events(count: int, seed: int) -> List[Dict[str, Any]]:
+    """Generates `count` events in the PROPORTIONS of production traffic."""
+
+    rng = random.Random(seed)
+    names = list(PROPORTIONS)
+    weights = list(PROPORTIONS.values())
+    events = []
+    for cmid, action_name in enumerate(rng.choices(names, weights, k=count)):
+        bpid = 2000000000 + rng.randrange(PEERS)
+        uuid = rng.randrange(USERS)
+        payload = _payload(action_name, rng)
+        payload["keyboard_owner"] = uuid
+        events.append(
+            {
+                "peer": {"bpid": bpid, "name": f"peer {bpid}"},
+                "user": {"uuid": uuid, "name": f"user {uuid}"},
+                "button": {"cmid": cmid, "beid": f"beid-{cmid}", "payload": payload},
+            }
+        )
+
+    return events
+
+
+def recorded_events(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def to_event(record: Dict[str, Any]) -> SimpleNamespace:
+    return SimpleNamespace(
+        event_id=record["button"]["beid"],
+        peer=SimpleNamespace(**record["peer"]),
+        user=SimpleNamespace(**record["user"]),
+        button=SimpleNamespace(**record["button"]),
+    )
+
+
+class Replayer:
+    """Handles events with the sync handler from a thread pool,
+    or with the async handler on one event loop."""
+
+    def __init__(self, handler: ButtonHandler) -> None:
+        self.handler = handler
+        # Events whose error answer failed too, e.g. on injected 5xx.
+        self.failed = 0
+        self._loop = None
+        if isinstance(handler, AsyncButtonHandler):
+            self._loop = asyncio.new_event_loop()
+
+    def handle(self, event) -> None:
+        try:
+            if self._loop is None:
+                self.handler(event)
+            else:
+                self._loop.run_until_complete(self.handler(event))
+
+        except Exception:
+            self.failed += 1
+
+    def timings(self, events: list, concurrency: int) -> List[float]:
+        if self._loop is not None:
+            return self._loop.run_until_complete(self._timings(events, concurrency))
+
+        def timed(event) -> float:
+            start = time.perf_counter()
+            self.handle(event)
+            return time.perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            return list(pool.map(timed, events))
+
+    async def _timings(self, events: list, concurrency: int) -> List[float]:
+        slots = asyncio.Semaphore(concurrency)
+
+        async def timed(event) -> float:
+            async with slots:
+                start = time.perf_counter()
+                try:
+                    await self.handler(event)
+                except Exception:
+                    self.failed += 1
+                return time.perf_counter() - start
+
+        return await asyncio.gather(*(timed(event) for event in events))
+
+    def close(self) -> None:
+        if self._loop is not None:
+            self._loop.run_until_complete(self.handler.close())
+            self._loop.close()
+
+
+def percentile(samples: List[float], share: float) -> float:
+    return samples[max(int(len(samples) * share) - 1, 0)]
+
+
+def run(replayer: Replayer, events: list, concurrency: int) -> Dict[str, float]:
+    replayer.failed = 0
+    start = time.perf_counter()
+    samples = sorted(replayer.timings(events, concurrency))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "events": len(events),
+        "failed": replayer.failed,
+        "throughput": len(events) / elapsed,
+        "p50_ms": percentile(samples, 0.50) * 1e3,
+        "p95_ms": percentile(samples, 0.95) * 1e3,
+        "p99_ms": percentile(samples, 0.99) * 1e3,
+    }
+
+
+def allocations(replayer: Replayer, events: list) -> Dict[str, float]:
+    """Measures memory blocks and peak bytes allocated per event,
+    handling events one at a time."""
+
+    blocks = peak = 0
+    tracemalloc.start()
+    for event in events:
+        tracemalloc.reset_peak()
+        before_blocks = len(tracemalloc.take_snapshot().traces)
+        before, _ = tracemalloc.get_traced_memory()
+        replayer.handle(event)
+        _, event_peak = tracemalloc.get_traced_memory()
+        blocks += len(tracemalloc.take_snapshot().traces) - before_blocks
+        peak += event_peak - before
+    tracemalloc.stop()
+
+    return {
+        "retained_blocks": blocks / len(events),
+        "peak_kib": peak / len(events) / 1024,
+    }
+
+
+def use_sql_stub(latency: float, peers: List[int]) -> SqlStub:
+    stub = SqlStub(
+        systems=[name for names in SYSTEMS.values() for name in names],
+        filters=[name for names in FILTERS.values() for name in names],
+        latency=latency,
+        peers=peers,
+    )
+    backend.use(stub)
+    backend.use_engine(stub.engine)
+    return stub
+
+
+def replay_worker(options: Dict[str, Any], done):
+    """Builds the dispatcher of a supervisor worker process."""
+
+    logger.remove()
+    atexit.register(use_sql_stub(options["sql_latency"], options["peers"]).close)
+    config.VK_API_URL = options["vk_url"]
+    if options["handler"] == "async":
+        handler, mode = AsyncButtonHandler(), "asyncio"
+    else:
+        handler, mode = ButtonHandler(), "thread"
+
+    handler._actions.preload()
+    return dispatcher_list[mode](
+        handler, workers=options["concurrency"], ordering="peer", done=done
+    )
+
+
+def run_processes(events: list, processes: int, options: Dict[str, Any]) -> Dict[str, float]:
+    finished = []
+    supervisor = Supervisor(
+        partial(replay_worker, options), processes, done=finished.append
+    )
+    supervisor.start()
+
+    start = time.perf_counter()
+    supervisor.run(events)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "processes": processes,
+        "concurrency": options["concurrency"],
+        "events": len(finished),
+        "restarts": supervisor.restarts,
+        "throughput": len(finished) / elapsed,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--record", help="JSON Lines file of recorded events")
+    parser.add_argument("--concurrency", default="1,4,16")
+    parser.add_argument("--handler", choices=("sync", "async"), default="sync")
+    parser.add_argument("--vk-latency", type=float, default=0.02)
+    parser.add_argument("--vk-distribution", default="constant")
+    parser.add_argument("--vk-rate-limit", type=int, default=0)
+    parser.add_argument("--vk-error-rate", type=float, default=0.0)
+    parser.add_argument("--sql-latency", type=float, default=0.002)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--alloc-events", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print JSON lines")
+    parser.add_argument("--processes", help="worker processes, e.g. 1,2,4,8")
+    args = parser.parse_args()
+
+    logger.remove()
+    if args.record is not None:
+        records = recorded_events(args.record)[: args.events]
+    else:
+        records = synthetic_events(args.events, args.seed)
+    events = [to_event(record) for record in records]
+    assert {e.button.payload.get("action_name") for e in events} <= set(action_list)
+
+    peers = sorted({event.peer.bpid for event in events})
+    sql = use_sql_stub(args.sql_latency, peers)
+    stub = VkStub(
+        latency=args.vk_latency,
+        distribution=args.vk_distribution,
+        rate_limit=args.vk_rate_limit,
+        error_rate=args.vk_error_rate,
+        seed=args.seed,
+    )
+    with stub:
+        config.VK_API_URL = stub.url
+        handler = AsyncButtonHandler() if args.handler == "async" else ButtonHandler()
+        replayer = Replayer(handler)
+
+        for event in events[: args.warmup]:
+            replayer.handle(event)
+
+        memory = allocations(replayer, events[: args.alloc_events])
+        for concurrency in map(int, args.concurrency.split(",")):
+            result = {**run(replayer, events, concurrency), **memory}
+            if args.json:
+                print(json.dumps(result, sort_keys=True))
+            else:
+                print(
+                    f"replay concurrency={result['concurrency']:<3} "
+                    f"events={result['events']} "
+                    f"failed={result['failed']} "
+                    f"throughput={result['throughput']:.1f}/s "
+                    f"p50={result['p50_ms']:.3f}ms "
+                    f"p95={result['p95_ms']:.3f}ms "
+                    f"p99={result['p99_ms']:.3f}ms "
+                    f"alloc_peak={result['peak_kib']:.1f}KiB "
+                    f"alloc_retained={result['retained_blocks']:.1f}blocks"
+                )
+
+        replayer.close()
+
+        concurrency = max(map(int, args.concurrency.split(",")))
+        options = {
+            "vk_url": stub.url,
+            "sql_latency": args.sql_latency,
+            "peers": peers,
+            "handler": args.handler,
+            "concurrency": concurrency,
+        }
+        for processes in map(int, args.processes.split(",") if args.processes else ()):
+            result = run_processes(events, processes, options)
+            if args.json:
+                print(json.dumps(result, sort_keys=True))
+            else:
+                print(
+                    f"replay processes={result['processes']:<2} "
+                    f"concurrency={result['concurrency']:<3} "
+                    f"events={result['events']} "
+                    f"restarts={result['restarts']} "
+                    f"throughput={result['throughput']:.1f}/s"
+                )
+
+        vk = stub.stats()
+        if args.json:
+            print(json.dumps({"vk": vk}, sort_keys=True))
+        else:
+            print(
+                "replay vk "
+                + " ".join(f"{k}={v}" for k, v in sorted(vk["outcomes"].items()))
+            )
+
+    sql.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Module "bench".
+
+File:
+    session.py
+
+About:
+    Benchmark of the per-event VK API latency with
+    a session created per call versus one shared session.
+
+Usage:
+    python -m bench.session [--events N]
+"""
+
+import argparse
+import time
+from statistics import median
+from api import VkSession
+from .vk_stub import VkStub
+
+
+# Every menu click makes two calls: messages.edit and the snackbar.
+CALLS_PER_EVENT = 2
+
+
+def per_call(url: str) -> float:
+    start = time.perf_counter()
+    for _ in range(CALLS_PER_EVENT):
+        api = VkSession(token="token", api_version="5.199", base_url=url).get_api()
+        api.messages.edit(peer_id=1, conversation_message_id=1, message="text")
+
+    return time.perf_counter() - start
+
+
+def shared(api) -> float:
+    start = time.perf_counter()
+    for _ in range(CALLS_PER_EVENT):
+        api.messages.edit(peer_id=1, conversation_message_id=1, message="text")
+
+    return time.perf_counter() - start
+
+
+def report(name: str, samples: list) -> None:
+    samples = sorted(samples)
+    p99 = samples[int(len(samples) * 0.99) - 1]
+    print(f"{name:<10} p50={median(samples) * 1e3:.3f}ms p99={p99 * 1e3:.3f}ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=1000)
+    args = parser.parse_args()
+
+    with VkStub() as stub:
+        report("per-call", [per_call(stub.url) for _ in range(args.events)])
+
+        api = VkSession(token="token", api_version="5.199", base_url=stub.url).get_api()
+        report("shared", [shared(api) for _ in range(args.events)])
+
+
+if __name__ == "__main__":
+    main()
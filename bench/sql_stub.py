@@ -0,0 +1,153 @@
+"""Module "bench".
+
+File:
+    sql_stub.py
+
+About:
+    File describing an in-memory stand-in of the
+    toaster.scripts data source.
+"""
+
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Iterable, Optional
+from sqlalchemy import event, insert, select, update
+from toaster.enums import (
+    UserPermission,
+    SettingDestination,
+    SettingStatus,
+    PeerMark,
+)
+from db import backend, tables
+
+
+class SqlStub:
+    """In-memory data source answering after `latency` seconds.
+
+    Passed to `db.backend.use`, it provides every function of
+    toaster.scripts the service calls. Delays and points are kept
+    in a SQLite file, its `engine` is passed to `db.backend.use_engine`
+    for the statements the service runs itself. Settings rows
+    are created for each peer of `peers`.
+    """
+
+    def __init__(
+        self,
+        systems: Iterable[str],
+        filters: Iterable[str],
+        latency: float = 0.0,
+        peers: Iterable[int] = (),
+    ) -> None:
+        self.latency = latency
+        self._names = {
+            SettingDestination.system: tuple(systems),
+            SettingDestination.filter: tuple(filters),
+        }
+        self._lock = threading.Lock()
+        self._marks: Dict[int, PeerMark] = {}
+        self._permissions: Dict[tuple, UserPermission] = {}
+        self._statuses: Dict[tuple, SettingStatus] = {}
+
+        handle, self._path = tempfile.mkstemp(suffix=".sqlite")
+        os.close(handle)
+        self.engine = backend.create_engine(f"sqlite:///{self._path}")
+        tables.metadata.create_all(self.engine)
+        event.listen(self.engine, "before_cursor_execute", self._statement)
+
+        names = [name for names in self._names.values() for name in names]
+        rows = [{"bpid": bpid, "name": name} for bpid in peers for name in names]
+        if rows:
+            with self.engine.begin() as connection:
+                connection.execute(insert(tables.settings), rows)
+
+    def close(self) -> None:
+        self.engine.dispose()
+        os.remove(self._path)
+
+    def _statement(self, *args) -> None:
+        self._query()
+
+    def _setting(self, column: str, bpid: int, name: str) -> int:
+        table = tables.settings
+        with self.engine.connect() as connection:
+            value = connection.execute(
+                select(table.c[column]).where(
+                    (table.c.bpid == bpid) & (table.c.name == name)
+                )
+            ).scalar()
+
+        return value or 0
+
+    def _set_setting(self, column: str, bpid: int, name: str, value: int) -> None:
+        table = tables.settings
+        with self.engine.begin() as connection:
+            connection.execute(
+                update(table)
+                .where((table.c.bpid == bpid) & (table.c.name == name))
+                .values({column: value})
+            )
+
+    def _query(self) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+
+    def get_peer_mark(self, bpid: int) -> Optional[PeerMark]:
+        self._query()
+        return self._marks.get(bpid)
+
+    def set_peer_mark(self, mark: PeerMark, bpid: int, name: str) -> None:
+        self._query()
+        self._marks[bpid] = mark
+
+    def drop_peer_mark(self, bpid: int) -> None:
+        self._query()
+        self._marks.pop(bpid, None)
+
+    def update_peer_data(self, bpid: int, name: str) -> None:
+        self._query()
+
+    def get_user_permission(
+        self, uuid: int, bpid: int, ignore_staff: bool = False
+    ) -> UserPermission:
+        self._query()
+        return self._permissions.get((uuid, bpid), UserPermission.user)
+
+    def set_user_permission(self, uuid: int, bpid: int, lvl: UserPermission) -> None:
+        self._query()
+        self._permissions[(uuid, bpid)] = lvl
+
+    def drop_user_permission(self, uuid: int, bpid: int) -> None:
+        self._query()
+        self._permissions.pop((uuid, bpid), None)
+
+    def get_destinated_settings_status(
+        self, destination: SettingDestination, bpid: int
+    ) -> Dict[str, SettingStatus]:
+        self._query()
+        with self._lock:
+            return {
+                name: self._statuses.get((bpid, name), SettingStatus.inactive)
+                for name in self._names[destination]
+            }
+
+    def update_setting_status(self, status: SettingStatus, bpid: int, name: str) -> None:
+        self._query()
+        with self._lock:
+            self._statuses[(bpid, name)] = status
+
+    def get_setting_delay(self, name: str, bpid: int) -> int:
+        return self._setting("delay", bpid, name)
+
+    def update_setting_delay(self, name: str, bpid: int, delay: int) -> None:
+        self._set_setting("delay", bpid, name, delay)
+
+    def get_setting_points(self, bpid: int, name: str) -> int:
+        return self._setting("points", bpid, name)
+
+    def update_setting_points(self, bpid: int, name: str, points: int) -> None:
+        self._set_setting("points", bpid, name, points)
+
+    def close_menu_session(self, bpid: int, cmid: int) -> None:
+        self._query()
@@ -0,0 +1,263 @@
+"""Module "bench".
+
+File:
+    vk_stub.py
+
+About:
+    File describing a local stand-in of the VK API method
+    endpoint with latency and error injection. It runs in
+    the benchmarks, or standalone for load tests of the
+    service pointed at it with `vk_api_url`.
+
+Usage:
+    python -m bench.vk_stub [--port 8080] [--latency SECONDS]
+        [--distribution constant|uniform|exponential|lognormal]
+        [--rate-limit RPS] [--error-rate SHARE] [--seed N]
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl
+
+
+# VK error codes the stand-in answers with.
+UNKNOWN_METHOD = 3
+TOO_MANY_RPS = 6
+
+_decoder = json.JSONDecoder()
+
+
+def _latency(distribution: str, mean: float, rng: random.Random) -> float:
+    if mean <= 0:
+        return 0.0
+
+    if distribution == "constant":
+        return mean
+
+    if distribution == "uniform":
+        return rng.uniform(0, 2 * mean)
+
+    if distribution == "exponential":
+        return rng.expovariate(1 / mean)
+
+    if distribution == "lognormal":
+        # Median of `mean`, with the long tail of real network calls.
+        return rng.lognormvariate(math.log(mean), 0.5)
+
+    raise ValueError(f"Unknown latency distribution '{distribution}'.")
+
+
+def _error(code: int, message: str) -> Dict[str, Any]:
+    return {"error_code": code, "error_msg": message}
+
+
+def _parse_code(code: str) -> List[Tuple[str, Dict[str, Any]]]:
+    """Parses the `return [API.method({...}), ...];` code
+    sent by ExecuteBatcher."""
+
+    calls = []
+    position = code.find("API.")
+    while position != -1:
+        start = position + len("API.")
+        bracket = code.index("(", start)
+        values, end = _decoder.raw_decode(code, bracket + 1)
+        calls.append((code[start:bracket], values))
+        position = code.find("API.", end)
+
+    return calls
+
+
+class _StubRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self) -> None:
+        stub: "VkStub" = self.server.stub
+        length = int(self.headers.get("Content-Length", 0))
+        values = dict(parse_qsl(self.rfile.read(length).decode()))
+        method = self.path.rsplit("/", 1)[-1]
+
+        time.sleep(stub.delay())
+        status, body = stub.answer(method, values)
+
+        body = json.dumps(body, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class VkStub:
+    """VK API stand-in served from a background thread.
+
+    Answers messages.edit, messages.delete,
+    messages.sendMessageEventAnswer and execute after a latency
+    drawn from `distribution` with mean `latency` seconds.
+
+    Requests above `rate_limit` per second (0 disables) get
+    error 6, and an `error_rate` share of requests gets a
+    random 5xx response. `stats` counts requests by method
+    and answers by outcome.
+    """
+
+    METHODS = (
+        "messages.edit",
+        "messages.delete",
+        "messages.sendMessageEventAnswer",
+    )
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        distribution: str = "constant",
+        rate_limit: int = 0,
+        error_rate: float = 0.0,
+        seed: int = None,
+    ) -> None:
+        self.latency = latency
+        self.distribution = distribution
+        self.rate_limit = rate_limit
+        self.error_rate = error_rate
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window = 0
+        self._window_requests = 0
+        self._methods = Counter()
+        self._outcomes = Counter()
+
+        self._server = ThreadingHTTPServer((host, port), _StubRequestHandler)
+        self._server.stub = self
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/method/"
+
+    def delay(self) -> float:
+        with self._lock:
+            return _latency(self.distribution, self.latency, self._rng)
+
+    def answer(self, method: str, values: Dict[str, str]) -> Tuple[int, Dict[str, Any]]:
+        """Returns the HTTP status and body of a method call."""
+
+        with self._lock:
+            self._methods[method] += 1
+
+            if self._rng.random() < self.error_rate:
+                self._outcomes["http_error"] += 1
+                return self._rng.choice((500, 502, 503)), {}
+
+            if self.rate_limit:
+                window = int(time.monotonic())
+                if window != self._window:
+                    self._window, self._window_requests = window, 0
+
+                self._window_requests += 1
+                if self._window_requests > self.rate_limit:
+                    self._outcomes["rate_limited"] += 1
+                    return 200, {
+                        "error": _error(TOO_MANY_RPS, "Too many requests per second")
+                    }
+
+        if method == "execute":
+            body = self._execute(values.get("code", ""))
+        else:
+            result, error = self._call(method, values)
+            body = {"response": result} if error is None else {"error": error}
+
+        with self._lock:
+            self._outcomes["error" if "error" in body else "ok"] += 1
+
+        return 200, body
+
+    def _call(self, method: str, values: Dict[str, Any]) -> Tuple[Any, Optional[dict]]:
+        """Returns the result and the error of a method call."""
+
+        if method not in self.METHODS:
+            return None, _error(UNKNOWN_METHOD, "Unknown method passed")
+
+        if method == "messages.delete":
+            cmids = str(values.get("cmids", "")).split(",")
+            return {cmid: 1 for cmid in cmids}, None
+
+        return 1, None
+
+    def _execute(self, code: str) -> Dict[str, Any]:
+        response, errors = [], []
+        for method, values in _parse_code(code):
+            with self._lock:
+                self._methods[f"execute:{method}"] += 1
+
+            result, error = self._call(method, values)
+            if error is not None:
+                errors.append({"method": method, **error})
+                result = False
+            response.append(result)
+
+        body = {"response": response}
+        if errors:
+            body["execute_errors"] = errors
+
+        return body
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {"methods": dict(self._methods), "outcomes": dict(self._outcomes)}
+
+    def __enter__(self) -> "VkStub":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--distribution", default="lognormal")
+    parser.add_argument("--rate-limit", type=int, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    stub = VkStub(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        distribution=args.distribution,
+        rate_limit=args.rate_limit,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    with stub:
+        print(f"VK stand-in listening on {stub.url}", flush=True)
+        try:
+            while True:
+                time.sleep(10)
+                print(json.dumps(stub.stats(), sort_keys=True), flush=True)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+"""Module "cache".
+
+File:
+    __init__.py
+
+About:
+    Initializing the "cache" module.
+"""
+
+from .lru import LRUCache, MISSING
+from .window import WindowSet, RedisWindowSet
+
+
+__all__ = (
+    "LRUCache",
+    "MISSING",
+    "WindowSet",
+    "RedisWindowSet",
+)
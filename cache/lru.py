@@ -0,0 +1,108 @@
+"""Module "cache".
+
+File:
+    lru.py
+
+About:
+    File describing a bounded LRU cache with TTL.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable
+
+
+# Returned by `get` for absent keys, so that None can be cached.
+MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe LRU cache of at most `maxsize` entries.
+
+    Entries older than `ttl` seconds are treated as absent,
+    `ttl` of 0 keeps entries until they are evicted.
+
+    A value read elsewhere after a miss is stored with `fill`,
+    which skips it if the key was dropped since `version`
+    was taken, as the value may predate the change.
+    """
+
+    # Versions are kept per stripe of keys, not per key.
+    STRIPES = 64
+
+    def __init__(self, maxsize: int, ttl: float = 0) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._versions = [0] * self.STRIPES
+
+    def get(self, key: Hashable, default: Any = MISSING, count: bool = True) -> Any:
+        """Returns the value of `key`, or `default` when absent.
+        With `count` unset, the lookup is left out of the stats.
+        """
+
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or (self.ttl and entry[1] < time.monotonic()):
+                self.misses += count
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += count
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._set(key, value)
+
+    def version(self, key: Hashable) -> int:
+        """Returns the version to `fill` the key at, taken
+        before reading its value."""
+
+        return self._versions[hash(key) % self.STRIPES]
+
+    def fill(self, key: Hashable, value: Any, version: int) -> bool:
+        """Sets the value unless the key was dropped since `version`.
+
+        Returns:
+            bool: Whether the value was set.
+        """
+
+        with self._lock:
+            if self._versions[hash(key) % self.STRIPES] != version:
+                return False
+
+            self._set(key, value)
+            return True
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+            self._versions[hash(key) % self.STRIPES] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._versions = [version + 1 for version in self._versions]
+
+    def _set(self, key: Hashable, value: Any) -> None:
+        expires = time.monotonic() + self.ttl if self.ttl else 0
+        self._data[key] = (value, expires)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+            }
@@ -0,0 +1,107 @@
+"""Module "cache".
+
+File:
+    window.py
+
+About:
+    File describing sets of keys remembered
+    for a time window.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict
+from loguru import logger
+
+
+class WindowSet:
+    """Thread-safe set of keys remembered for `window` seconds.
+
+    Holds at most `maxsize` keys, the oldest are forgotten first.
+    """
+
+    def __init__(self, maxsize: int, window: float) -> None:
+        self.maxsize = maxsize
+        self.window = window
+
+        self._lock = threading.Lock()
+        # Keys by expiry time, oldest first: the window is constant.
+        self._data: "OrderedDict[str, float]" = OrderedDict()
+
+    def add(self, key: str) -> bool:
+        """Adds the key.
+
+        Returns:
+            bool: False if the key was added within the window.
+        """
+
+        with self._lock:
+            self._expire()
+            if key in self._data:
+                return False
+
+            self._data[key] = time.monotonic() + self.window
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+            return True
+
+    def contains(self, key: str) -> bool:
+        """Tells whether the key was added within the window."""
+
+        with self._lock:
+            self._expire()
+            return key in self._data
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        while self._data:
+            oldest, expires = next(iter(self._data.items()))
+            if expires > now:
+                break
+            del self._data[oldest]
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {"size": len(self._data)}
+
+
+class RedisWindowSet:
+    """WindowSet shared by the service replicas through
+    a Redis-compatible store.
+
+    When the store is unreachable, keys count as new, so
+    events are handled rather than lost. Requires the
+    optional "redis" package.
+    """
+
+    def __init__(self, url: str, window: float, prefix: str) -> None:
+        import redis
+
+        self.window = window
+        self.prefix = prefix
+        self._redis = redis.Redis.from_url(url)
+
+    def add(self, key: str) -> bool:
+        try:
+            added = self._redis.set(
+                self.prefix + key, 1, nx=True, px=max(1, int(self.window * 1000))
+            )
+
+        except Exception as error:
+            logger.error(f"Could not check a duplicate: {error}")
+            return True
+
+        return bool(added)
+
+    def contains(self, key: str) -> bool:
+        try:
+            return bool(self._redis.exists(self.prefix + key))
+
+        except Exception as error:
+            logger.error(f"Could not check a duplicate: {error}")
+            return False
+
+    def stats(self) -> Dict[str, float]:
+        return {}
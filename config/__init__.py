@@ -9,14 +9,130 @@ About:
 
 from .config import (
     BROKER_QUEUE_NAME,
+    BROKER_HOST,
+    BROKER_PORT,
+    BROKER_VHOST,
+    BROKER_USER,
+    BROKER_PASSWORD,
+    BROKER_PREFETCH,
+    BROKER_ACK_BATCH,
+    BROKER_ACK_INTERVAL,
     VK_GROUP_TOKEN,
     VK_GROUP_ID,
     VK_API_VERSION,
+    VK_API_URL,
+    VK_API_POOL_SIZE,
+    VK_API_ASYNC_POOL_SIZE,
+    VK_API_TIMEOUT,
+    VK_BATCH_WINDOW,
+    VK_BATCH_SIZE,
+    VK_BATCH_TIMEOUT,
+    VK_RATE_LIMIT,
+    VK_RATE_BURST,
+    DISPATCH_MODE,
+    DISPATCH_WORKERS,
+    DISPATCH_QUEUE_SIZE,
+    DISPATCH_BACKPRESSURE,
+    DISPATCH_ORDERING,
+    WORKER_PROCESSES,
+    WORKER_DRAIN_TIMEOUT,
+    WORKER_RESTART_LIMIT,
+    WORKER_RESTART_WINDOW,
+    WORKER_RESTART_BACKOFF,
+    WORKER_METRICS_INTERVAL,
+    KEYBOARD_CACHE_SIZE,
+    KEYBOARD_CACHE_TTL,
+    SQL_HOST,
+    SQL_PORT,
+    SQL_USER,
+    SQL_PASSWORD,
+    ALCHEMY_DIALECT,
+    ALCHEMY_DRIVER,
+    ALCHEMY_DATABASE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_STATEMENT_TIMEOUT,
+    SETTINGS_CACHE_SIZE,
+    SETTINGS_CACHE_TTL,
+    PEER_CACHE_SIZE,
+    PEER_CACHE_TTL,
+    COALESCE_WINDOW,
+    DEDUP_EVENT_WINDOW,
+    DEDUP_CLICK_WINDOW,
+    DEDUP_SIZE,
+    DEDUP_URL,
+    CACHE_INVALIDATION_URL,
+    CACHE_INVALIDATION_CHANNEL,
+    TRACING_PATH,
+    METRICS_PORT,
+    READINESS_PATH,
+    LOG_LEVEL,
+    LOG_FORMAT,
+    LOG_QUEUE_SIZE,
+    LOG_SAMPLE_RATE,
 )
 
 __all__ = (
     "BROKER_QUEUE_NAME",
+    "BROKER_HOST",
+    "BROKER_PORT",
+    "BROKER_VHOST",
+    "BROKER_USER",
+    "BROKER_PASSWORD",
+    "BROKER_PREFETCH",
+    "BROKER_ACK_BATCH",
+    "BROKER_ACK_INTERVAL",
     "VK_GROUP_TOKEN",
     "VK_GROUP_ID",
     "VK_API_VERSION",
+    "VK_API_URL",
+    "VK_API_POOL_SIZE",
+    "VK_API_ASYNC_POOL_SIZE",
+    "VK_API_TIMEOUT",
+    "VK_BATCH_WINDOW",
+    "VK_BATCH_SIZE",
+    "VK_BATCH_TIMEOUT",
+    "VK_RATE_LIMIT",
+    "VK_RATE_BURST",
+    "DISPATCH_MODE",
+    "DISPATCH_WORKERS",
+    "DISPATCH_QUEUE_SIZE",
+    "DISPATCH_BACKPRESSURE",
+    "DISPATCH_ORDERING",
+    "WORKER_PROCESSES",
+    "WORKER_DRAIN_TIMEOUT",
+    "WORKER_RESTART_LIMIT",
+    "WORKER_RESTART_WINDOW",
+    "WORKER_RESTART_BACKOFF",
+    "WORKER_METRICS_INTERVAL",
+    "KEYBOARD_CACHE_SIZE",
+    "KEYBOARD_CACHE_TTL",
+    "SQL_HOST",
+    "SQL_PORT",
+    "SQL_USER",
+    "SQL_PASSWORD",
+    "ALCHEMY_DIALECT",
+    "ALCHEMY_DRIVER",
+    "ALCHEMY_DATABASE",
+    "DB_POOL_SIZE",
+    "DB_POOL_TIMEOUT",
+    "DB_STATEMENT_TIMEOUT",
+    "SETTINGS_CACHE_SIZE",
+    "SETTINGS_CACHE_TTL",
+    "PEER_CACHE_SIZE",
+    "PEER_CACHE_TTL",
+    "COALESCE_WINDOW",
+    "DEDUP_EVENT_WINDOW",
+    "DEDUP_CLICK_WINDOW",
+    "DEDUP_SIZE",
+    "DEDUP_URL",
+    "CACHE_INVALIDATION_URL",
+    "CACHE_INVALIDATION_CHANNEL",
+    "TRACING_PATH",
+    "METRICS_PORT",
+    "READINESS_PATH",
+    "LOG_LEVEL",
+    "LOG_FORMAT",
+    "LOG_QUEUE_SIZE",
+    "LOG_SAMPLE_RATE",
 )
@@ -12,8 +12,167 @@ import os
 
 BROKER_QUEUE_NAME = "button"
 
+# Broker address, probed to tell when the service is ready.
+BROKER_HOST: str = os.getenv("rabbitmq_host")
+
+BROKER_PORT: int = int(os.getenv("rabbitmq_port", 5672))
+
+BROKER_VHOST: str = os.getenv("rabbitmq_vhost", "/")
+
+BROKER_USER: str = os.getenv("rabbitmq_user")
+
+BROKER_PASSWORD: str = os.getenv("rabbitmq_pswd")
+
+# Unacknowledged events read ahead by the service's own consumer,
+# 0 keeps the toaster listener. The consumer requires "pika".
+BROKER_PREFETCH: int = int(os.getenv("broker_prefetch", 0))
+
+# Handled events acknowledged at once, or after the interval.
+BROKER_ACK_BATCH: int = int(os.getenv("broker_ack_batch", 20))
+
+BROKER_ACK_INTERVAL: float = float(os.getenv("broker_ack_interval", 0.2))
+
 VK_GROUP_TOKEN: str = os.getenv("vk_group_token")
 
 VK_GROUP_ID: int = int(os.getenv("vk_group_id"))
 
 VK_API_VERSION: str = "5.199"
+
+# Method endpoint, e.g. a local stand-in for load tests.
+VK_API_URL: str = os.getenv("vk_api_url", "https://api.vk.com/method/")
+
+VK_API_POOL_SIZE: int = int(os.getenv("vk_api_pool_size", 10))
+
+VK_API_ASYNC_POOL_SIZE: int = int(os.getenv("vk_api_async_pool_size", 100))
+
+# Seconds a request to the API may take.
+VK_API_TIMEOUT: float = float(os.getenv("vk_api_timeout", 10))
+
+# Seconds to collect calls into one "execute" request, 0 disables batching.
+VK_BATCH_WINDOW: float = float(os.getenv("vk_batch_window", 0))
+
+VK_BATCH_SIZE: int = int(os.getenv("vk_batch_size", 25))
+
+# Seconds a caller waits for its batched call to return.
+VK_BATCH_TIMEOUT: float = float(os.getenv("vk_batch_timeout", 30))
+
+# Requests per second allowed for the group token, 0 disables the limiter.
+VK_RATE_LIMIT: float = float(os.getenv("vk_rate_limit", 20))
+
+VK_RATE_BURST: int = int(os.getenv("vk_rate_burst", 20))
+
+DISPATCH_MODE: str = os.getenv("dispatch_mode", "serial")
+
+DISPATCH_WORKERS: int = int(os.getenv("dispatch_workers", 8))
+
+DISPATCH_QUEUE_SIZE: int = int(os.getenv("dispatch_queue_size", 100))
+
+DISPATCH_BACKPRESSURE: str = os.getenv("dispatch_backpressure", "block")
+
+DISPATCH_ORDERING: str = os.getenv("dispatch_ordering", "peer")
+
+# Worker processes run by a supervisor, 0 handles events in-process.
+# Events are routed by the ordering key, so with "peer" or "menu"
+# the cached data of a peer lives in one worker only.
+WORKER_PROCESSES: int = int(os.getenv("worker_processes", 0))
+
+# Seconds workers get to finish their events on SIGTERM.
+WORKER_DRAIN_TIMEOUT: float = float(os.getenv("worker_drain_timeout", 30))
+
+# Crashed workers restarted within the window before the supervisor
+# gives up and exits. Restarts back off from the given seconds,
+# doubling with every restart still in the window.
+WORKER_RESTART_LIMIT: int = int(os.getenv("worker_restart_limit", 10))
+
+WORKER_RESTART_WINDOW: float = float(os.getenv("worker_restart_window", 60))
+
+WORKER_RESTART_BACKOFF: float = float(os.getenv("worker_restart_backoff", 0.5))
+
+# Seconds between metrics snapshots sent by the workers to the supervisor.
+WORKER_METRICS_INTERVAL: float = float(os.getenv("worker_metrics_interval", 5))
+
+KEYBOARD_CACHE_SIZE: int = int(os.getenv("keyboard_cache_size", 1024))
+
+KEYBOARD_CACHE_TTL: float = float(os.getenv("keyboard_cache_ttl", 600))
+
+SETTINGS_CACHE_SIZE: int = int(os.getenv("settings_cache_size", 4096))
+
+SETTINGS_CACHE_TTL: float = float(os.getenv("settings_cache_ttl", 3600))
+
+# Database shared with toaster.scripts, for the statements
+# the service runs on its own engine.
+SQL_HOST: str = os.getenv("sql_host")
+
+SQL_PORT: str = os.getenv("sql_port")
+
+SQL_USER: str = os.getenv("sql_user")
+
+SQL_PASSWORD: str = os.getenv("sql_pswd")
+
+ALCHEMY_DIALECT: str = os.getenv("alchemy_dialect")
+
+ALCHEMY_DRIVER: str = os.getenv("alchemy_driver")
+
+ALCHEMY_DATABASE: str = os.getenv("alchemy_database")
+
+# Connections of the engine, also the data source calls in flight.
+DB_POOL_SIZE: int = int(os.getenv("db_pool_size", 10))
+
+# Seconds to wait for a free connection.
+DB_POOL_TIMEOUT: float = float(os.getenv("db_pool_timeout", 10))
+
+# Seconds a statement may run before the database cancels it.
+DB_STATEMENT_TIMEOUT: float = float(os.getenv("db_statement_timeout", 5))
+
+# Marks and permissions are also changed by other services.
+PEER_CACHE_SIZE: int = int(os.getenv("peer_cache_size", 4096))
+
+PEER_CACHE_TTL: float = float(os.getenv("peer_cache_ttl", 60))
+
+# Seconds the +/- clicks on a delay or punishment menu are merged
+# into one database write and message edit, 0 disables merging.
+# Trade-off: each click is answered "changed" before the write. If
+# the merged write fails, the error is logged, the menu is edited
+# back to the stored value, and clicks skip merging for a while so
+# that failures reach the user as an error snackbar.
+COALESCE_WINDOW: float = float(os.getenv("coalesce_window", 0.3))
+
+# Seconds an event id is remembered to drop VK callback retries,
+# 0 disables the check.
+DEDUP_EVENT_WINDOW: float = float(os.getenv("dedup_event_window", 30))
+
+# Seconds a press of one button of one message by one user is
+# remembered to drop repeated clicks, 0 disables the check.
+DEDUP_CLICK_WINDOW: float = float(os.getenv("dedup_click_window", 0.5))
+
+DEDUP_SIZE: int = int(os.getenv("dedup_size", 10000))
+
+# Redis URL to share seen events between replicas, None keeps them local.
+DEDUP_URL: str = os.getenv("dedup_url")
+
+# Redis URL shared by the replicas, None keeps the caches local.
+CACHE_INVALIDATION_URL: str = os.getenv("cache_invalidation_url")
+
+CACHE_INVALIDATION_CHANNEL: str = os.getenv(
+    "cache_invalidation_channel", "button-handler.cache"
+)
+
+# JSON Lines file for trace spans, None disables tracing.
+TRACING_PATH: str = os.getenv("tracing_path")
+
+# Port of the /metrics endpoint, 0 disables it.
+METRICS_PORT: int = int(os.getenv("metrics_port", 9464))
+
+# File created once the service is ready, None disables it.
+READINESS_PATH: str = os.getenv("readiness_path")
+
+LOG_LEVEL: str = os.getenv("log_level", "DEBUG")
+
+# "text" or "json".
+LOG_FORMAT: str = os.getenv("log_format", "text")
+
+# Records waiting to be written, more are dropped.
+LOG_QUEUE_SIZE: int = int(os.getenv("log_queue_size", 10000))
+
+# Share of successful events logged, failures are always logged.
+LOG_SAMPLE_RATE: float = float(os.getenv("log_sample_rate", 1))
@@ -0,0 +1,22 @@
+"""Module "consumer".
+
+File:
+    __init__.py
+
+About:
+    Initializing the "consumer" module.
+"""
+
+from .channel import Channel, Delivery, PikaChannel
+from .consumer import Consumer
+from .memory import MemoryBroker, MemoryChannel
+
+
+__all__ = (
+    "Channel",
+    "Delivery",
+    "PikaChannel",
+    "Consumer",
+    "MemoryBroker",
+    "MemoryChannel",
+)
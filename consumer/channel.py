@@ -0,0 +1,110 @@
+"""Module "consumer".
+
+File:
+    channel.py
+
+About:
+    File describing the broker channel interface
+    and its RabbitMQ implementation.
+"""
+
+from abc import ABC, abstractmethod
+from functools import partial
+from typing import Iterator, NamedTuple, Optional
+
+
+class Delivery(NamedTuple):
+    tag: int
+    body: bytes
+
+
+class Channel(ABC):
+    """Broker channel the consumer reads deliveries from.
+
+    Delivery tags grow in delivery order. Deliveries left
+    unacknowledged when the channel closes are redelivered
+    by the broker. `ack` may be called from any thread.
+    """
+
+    @abstractmethod
+    def qos(self, prefetch: int) -> None:
+        """Limits the unacknowledged deliveries to `prefetch`."""
+
+    @abstractmethod
+    def consume(self, queue_name: str, timeout: float) -> Iterator[Optional[Delivery]]:
+        """Yields deliveries of the queue, or None after
+        `timeout` seconds without one."""
+
+    @abstractmethod
+    def ack(self, tag: int, multiple: bool = False) -> None:
+        """Acknowledges the delivery, with `multiple`
+        every delivery up to it as well."""
+
+    @abstractmethod
+    def close(self) -> None:
+        pass
+
+
+class PikaChannel(Channel):
+    """RabbitMQ channel over a blocking pika connection.
+
+    The connection is opened by `qos` and used from the
+    consuming thread only: acks are scheduled onto it, in
+    order. `close` is called once consuming stopped, and sends
+    the scheduled acks before closing. Requires the optional
+    "pika" package.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int = 5672,
+        vhost: str = "/",
+        user: Optional[str] = None,
+        password: Optional[str] = None,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.vhost = vhost
+        self.user = user
+        self.password = password
+        self._connection = None
+        self._channel = None
+
+    def qos(self, prefetch: int) -> None:
+        import pika
+
+        credentials = None
+        if self.user is not None:
+            credentials = pika.PlainCredentials(self.user, self.password)
+
+        parameters = pika.ConnectionParameters(
+            host=self.host,
+            port=self.port,
+            virtual_host=self.vhost,
+            **({"credentials": credentials} if credentials is not None else {}),
+        )
+        self._connection = pika.BlockingConnection(parameters)
+        self._channel = self._connection.channel()
+        self._channel.basic_qos(prefetch_count=prefetch)
+
+    def consume(self, queue_name: str, timeout: float) -> Iterator[Optional[Delivery]]:
+        for method, _, body in self._channel.consume(queue_name, inactivity_timeout=timeout):
+            yield None if method is None else Delivery(method.delivery_tag, body)
+
+    def ack(self, tag: int, multiple: bool = False) -> None:
+        self._connection.add_callback_threadsafe(
+            partial(self._channel.basic_ack, delivery_tag=tag, multiple=multiple)
+        )
+
+    def close(self) -> None:
+        if self._connection is None or not self._connection.is_open:
+            return
+
+        # Runs the scheduled acks on this thread, which owns the
+        # connection now. The broker handles them before the
+        # channel close it confirms.
+        self._connection.process_data_events(time_limit=0)
+        self._channel.cancel()
+        self._channel.close()
+        self._connection.close()
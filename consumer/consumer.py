@@ -0,0 +1,158 @@
+"""Module "consumer".
+
+File:
+    consumer.py
+
+About:
+    File describing the broker consumer acknowledging
+    events in batches once they are handled.
+"""
+
+import pickle
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterator, Set
+from loguru import logger
+from funcka_bots.events import BaseEvent
+from .channel import Channel
+
+
+Decoder = Callable[[bytes], BaseEvent]
+
+
+class Consumer:
+    """Reads events from a broker channel and acknowledges them
+    after the handler is done with them.
+
+    At most `prefetch` events are delivered and not yet
+    acknowledged. Events may finish out of order, so once
+    `ack_batch` events are finished or `ack_interval` seconds
+    passed, the consumer acknowledges the run of finished events
+    from the oldest delivery tag with a single multiple-ack, and
+    the other finished events one by one: a slow event holds
+    back its own acknowledgement only. Events still being
+    handled when the process stops stay unacknowledged and are
+    redelivered.
+
+    `done` may be called from any thread: the channel hands
+    acks over to its consuming thread. `stop` makes `events`
+    return within `ack_interval` seconds.
+    """
+
+    def __init__(
+        self,
+        channel: Channel,
+        queue_name: str,
+        prefetch: int = 100,
+        ack_batch: int = 20,
+        ack_interval: float = 0.2,
+        decode: Decoder = pickle.loads,
+    ) -> None:
+        self.channel = channel
+        self.queue_name = queue_name
+        self.prefetch = prefetch
+        self.ack_batch = ack_batch
+        self.ack_interval = ack_interval
+        self.decode = decode
+
+        self.delivered = 0
+        self.acked = 0
+        self._lock = threading.Lock()
+        self._outstanding: Deque[int] = deque()
+        self._finished: Set[int] = set()
+        self._tags: Dict[int, int] = {}
+        self._last_ack = time.monotonic()
+        self._stopped = threading.Event()
+
+    def events(self) -> Iterator[BaseEvent]:
+        """Yields events until the channel stops."""
+
+        self.channel.qos(self.prefetch)
+        for delivery in self.channel.consume(self.queue_name, self.ack_interval):
+            self._flush()
+            # A delivery read after the stop is left to be redelivered.
+            if self._stopped.is_set():
+                return
+
+            if delivery is None:
+                continue
+
+            with self._lock:
+                self._outstanding.append(delivery.tag)
+                self.delivered += 1
+
+            try:
+                event = self.decode(delivery.body)
+
+            except Exception as error:
+                logger.error(f"Could not decode delivery {delivery.tag}: {error}")
+                self._finish(delivery.tag)
+                continue
+
+            with self._lock:
+                self._tags[id(event)] = delivery.tag
+
+            yield event
+
+    def stop(self) -> None:
+        """Stops reading events, e.g. from a signal handler."""
+
+        self._stopped.set()
+
+    def done(self, event: BaseEvent) -> None:
+        """Marks the event as handled."""
+
+        with self._lock:
+            tag = self._tags.pop(id(event), None)
+
+        if tag is not None:
+            self._finish(tag)
+            self._flush()
+
+    def close(self) -> None:
+        """Acknowledges the handled events and closes the channel."""
+
+        self._flush(force=True)
+        self.channel.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "delivered": self.delivered,
+                "acked": self.acked,
+                "unacked": len(self._outstanding),
+            }
+
+    def _finish(self, tag: int) -> None:
+        with self._lock:
+            self._finished.add(tag)
+
+    def _flush(self, force: bool = False) -> None:
+        # Acks are sent under the lock: a multiple-ack arriving
+        # after a later one would close the channel.
+        with self._lock:
+            due = time.monotonic() - self._last_ack >= self.ack_interval
+            batch = min(self.ack_batch, self.prefetch)
+            if not (force or due or len(self._finished) >= batch):
+                return
+
+            last, count = None, 0
+            while self._outstanding and self._outstanding[0] in self._finished:
+                last = self._outstanding.popleft()
+                self._finished.discard(last)
+                count += 1
+
+            if last is not None:
+                self.channel.ack(last, multiple=True)
+
+            # Finished behind an event still being handled.
+            for tag in sorted(self._finished):
+                self._outstanding.remove(tag)
+                self.channel.ack(tag)
+                count += 1
+
+            if count:
+                self._finished.clear()
+                self.acked += count
+                self._last_ack = time.monotonic()
@@ -0,0 +1,148 @@
+"""Module "consumer".
+
+File:
+    memory.py
+
+About:
+    File describing an in-memory broker stand-in
+    for tests and benchmarks.
+"""
+
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+from .channel import Channel, Delivery
+
+
+class MemoryBroker:
+    """Queues held in memory, consumed through MemoryChannel.
+
+    Once `close` is called, channels stop after delivering
+    what is left in their queue.
+    """
+
+    def __init__(self) -> None:
+        self.closed = False
+        self.published = 0
+        self.acked = 0
+        self.redelivered = 0
+        self._queues: Dict[str, Deque[bytes]] = {}
+        self._condition = threading.Condition()
+
+    def publish(self, queue_name: str, body: bytes) -> None:
+        with self._condition:
+            self._queues.setdefault(queue_name, deque()).append(body)
+            self.published += 1
+            self._condition.notify_all()
+
+    def channel(self, latency: float = 0.0) -> "MemoryChannel":
+        return MemoryChannel(self, latency)
+
+    def close(self) -> None:
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+    def size(self, queue_name: str) -> int:
+        with self._condition:
+            return len(self._queues.get(queue_name, ()))
+
+
+class MemoryChannel(Channel):
+    """Channel of MemoryBroker.
+
+    A slot of the prefetch window freed by an ack is reused
+    after `latency` seconds, standing for the round trip to
+    a remote broker. Closing the channel puts unacknowledged
+    deliveries back at the head of the queue.
+    """
+
+    def __init__(self, broker: MemoryBroker, latency: float = 0.0) -> None:
+        self.broker = broker
+        self.latency = latency
+        self.prefetch = 0
+        self.acks = 0
+        self._tags = itertools.count(1)
+        self._queue_name: Optional[str] = None
+        self._unacked: Dict[int, bytes] = {}
+        # (time the slots are free again, slots) of recent acks.
+        self._releases: Deque[Tuple[float, int]] = deque()
+        self._closed = False
+
+    def qos(self, prefetch: int) -> None:
+        self.prefetch = prefetch
+
+    def consume(self, queue_name: str, timeout: float) -> Iterator[Optional[Delivery]]:
+        self._queue_name = queue_name
+        condition = self.broker._condition
+        while True:
+            with condition:
+                queue = self.broker._queues.setdefault(queue_name, deque())
+                deadline = time.monotonic() + timeout
+                while True:
+                    if self._closed or (self.broker.closed and not queue):
+                        return
+
+                    wait = self._window_wait()
+                    if queue and wait == 0:
+                        tag = next(self._tags)
+                        self._unacked[tag] = queue.popleft()
+                        delivery = Delivery(tag, self._unacked[tag])
+                        break
+
+                    left = deadline - time.monotonic()
+                    if left <= 0:
+                        delivery = None
+                        break
+
+                    condition.wait(min(left, wait) if wait else left)
+
+            yield delivery
+
+    def ack(self, tag: int, multiple: bool = False) -> None:
+        with self.broker._condition:
+            tags = [t for t in self._unacked if t <= tag] if multiple else [tag]
+            for t in tags:
+                del self._unacked[t]
+
+            self.acks += 1
+            self.broker.acked += len(tags)
+            self._releases.append((time.monotonic() + self.latency, len(tags)))
+            self.broker._condition.notify_all()
+
+    def close(self) -> None:
+        with self.broker._condition:
+            if self._queue_name is not None and self._unacked:
+                queue = self.broker._queues[self._queue_name]
+                queue.extendleft(reversed(list(self._unacked.values())))
+                self.broker.redelivered += len(self._unacked)
+
+            self._unacked.clear()
+            self._closed = True
+            self.broker._condition.notify_all()
+
+    def unacked(self) -> List[int]:
+        with self.broker._condition:
+            return list(self._unacked)
+
+    def _window_wait(self) -> Optional[float]:
+        """Returns 0 when a prefetch slot is free, the seconds
+        until a slot returns, or None to wait for an ack."""
+
+        if not self.prefetch:
+            return 0.0
+
+        now = time.monotonic()
+        while self._releases and self._releases[0][0] <= now:
+            self._releases.popleft()
+
+        returning = sum(slots for _, slots in self._releases)
+        if len(self._unacked) + returning < self.prefetch:
+            return 0.0
+
+        if self._releases:
+            return self._releases[0][0] - now
+
+        return None
@@ -0,0 +1,73 @@
+"""Module "db".
+
+File:
+    __init__.py
+
+About:
+    Initializing the "db" module.
+"""
+
+from .channel import InvalidationChannel
+from .settings import (
+    get_destinated_settings_status,
+    update_setting_status,
+    get_setting_delay,
+    update_setting_delay,
+    increment_setting_delay,
+    get_setting_points,
+    update_setting_points,
+    increment_setting_points,
+)
+from .marks import (
+    get_peer_mark,
+    set_peer_mark,
+    drop_peer_mark,
+    update_peer_data,
+)
+from .permissions import (
+    get_user_permission,
+    set_user_permission,
+    drop_user_permission,
+)
+from .menu import close_menu_session
+from . import backend, tables, settings, marks, permissions, aio
+
+
+def connect_invalidation(url: str, name: str) -> None:
+    """Connects the caches to the invalidation channel shared
+    with other service replicas.
+
+    Args:
+        url (str): Redis URL.
+        name (str): Pub/sub channel name.
+    """
+
+    channel = InvalidationChannel(url, name)
+    settings.connect(channel)
+    marks.connect(channel)
+    permissions.connect(channel)
+    channel.start()
+
+
+__all__ = (
+    "aio",
+    "backend",
+    "tables",
+    "connect_invalidation",
+    "get_destinated_settings_status",
+    "update_setting_status",
+    "get_setting_delay",
+    "update_setting_delay",
+    "increment_setting_delay",
+    "get_setting_points",
+    "update_setting_points",
+    "increment_setting_points",
+    "get_peer_mark",
+    "set_peer_mark",
+    "drop_peer_mark",
+    "update_peer_data",
+    "get_user_permission",
+    "set_user_permission",
+    "drop_user_permission",
+    "close_menu_session",
+)
@@ -0,0 +1,56 @@
+"""Module "db".
+
+File:
+    aio.py
+
+About:
+    File describing the non-blocking facade of the
+    "db" module for AsyncBaseAction actions.
+"""
+
+import asyncio
+import functools
+import weakref
+from typing import Any, Awaitable, Callable
+from . import settings, marks, permissions, menu
+import config
+
+
+# Calls in flight of each event loop. Awaiting callers queue on
+# the loop rather than in its default executor. No timeout here:
+# statements are bounded by the database itself.
+_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _nonblocking(function: Callable[..., Any]) -> Callable[..., Awaitable[Any]]:
+    @functools.wraps(function)
+    async def wrapper(*args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        slots = _slots.get(loop)
+        if slots is None:
+            slots = _slots[loop] = asyncio.BoundedSemaphore(config.DB_POOL_SIZE)
+
+        async with slots:
+            return await asyncio.to_thread(function, *args, **kwargs)
+
+    return wrapper
+
+
+get_destinated_settings_status = _nonblocking(settings.get_destinated_settings_status)
+update_setting_status = _nonblocking(settings.update_setting_status)
+get_setting_delay = _nonblocking(settings.get_setting_delay)
+update_setting_delay = _nonblocking(settings.update_setting_delay)
+increment_setting_delay = _nonblocking(settings.increment_setting_delay)
+get_setting_points = _nonblocking(settings.get_setting_points)
+update_setting_points = _nonblocking(settings.update_setting_points)
+increment_setting_points = _nonblocking(settings.increment_setting_points)
+get_peer_mark = _nonblocking(marks.get_peer_mark)
+set_peer_mark = _nonblocking(marks.set_peer_mark)
+drop_peer_mark = _nonblocking(marks.drop_peer_mark)
+update_peer_data = _nonblocking(marks.update_peer_data)
+get_user_permission = _nonblocking(permissions.get_user_permission)
+set_user_permission = _nonblocking(permissions.set_user_permission)
+drop_user_permission = _nonblocking(permissions.drop_user_permission)
+close_menu_session = _nonblocking(menu.close_menu_session)
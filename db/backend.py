@@ -0,0 +1,190 @@
+"""Module "db".
+
+File:
+    backend.py
+
+About:
+    File describing the data sources used by the
+    "db" module: the toaster.scripts functions, and
+    the engine of the statements the service runs itself.
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+import sqlalchemy
+from sqlalchemy import event
+from sqlalchemy.engine import URL, Connection, Engine
+from tracing import span
+from metrics import dependency_seconds
+from . import tables
+import config
+
+
+# toaster.scripts, imported on the first call.
+scripts: Any = None
+
+# Engine of the service's own statements, created on the first use.
+engine: Optional[Engine] = None
+_engine_lock = threading.Lock()
+
+# Caps the toaster.scripts calls in flight. The scripts keep their
+# own connections, this only makes callers queue here, not there.
+_slots = threading.BoundedSemaphore(config.DB_POOL_SIZE)
+
+# Per-connection statement sent on connect to bound statement time,
+# by dialect. MySQL and SQLite only bound the time spent waiting for locks.
+_TIMEOUTS = {
+    "postgresql": "SET statement_timeout = {milliseconds}",
+    "mariadb": "SET SESSION max_statement_time = {seconds}",
+    "mysql": "SET SESSION innodb_lock_wait_timeout = {whole_seconds}",
+    "sqlite": "PRAGMA busy_timeout = {milliseconds}",
+}
+
+
+def use(module: Any) -> None:
+    """Replaces the data source, e.g. with a local stand-in.
+
+    Args:
+        module (Any): Object providing the toaster.scripts functions.
+    """
+
+    global scripts
+    scripts = module
+
+
+def use_engine(new_engine: Engine) -> None:
+    """Replaces the engine, e.g. with a local database.
+
+    Args:
+        new_engine (Engine): Engine to run the statements on.
+    """
+
+    global engine
+    engine = new_engine
+
+
+def call(function: str, /, **kwargs) -> Any:
+    """Calls a data source function by name.
+
+    Args:
+        function (str): toaster.scripts function name.
+
+    Returns:
+        Any: Function result.
+    """
+
+    start = time.perf_counter()
+    try:
+        with span(f"db.{function}"), _slots:
+            return getattr(scripts or _load(), function)(**kwargs)
+
+    finally:
+        dependency_seconds.observe(time.perf_counter() - start, "db", function)
+
+
+@contextmanager
+def transaction(name: str) -> Iterator[Connection]:
+    """Runs statements on the engine in one transaction,
+    committed when the block exits without an error.
+
+    Args:
+        name (str): Name of the transaction in traces and metrics.
+
+    Yields:
+        Connection: Connection in the transaction.
+    """
+
+    start = time.perf_counter()
+    try:
+        with span(f"db.{name}"), (engine or _connect()).begin() as connection:
+            yield connection
+
+    finally:
+        dependency_seconds.observe(time.perf_counter() - start, "db", name)
+
+
+def create_engine(
+    url: Any,
+    pool_size: int = config.DB_POOL_SIZE,
+    pool_timeout: float = config.DB_POOL_TIMEOUT,
+    statement_timeout: float = config.DB_STATEMENT_TIMEOUT,
+) -> Engine:
+    """Creates an engine keeping up to `pool_size` connections,
+    checked before each use. Statements running longer than
+    `statement_timeout` seconds are cancelled by the database.
+
+    Args:
+        url (str | URL): Database URL.
+        pool_size (int): Connections in the pool.
+        pool_timeout (float): Seconds to wait for a free connection.
+        statement_timeout (float): Seconds a statement may run, 0 disables.
+
+    Returns:
+        Engine: New engine.
+    """
+
+    new_engine = sqlalchemy.create_engine(
+        url,
+        pool_size=pool_size,
+        max_overflow=0,
+        pool_timeout=pool_timeout,
+        pool_pre_ping=True,
+    )
+
+    timeout = _TIMEOUTS.get(new_engine.dialect.name)
+    if timeout is not None and statement_timeout > 0:
+        statement = timeout.format(
+            milliseconds=round(statement_timeout * 1000),
+            seconds=statement_timeout,
+            whole_seconds=max(1, math.ceil(statement_timeout)),
+        )
+
+        @event.listens_for(new_engine, "connect")
+        def set_timeout(dbapi_connection, connection_record) -> None:
+            cursor = dbapi_connection.cursor()
+            try:
+                cursor.execute(statement)
+            finally:
+                cursor.close()
+
+    return new_engine
+
+
+def warm() -> None:
+    """Imports the data source, opens pooled connections
+    and checks the tables the engine statements use.
+    """
+
+    # Any cheap read checks out and returns a connection.
+    call("get_peer_mark", bpid=0)
+    with (engine or _connect()).connect() as connection:
+        tables.check(connection)
+
+
+def _load() -> Any:
+    global scripts
+    from toaster import scripts as toaster_scripts
+
+    scripts = toaster_scripts
+    return scripts
+
+
+def _connect() -> Engine:
+    global engine
+    with _engine_lock:
+        if engine is None:
+            engine = create_engine(
+                URL.create(
+                    drivername=f"{config.ALCHEMY_DIALECT}+{config.ALCHEMY_DRIVER}",
+                    username=config.SQL_USER,
+                    password=config.SQL_PASSWORD,
+                    host=config.SQL_HOST,
+                    port=int(config.SQL_PORT) if config.SQL_PORT else None,
+                    database=config.ALCHEMY_DATABASE,
+                )
+            )
+
+    return engine
@@ -0,0 +1,121 @@
+"""Module "db".
+
+File:
+    channel.py
+
+About:
+    File describing the cache invalidation channel
+    shared by the service replicas.
+"""
+
+import json
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+from loguru import logger
+
+
+Invalidator = Callable[[Any], None]
+Clear = Callable[[], None]
+
+
+class InvalidationChannel:
+    """Redis pub/sub channel that keeps the caches of several
+    service replicas consistent.
+
+    Each replica publishes the keys it changed, the other
+    replicas drop these keys from the named cache. A lost
+    subscription is restored with backoff, and the caches
+    are cleared, since changes may have been missed meanwhile.
+    Requires the optional "redis" package.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        name: str,
+        retry_delay: float = 0.5,
+        max_retry_delay: float = 30,
+    ) -> None:
+        import redis
+
+        self.name = name
+        self.replica = uuid.uuid4().hex
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self._redis = redis.Redis.from_url(url)
+        self._invalidators: Dict[str, Invalidator] = {}
+        self._clears: Dict[str, Clear] = {}
+
+    def register(
+        self, cache: str, invalidator: Invalidator, clear: Optional[Clear] = None
+    ) -> None:
+        self._invalidators[cache] = invalidator
+        if clear is not None:
+            self._clears[cache] = clear
+
+    def publish(self, cache: str, key: Any) -> None:
+        message = {"replica": self.replica, "cache": cache, "key": key}
+        try:
+            self._redis.publish(self.name, json.dumps(message))
+
+        except Exception as error:
+            logger.error(f"Could not publish cache invalidation: {error}")
+
+    def start(self) -> None:
+        """Listens to other replicas in a background thread."""
+
+        pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.name)
+        thread = threading.Thread(target=self._run, args=(pubsub,), daemon=True)
+        thread.start()
+
+    def _run(self, pubsub) -> None:
+        delay = self.retry_delay
+        while True:
+            try:
+                if pubsub is None:
+                    pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                    pubsub.subscribe(self.name)
+                    self._clear()
+                    logger.info("Cache invalidation channel reconnected.")
+                    delay = self.retry_delay
+
+                self._listen(pubsub)
+                raise ConnectionError("subscription ended")
+
+            except Exception as error:
+                logger.error(
+                    f"Cache invalidation channel failed, reconnecting in {delay:.1f}s: {error}"
+                )
+                self._close(pubsub)
+                pubsub = None
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_retry_delay)
+
+    def _clear(self) -> None:
+        for clear in self._clears.values():
+            clear()
+
+    @staticmethod
+    def _close(pubsub) -> None:
+        if pubsub is None:
+            return
+
+        try:
+            pubsub.close()
+
+        except Exception:
+            pass
+
+    def _listen(self, pubsub) -> None:
+        for message in pubsub.listen():
+            data = json.loads(message["data"])
+            if data["replica"] == self.replica:
+                continue
+
+            invalidator = self._invalidators.get(data["cache"])
+            if invalidator is not None:
+                key = data["key"]
+                invalidator(tuple(key) if isinstance(key, list) else key)
@@ -0,0 +1,74 @@
+"""Module "db".
+
+File:
+    marks.py
+
+About:
+    File describing cached access to peer marks.
+    "No mark" answers are cached too.
+"""
+
+from typing import Dict, Optional
+from toaster.enums import PeerMark
+from cache import LRUCache, MISSING
+from . import backend
+from .channel import InvalidationChannel
+import config
+
+
+CACHE_NAME = "marks"
+
+# Mark of each peer by bpid, None for unmarked peers.
+_cache = LRUCache(maxsize=config.PEER_CACHE_SIZE, ttl=config.PEER_CACHE_TTL)
+_channel: Optional[InvalidationChannel] = None
+
+
+def connect(channel: InvalidationChannel) -> None:
+    """Shares mark changes with other service replicas.
+
+    Args:
+        channel (InvalidationChannel): Invalidation channel.
+    """
+
+    global _channel
+    _channel = channel
+    channel.register(CACHE_NAME, invalidate, _cache.clear)
+
+
+def invalidate(bpid: int) -> None:
+    _cache.pop(bpid)
+
+
+def stats() -> Dict[str, float]:
+    return _cache.stats()
+
+
+def get_peer_mark(bpid: int) -> Optional[PeerMark]:
+    mark = _cache.get(bpid)
+    if mark is MISSING:
+        # A change during the read drops the value read.
+        version = _cache.version(bpid)
+        mark = backend.call("get_peer_mark", bpid=bpid)
+        _cache.fill(bpid, mark, version)
+
+    return mark
+
+
+def set_peer_mark(mark: PeerMark, bpid: int, name: str) -> None:
+    backend.call("set_peer_mark", mark=mark, bpid=bpid, name=name)
+    _changed(bpid)
+
+
+def drop_peer_mark(bpid: int) -> None:
+    backend.call("drop_peer_mark", bpid=bpid)
+    _changed(bpid)
+
+
+def update_peer_data(bpid: int, name: str) -> None:
+    backend.call("update_peer_data", bpid=bpid, name=name)
+
+
+def _changed(bpid: int) -> None:
+    invalidate(bpid)
+    if _channel is not None:
+        _channel.publish(CACHE_NAME, bpid)
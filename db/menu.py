@@ -0,0 +1,14 @@
+"""Module "db".
+
+File:
+    menu.py
+
+About:
+    File describing access to menu sessions.
+"""
+
+from . import backend
+
+
+def close_menu_session(bpid: int, cmid: int) -> None:
+    backend.call("close_menu_session", bpid=bpid, cmid=cmid)
@@ -0,0 +1,77 @@
+"""Module "db".
+
+File:
+    permissions.py
+
+About:
+    File describing cached access to user permissions.
+    "Plain user" answers are cached too.
+"""
+
+from typing import Dict, Optional, Tuple
+from toaster.enums import UserPermission
+from cache import LRUCache, MISSING
+from . import backend
+from .channel import InvalidationChannel
+import config
+
+
+CACHE_NAME = "permissions"
+
+# Permission by (uuid, bpid, ignore_staff).
+_cache = LRUCache(maxsize=config.PEER_CACHE_SIZE, ttl=config.PEER_CACHE_TTL)
+_channel: Optional[InvalidationChannel] = None
+
+
+def connect(channel: InvalidationChannel) -> None:
+    """Shares permission changes with other service replicas.
+
+    Args:
+        channel (InvalidationChannel): Invalidation channel.
+    """
+
+    global _channel
+    _channel = channel
+    channel.register(CACHE_NAME, invalidate, _cache.clear)
+
+
+def invalidate(key: Tuple[int, int]) -> None:
+    uuid, bpid = key
+    _cache.pop((uuid, bpid, False))
+    _cache.pop((uuid, bpid, True))
+
+
+def stats() -> Dict[str, float]:
+    return _cache.stats()
+
+
+def get_user_permission(
+    uuid: int, bpid: int, ignore_staff: bool = False
+) -> UserPermission:
+    key = (uuid, bpid, ignore_staff)
+    permission = _cache.get(key)
+    if permission is MISSING:
+        # A change during the read drops the value read.
+        version = _cache.version(key)
+        permission = backend.call(
+            "get_user_permission", uuid=uuid, bpid=bpid, ignore_staff=ignore_staff
+        )
+        _cache.fill(key, permission, version)
+
+    return permission
+
+
+def set_user_permission(uuid: int, bpid: int, lvl: UserPermission) -> None:
+    backend.call("set_user_permission", uuid=uuid, bpid=bpid, lvl=lvl)
+    _changed(uuid, bpid)
+
+
+def drop_user_permission(uuid: int, bpid: int) -> None:
+    backend.call("drop_user_permission", uuid=uuid, bpid=bpid)
+    _changed(uuid, bpid)
+
+
+def _changed(uuid: int, bpid: int) -> None:
+    invalidate((uuid, bpid))
+    if _channel is not None:
+        _channel.publish(CACHE_NAME, (uuid, bpid))
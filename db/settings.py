@@ -0,0 +1,274 @@
+"""Module "db".
+
+File:
+    settings.py
+
+About:
+    File describing cached access to peer settings.
+    Reads go through the cache, writes update both
+    the database and the cache.
+"""
+
+import itertools
+import threading
+from typing import Any, Dict, Optional, Tuple
+from sqlalchemy import case, select, update
+from toaster.enums import SettingDestination, SettingStatus
+from cache import LRUCache, MISSING
+from . import backend, tables
+from .channel import InvalidationChannel
+import config
+
+
+CACHE_NAME = "settings"
+
+# Settings of each peer by bpid, see _Entry.
+_cache = LRUCache(maxsize=config.SETTINGS_CACHE_SIZE, ttl=config.SETTINGS_CACHE_TTL)
+_lock = threading.Lock()
+# Lookups of single settings, the cache itself counts peers.
+_hits = 0
+_misses = 0
+# Source of entry versions, never repeats.
+_versions = itertools.count()
+_channel: Optional[InvalidationChannel] = None
+
+
+def connect(channel: InvalidationChannel) -> None:
+    """Shares settings changes with other service replicas.
+
+    Args:
+        channel (InvalidationChannel): Invalidation channel.
+    """
+
+    global _channel
+    _channel = channel
+    channel.register(CACHE_NAME, invalidate, _cache.clear)
+
+
+def invalidate(bpid: int) -> None:
+    _cache.pop(bpid)
+
+
+def stats() -> Dict[str, float]:
+    with _lock:
+        total = _hits + _misses
+        return {
+            "size": _cache.stats()["size"],
+            "hits": _hits,
+            "misses": _misses,
+            "hit_ratio": _hits / total if total else 0.0,
+        }
+
+
+def get_destinated_settings_status(
+    destination: SettingDestination, bpid: int
+) -> Dict[str, SettingStatus]:
+    statuses, version = _read(bpid, ("status", destination))
+    if statuses is MISSING:
+        statuses = backend.call(
+            "get_destinated_settings_status", destination=destination, bpid=bpid
+        )
+        _fill(bpid, ("status", destination), statuses, version)
+
+    # Callers are free to change the returned dict.
+    return dict(statuses)
+
+
+def update_setting_status(status: SettingStatus, bpid: int, name: str) -> None:
+    backend.call("update_setting_status", status=status, bpid=bpid, name=name)
+
+    with _lock:
+        entry = _entry(bpid)
+        for key, statuses in entry.values.items():
+            if key[0] == "status" and name in statuses:
+                entry.values[key] = {**statuses, name: status}
+        entry.version = next(_versions)
+
+    _publish(bpid)
+
+
+def get_setting_delay(name: str, bpid: int) -> int:
+    delay, version = _read(bpid, ("delay", name))
+    if delay is MISSING:
+        delay = backend.call("get_setting_delay", name=name, bpid=bpid)
+        _fill(bpid, ("delay", name), delay, version)
+
+    return delay
+
+
+def update_setting_delay(name: str, bpid: int, delay: int) -> None:
+    backend.call("update_setting_delay", name=name, bpid=bpid, delay=delay)
+    _write(bpid, ("delay", name), delay)
+    _publish(bpid)
+
+
+def increment_setting_delay(
+    name: str,
+    bpid: int,
+    delta: int,
+    minimum: Optional[int] = None,
+    maximum: Optional[int] = None,
+) -> int:
+    """Changes the setting delay by `delta`, clamped to
+    [`minimum`, `maximum`], and returns the new value.
+
+    The change is a single statement, atomic across threads,
+    processes and replicas.
+    """
+
+    delay = _increment("delay", bpid, name, delta, minimum, maximum)
+    _forget(bpid, ("delay", name))
+    _publish(bpid)
+
+    return delay
+
+
+def get_setting_points(bpid: int, name: str) -> int:
+    points, version = _read(bpid, ("points", name))
+    if points is MISSING:
+        points = backend.call("get_setting_points", bpid=bpid, name=name)
+        _fill(bpid, ("points", name), points, version)
+
+    return points
+
+
+def update_setting_points(bpid: int, name: str, points: int) -> None:
+    backend.call("update_setting_points", bpid=bpid, name=name, points=points)
+    _write(bpid, ("points", name), points)
+    _publish(bpid)
+
+
+def increment_setting_points(
+    bpid: int,
+    name: str,
+    delta: int,
+    minimum: Optional[int] = None,
+    maximum: Optional[int] = None,
+) -> int:
+    """Changes the setting points by `delta`, clamped to
+    [`minimum`, `maximum`], and returns the new value.
+
+    The change is a single statement, atomic across threads,
+    processes and replicas.
+    """
+
+    points = _increment("points", bpid, name, delta, minimum, maximum)
+    _forget(bpid, ("points", name))
+    _publish(bpid)
+
+    return points
+
+
+def _increment(
+    column: str,
+    bpid: int,
+    name: str,
+    delta: int,
+    minimum: Optional[int],
+    maximum: Optional[int],
+) -> int:
+    table = tables.settings
+    where = (table.c.bpid == bpid) & (table.c.name == name)
+
+    # CASE rather than LEAST/GREATEST, which SQLite lacks.
+    value = table.c[column] + delta
+    bounds = []
+    if minimum is not None:
+        bounds.append((value < minimum, minimum))
+    if maximum is not None:
+        bounds.append((value > maximum, maximum))
+    if bounds:
+        value = case(*bounds, else_=value)
+
+    statement = update(table).where(where).values({column: value})
+    with backend.transaction(f"increment_setting_{column}") as connection:
+        if connection.dialect.update_returning:
+            result = connection.execute(
+                statement.returning(table.c[column])
+            ).scalar_one_or_none()
+
+        # The update keeps the row locked until the commit.
+        elif connection.execute(statement).rowcount:
+            result = connection.execute(select(table.c[column]).where(where)).scalar_one()
+
+        else:
+            result = None
+
+    if result is None:
+        # No row to change, as with update_setting_*: nothing
+        # is stored, the change applies to the value read.
+        result = backend.call(f"get_setting_{column}", bpid=bpid, name=name) + delta
+        if minimum is not None:
+            result = max(result, minimum)
+        if maximum is not None:
+            result = min(result, maximum)
+
+    return result
+
+
+class _Entry:
+    """Cached settings of one peer: {(kind, name): value}, and the
+    version of their last change.
+    """
+
+    __slots__ = ("values", "version")
+
+    def __init__(self) -> None:
+        self.values: dict = {}
+        self.version = next(_versions)
+
+
+def _entry(bpid: int) -> _Entry:
+    entry = _cache.get(bpid, count=False)
+    if entry is MISSING:
+        entry = _Entry()
+        _cache.set(bpid, entry)
+
+    return entry
+
+
+def _read(bpid: int, key: tuple) -> Tuple[Any, int]:
+    """Returns the cached value, or MISSING, and the entry
+    version a value read from the database is filled at.
+    """
+
+    global _hits, _misses
+    with _lock:
+        entry = _entry(bpid)
+        value = entry.values.get(key, MISSING)
+        if value is MISSING:
+            _misses += 1
+        else:
+            _hits += 1
+
+        return value, entry.version
+
+
+def _fill(bpid: int, key: tuple, value, version: int) -> None:
+    with _lock:
+        # A change since the miss, or a dropped entry, may be
+        # newer than the value read: leave it to the next read.
+        entry = _cache.get(bpid, count=False)
+        if entry is not MISSING and entry.version == version:
+            entry.values[key] = value
+
+
+def _write(bpid: int, key: tuple, value) -> None:
+    with _lock:
+        entry = _entry(bpid)
+        entry.values[key] = value
+        entry.version = next(_versions)
+
+
+def _forget(bpid: int, key: tuple) -> None:
+    # Concurrent increments return in any order, the
+    # next read takes the stored value instead.
+    with _lock:
+        entry = _entry(bpid)
+        entry.values.pop(key, None)
+        entry.version = next(_versions)
+
+
+def _publish(bpid: int) -> None:
+    if _channel is not None:
+        _channel.publish(CACHE_NAME, bpid)
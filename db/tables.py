@@ -0,0 +1,48 @@
+"""Module "db".
+
+File:
+    tables.py
+
+About:
+    File describing the tables of the toaster database
+    the service changes with its own statements.
+"""
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, inspect
+from sqlalchemy.engine import Connection
+
+
+metadata = MetaData()
+
+# Settings of each peer, one row per setting name.
+settings = Table(
+    "settings",
+    metadata,
+    Column("bpid", Integer, primary_key=True),
+    Column("name", String(64), primary_key=True),
+    Column("delay", Integer, nullable=False, default=0),
+    Column("points", Integer, nullable=False, default=0),
+)
+
+
+def check(connection: Connection) -> None:
+    """Checks the database has the columns the statements use.
+
+    Args:
+        connection (Connection): Connection to the database.
+
+    Raises:
+        LookupError: A table or column is missing.
+    """
+
+    inspector = inspect(connection)
+    for table in metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            raise LookupError(f"Table '{table.name}' does not exist.")
+
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+        missing = [column.name for column in table.columns if column.name not in columns]
+        if missing:
+            raise LookupError(
+                f"Table '{table.name}' lacks the columns: {', '.join(missing)}."
+            )
@@ -0,0 +1,30 @@
+"""Module "dispatch".
+
+File:
+    __init__.py
+
+About:
+    Initializing the "dispatch" module.
+"""
+
+from .dispatchers import (
+    SerialDispatcher,
+    ThreadDispatcher,
+    AsyncioDispatcher,
+)
+from .ring import HashRing
+from .supervisor import Supervisor
+
+
+dispatcher_list = {
+    SerialDispatcher.NAME: SerialDispatcher,
+    ThreadDispatcher.NAME: ThreadDispatcher,
+    AsyncioDispatcher.NAME: AsyncioDispatcher,
+}
+
+
+__all__ = (
+    "dispatcher_list",
+    "HashRing",
+    "Supervisor",
+)
@@ -0,0 +1,108 @@
+"""Module "dispatch".
+
+File:
+    base.py
+
+About:
+    File describing the base event dispatcher class.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, Optional
+from loguru import logger
+from funcka_bots.events import BaseEvent
+from .lanes import LaneStats, ordering_keys
+
+
+Handler = Callable[[BaseEvent], None]
+
+
+class BaseDispatcher(ABC):
+    """Base class of the broker event dispatcher.
+
+    The dispatcher takes events from the broker and passes
+    them to the handler across `workers` workers. At most
+    `queue_size` events wait for a free worker in each lane.
+    When a lane is full, the dispatcher either blocks the
+    broker ("block") or drops the event ("drop").
+
+    With `ordering` other than "none", events are sharded by
+    key onto `workers` serial lanes, so events with the same
+    key are handled in order while different keys run in
+    parallel. Otherwise all workers share one lane.
+
+    `done`, when given, is called with every event once it is
+    handled or dropped, e.g. to acknowledge it to the broker.
+    Once the events are handled, `run` calls the handler's
+    `close`, if it has one.
+    """
+
+    NAME = "None"
+    BACKPRESSURE_MODES = ("block", "drop")
+
+    def __init__(
+        self,
+        handler: Handler,
+        workers: int = 1,
+        queue_size: int = 0,
+        backpressure: str = "block",
+        ordering: str = "peer",
+        done: Optional[Handler] = None,
+    ) -> None:
+        if backpressure not in self.BACKPRESSURE_MODES:
+            raise ValueError(f"Unknown backpressure mode '{backpressure}'.")
+
+        if ordering not in ordering_keys:
+            raise ValueError(f"Unknown ordering '{ordering}'.")
+
+        self.handler = handler
+        self.workers = workers
+        self.queue_size = queue_size
+        self.backpressure = backpressure
+        self.done = done
+
+        self._key = ordering_keys[ordering]
+        lanes = workers if self._key is not None else 1
+        self.lanes: List[LaneStats] = [LaneStats() for _ in range(lanes)]
+
+    @abstractmethod
+    def run(self, events: Iterable[BaseEvent]) -> None:
+        """Dispatches events until the broker stops.
+
+        Args:
+            events (Iterable[BaseEvent]): Broker events.
+        """
+
+    def stats(self) -> List[Dict[str, float]]:
+        """Returns occupancy and wait time of every lane."""
+
+        return [lane.snapshot() for lane in self.lanes]
+
+    def _lane_of(self, event: BaseEvent) -> int:
+        if self._key is None:
+            return 0
+
+        return hash(self._key(event)) % len(self.lanes)
+
+    def _handle(self, event: BaseEvent) -> None:
+        try:
+            self.handler(event)
+
+        except Exception as error:
+            logger.error(f"Event handling failed: {error}")
+
+        finally:
+            self._finish(event)
+
+    def _close(self) -> None:
+        close = getattr(self.handler, "close", None)
+        if close is not None:
+            close()
+
+    def _drop(self, event: BaseEvent) -> None:
+        logger.warning(f"Event '{event.event_id}' dropped: queue is full.")
+        self._finish(event)
+
+    def _finish(self, event: BaseEvent) -> None:
+        if self.done is not None:
+            self.done(event)
@@ -0,0 +1,174 @@
+"""Module "dispatch".
+
+File:
+    dispatchers.py
+
+About:
+    File describing broker event dispatchers.
+"""
+
+import asyncio
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
+from loguru import logger
+from funcka_bots.events import BaseEvent
+from .base import BaseDispatcher
+from .lanes import LaneStats
+
+
+class SerialDispatcher(BaseDispatcher):
+    """Handles events one by one in the broker loop."""
+
+    NAME = "serial"
+
+    def run(self, events: Iterable[BaseEvent]) -> None:
+        try:
+            for event in events:
+                lane = self.lanes[self._lane_of(event)]
+                lane.started(lane.enqueued())
+                self._handle(event)
+                lane.finished()
+
+        finally:
+            self._close()
+
+
+class ThreadDispatcher(BaseDispatcher):
+    """Handles events on a pool of worker threads."""
+
+    NAME = "thread"
+
+    def run(self, events: Iterable[BaseEvent]) -> None:
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.lanes]
+        threads = [
+            threading.Thread(
+                target=self._work,
+                args=(queues[index % len(queues)], self.lanes[index % len(queues)]),
+                daemon=True,
+            )
+            for index in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        for event in events:
+            index = self._lane_of(event)
+            lane = self.lanes[index]
+            item = (event, lane.enqueued())
+
+            if self.backpressure == "block":
+                queues[index].put(item)
+                continue
+
+            try:
+                queues[index].put_nowait(item)
+            except queue.Full:
+                lane.dropped()
+                self._drop(event)
+
+        for index in range(self.workers):
+            queues[index % len(queues)].put(None)
+
+        for thread in threads:
+            thread.join()
+
+        self._close()
+
+    def _work(self, pending: queue.Queue, lane: LaneStats) -> None:
+        while (item := pending.get()) is not None:
+            event, enqueued_at = item
+            lane.started(enqueued_at)
+            self._handle(event)
+            lane.finished()
+
+
+class AsyncioDispatcher(BaseDispatcher):
+    """Handles events on worker coroutines of an event loop.
+
+    A coroutine handler (AsyncButtonHandler) is awaited directly,
+    a synchronous one runs in a pool of `workers` threads.
+    """
+
+    NAME = "asyncio"
+
+    def run(self, events: Iterable[BaseEvent]) -> None:
+        asyncio.run(self._serve(events))
+
+    async def _serve(self, events: Iterable[BaseEvent]) -> None:
+        try:
+            await self._run(events)
+
+        finally:
+            # The handler's client sessions belong to this loop.
+            close = getattr(self.handler, "close", None)
+            if asyncio.iscoroutinefunction(close):
+                await close()
+            elif close is not None:
+                await asyncio.to_thread(close)
+
+    async def _run(self, events: Iterable[BaseEvent]) -> None:
+        loop = asyncio.get_running_loop()
+        queues = [asyncio.Queue(maxsize=self.queue_size) for _ in self.lanes]
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        workers = [
+            asyncio.create_task(
+                self._work(
+                    queues[index % len(queues)],
+                    self.lanes[index % len(queues)],
+                    executor,
+                )
+            )
+            for index in range(self.workers)
+        ]
+
+        # The broker is blocking, so it is read outside the event loop.
+        iterator = iter(events)
+        with ThreadPoolExecutor(max_workers=1) as reader:
+            while (event := await loop.run_in_executor(reader, next, iterator, None)) is not None:
+                index = self._lane_of(event)
+                lane = self.lanes[index]
+                item = (event, lane.enqueued())
+
+                if self.backpressure == "block":
+                    await queues[index].put(item)
+                    continue
+
+                try:
+                    queues[index].put_nowait(item)
+                except asyncio.QueueFull:
+                    lane.dropped()
+                    self._drop(event)
+
+        for index in range(self.workers):
+            await queues[index % len(queues)].put(None)
+
+        await asyncio.gather(*workers)
+        executor.shutdown()
+
+    async def _work(
+        self,
+        pending: asyncio.Queue,
+        lane: LaneStats,
+        executor: ThreadPoolExecutor,
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        while (item := await pending.get()) is not None:
+            event, enqueued_at = item
+            lane.started(enqueued_at)
+            if asyncio.iscoroutinefunction(self.handler.__call__):
+                await self._handle_async(event)
+            else:
+                await loop.run_in_executor(executor, self._handle, event)
+            lane.finished()
+
+    async def _handle_async(self, event: BaseEvent) -> None:
+        try:
+            await self.handler(event)
+
+        except Exception as error:
+            logger.error(f"Event handling failed: {error}")
+
+        finally:
+            self._finish(event)
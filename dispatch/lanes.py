@@ -0,0 +1,78 @@
+"""Module "dispatch".
+
+File:
+    lanes.py
+
+About:
+    File describing event lanes: serial queues that
+    preserve the order of events with the same key.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+from funcka_bots.events import BaseEvent
+
+
+OrderingKey = Optional[Callable[[BaseEvent], Any]]
+
+
+ordering_keys: Dict[str, OrderingKey] = {
+    # No ordering: every worker takes events from one shared lane.
+    "none": None,
+    # Events of one peer are handled in order.
+    "peer": lambda event: event.peer.bpid,
+    # Events of one menu message are handled in order.
+    "menu": lambda event: (event.peer.bpid, event.button.cmid),
+}
+
+
+class LaneStats:
+    """Occupancy and wait time counters of a single lane."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.busy = 0
+        self.handled = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def enqueued(self) -> float:
+        """Registers a queued event.
+
+        Returns:
+            float: Enqueue timestamp to pass to `started`.
+        """
+
+        with self._lock:
+            self.queued += 1
+
+        return time.perf_counter()
+
+    def started(self, enqueued_at: float) -> None:
+        wait = time.perf_counter() - enqueued_at
+        with self._lock:
+            self.queued -= 1
+            self.busy += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+
+    def finished(self) -> None:
+        with self._lock:
+            self.busy -= 1
+            self.handled += 1
+
+    def dropped(self) -> None:
+        with self._lock:
+            self.queued -= 1
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "queued": self.queued,
+                "busy": self.busy,
+                "handled": self.handled,
+                "wait_avg": self.wait_total / self.handled if self.handled else 0.0,
+                "wait_max": self.wait_max,
+            }
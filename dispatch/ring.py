@@ -0,0 +1,42 @@
+"""Module "dispatch".
+
+File:
+    ring.py
+
+About:
+    File describing the consistent hash ring
+    assigning event keys to worker processes.
+"""
+
+import bisect
+import zlib
+from typing import Any
+
+
+class HashRing:
+    """Consistent hash ring of `nodes` node indexes.
+
+    Every node owns `replicas` points of the ring, a key goes
+    to the node owning the next point. Keys hash the same in
+    every process, and changing the number of nodes moves only
+    the keys of the added or removed nodes, so per-process
+    caches stay warm across a resize.
+    """
+
+    def __init__(self, nodes: int, replicas: int = 64) -> None:
+        points = sorted(
+            (self._hash(f"{node}:{replica}"), node)
+            for node in range(nodes)
+            for replica in range(replicas)
+        )
+        self.nodes = nodes
+        self._hashes = [point for point, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def node(self, key: Any) -> int:
+        index = bisect.bisect(self._hashes, self._hash(str(key)))
+        return self._nodes[index % len(self._nodes)]
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return zlib.crc32(value.encode())
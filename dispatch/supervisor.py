@@ -0,0 +1,464 @@
+"""Module "dispatch".
+
+File:
+    supervisor.py
+
+About:
+    File describing the supervisor dispatching events
+    to worker processes.
+"""
+
+import itertools
+import multiprocessing
+import signal
+import threading
+import time
+from collections import deque
+from multiprocessing.connection import Connection, wait
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+from loguru import logger
+from funcka_bots.events import BaseEvent
+from metrics import registry
+from metrics.metrics import Family
+from .base import BaseDispatcher, Handler
+from .lanes import LaneStats
+from .ring import HashRing
+
+
+# Builds the dispatcher of a worker process from its `done` callback.
+WorkerFactory = Callable[[Handler], BaseDispatcher]
+
+_READY = "ready"
+_METRICS = "metrics"
+
+
+class _Worker:
+    def __init__(self, index: int, process, inbox: Connection, outbox: Connection) -> None:
+        self.index = index
+        self.process = process
+        self.inbox = inbox
+        self.outbox = outbox
+        self.ready = threading.Event()
+        self.exited = False
+        # Keeps events of one worker in order across a restart.
+        self.send_lock = threading.Lock()
+
+
+class Supervisor(BaseDispatcher):
+    """Runs `processes` worker processes and routes events to them.
+
+    Each worker builds its own handler and dispatcher with
+    `factory`, which must be importable by name, as workers are
+    spawned. Events are routed by the ordering key on a
+    consistent hash ring, so events with the same key are
+    handled by one worker, in order.
+
+    A crashed worker is restarted, and the events it had not
+    reported done are sent to its replacement. Restarts wait
+    `restart_backoff` seconds, doubled for every other restart
+    in the last `restart_window` seconds. Past `restart_limit`
+    restarts in the window the supervisor stops, and `run`
+    raises once the workers are stopped. On SIGTERM, or `stop`,
+    the supervisor stops reading the broker, lets the workers
+    finish their events for up to `drain_timeout` seconds and
+    stops them. A broker read waiting for an event returns
+    only through `interrupt`, e.g. Consumer.stop; otherwise the
+    supervisor stops once the next event arrives.
+
+    With `metrics_interval`, workers send a snapshot of their
+    metrics that often, and once more when they stop; `metrics`
+    returns the latest snapshots, labelled by worker.
+    """
+
+    NAME = "process"
+
+    def __init__(
+        self,
+        factory: WorkerFactory,
+        processes: int,
+        ordering: str = "peer",
+        done: Optional[Handler] = None,
+        drain_timeout: float = 30.0,
+        metrics_interval: float = 0,
+        restart_limit: int = 10,
+        restart_window: float = 60.0,
+        restart_backoff: float = 0.5,
+        interrupt: Optional[Callable[[], None]] = None,
+    ) -> None:
+        super().__init__(factory, workers=processes, ordering=ordering, done=done)
+        self.factory = factory
+        self.drain_timeout = drain_timeout
+        self.metrics_interval = metrics_interval
+        self.restart_limit = restart_limit
+        self.restart_window = restart_window
+        self.restart_backoff = restart_backoff
+        self.interrupt = interrupt
+        self.restarts = 0
+        self.lanes = [LaneStats() for _ in range(processes)]
+
+        self._ring = HashRing(processes)
+        self._round_robin = itertools.count()
+        self._context = multiprocessing.get_context("spawn")
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._sequence = itertools.count(1)
+        self._pending: List[Dict[int, Tuple[BaseEvent, float]]] = [
+            {} for _ in range(processes)
+        ]
+        self._workers: List[_Worker] = []
+        self._snapshots: Dict[int, List[Family]] = {}
+        self._monitor: Optional[threading.Thread] = None
+        self._started = False
+        # Times of the restarts in the window, and restarts waiting.
+        self._restarted: Deque[float] = deque()
+        self._restarting = 0
+        self._failed = False
+        self._stopping = threading.Event()
+        self._closed = threading.Event()
+        self._closing = False
+
+    def start(self) -> None:
+        """Starts the workers and waits until they are ready.
+
+        Raises:
+            RuntimeError: A worker exited before it was ready.
+        """
+
+        if self._workers:
+            return
+
+        self._workers = [self._spawn(index) for index in range(self.workers)]
+        self._monitor = threading.Thread(target=self._watch, name="supervisor", daemon=True)
+        self._monitor.start()
+        for worker in self._workers:
+            while not worker.ready.wait(0.1):
+                if worker.exited:
+                    self._stop()
+                    raise RuntimeError(
+                        f"Worker {worker.index} exited with code "
+                        f"{worker.process.exitcode} before it was ready."
+                    )
+
+        self._started = True
+
+    def run(self, events: Iterable[BaseEvent]) -> None:
+        self.start()
+        previous = None
+        if threading.current_thread() is threading.main_thread():
+            previous = signal.signal(signal.SIGTERM, self._terminate)
+
+        try:
+            for event in events:
+                self._send(event)
+                if self._stopping.is_set():
+                    break
+
+        finally:
+            if previous is not None:
+                signal.signal(signal.SIGTERM, previous)
+
+            self._stop()
+
+        if self._failed:
+            raise RuntimeError("Workers kept crashing, the restart limit was reached.")
+
+    def stop(self) -> None:
+        """Stops reading the broker, the workers then finish
+        their events. Safe to call from a signal handler."""
+
+        self._stopping.set()
+        if self.interrupt is not None:
+            self.interrupt()
+
+    def metrics(self) -> List[Family]:
+        """Returns the latest metrics of the workers, with
+        a "worker" label added to each sample."""
+
+        with self._lock:
+            snapshots = sorted(self._snapshots.items())
+
+        families = []
+        for index, snapshot in snapshots:
+            worker = str(index)
+            for name, help, type, samples in snapshot:
+                labelled = [
+                    (sample, {**labels, "worker": worker}, value)
+                    for sample, labels, value in samples
+                ]
+                families.append((name, help, type, labelled))
+
+        return families
+
+    def _lane_of(self, event: BaseEvent) -> int:
+        if self._key is None:
+            return next(self._round_robin) % self.workers
+
+        return self._ring.node(self._key(event))
+
+    def _send(self, event: BaseEvent) -> None:
+        index = self._lane_of(event)
+        sequence = next(self._sequence)
+        with self._lock:
+            self._pending[index][sequence] = (event, self.lanes[index].enqueued())
+            worker = self._workers[index]
+
+        with worker.send_lock:
+            try:
+                worker.inbox.send((sequence, event))
+            except OSError:
+                # The worker is gone: its replacement gets the event.
+                pass
+
+    def _spawn(self, index: int) -> _Worker:
+        inbox_reader, inbox = self._context.Pipe(duplex=False)
+        outbox, outbox_writer = self._context.Pipe(duplex=False)
+        process = self._context.Process(
+            target=_serve,
+            args=(self.factory, inbox_reader, outbox_writer, self.metrics_interval),
+            name=f"button-worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        inbox_reader.close()
+        outbox_writer.close()
+        return _Worker(index, process, inbox, outbox)
+
+    def _watch(self) -> None:
+        while True:
+            with self._lock:
+                workers = [worker for worker in self._workers if not worker.exited]
+                restarting = self._restarting
+
+            if not workers:
+                if not restarting:
+                    return
+
+                time.sleep(0.1)
+                continue
+
+            outboxes = {worker.outbox: worker for worker in workers}
+            sentinels = {worker.process.sentinel: worker for worker in workers}
+            for ready in wait([*outboxes, *sentinels], timeout=1.0):
+                if ready in outboxes:
+                    self._receive(outboxes[ready])
+                else:
+                    self._exited(sentinels[ready])
+
+    def _receive(self, worker: _Worker) -> bool:
+        try:
+            message = worker.outbox.recv()
+        except (EOFError, OSError):
+            return False
+
+        if message == _READY:
+            worker.ready.set()
+            return True
+
+        if isinstance(message, tuple) and message[0] == _METRICS:
+            with self._lock:
+                self._snapshots[worker.index] = message[1]
+            return True
+
+        with self._lock:
+            event, enqueued_at = self._pending[worker.index].pop(message, (None, 0.0))
+            if not any(self._pending):
+                self._idle.notify_all()
+
+        if event is not None:
+            lane = self.lanes[worker.index]
+            lane.started(enqueued_at)
+            lane.finished()
+            self._finish(event)
+
+        return True
+
+    def _exited(self, worker: _Worker) -> None:
+        # Collect what the worker reported before it exited.
+        while worker.outbox.poll() and self._receive(worker):
+            pass
+
+        # The sentinel is ready before the process is reaped.
+        worker.process.join()
+        worker.exited = True
+        code = worker.process.exitcode
+        # Before the start is over, start() reports the exit.
+        if not self._started or self._closing:
+            return
+
+        if self._stopping.is_set() and code == 0:
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            while self._restarted and self._restarted[0] <= now - self.restart_window:
+                self._restarted.popleft()
+
+            if len(self._restarted) >= self.restart_limit:
+                self._failed = True
+                # Left unacknowledged for the broker to redeliver.
+                self._pending[worker.index].clear()
+                self._idle.notify_all()
+            else:
+                self._restarted.append(now)
+                self._restarting += 1
+                delay = self.restart_backoff * 2 ** (len(self._restarted) - 1)
+
+        if self._failed:
+            logger.error(
+                f"Worker {worker.index} exited with code {code}, "
+                f"{self.restart_limit} restarts in {self.restart_window}s, stopping."
+            )
+            self.stop()
+            return
+
+        self.restarts += 1
+        delay = min(delay, self.restart_window)
+        logger.error(
+            f"Worker {worker.index} exited with code {code}, restarting in {delay:.1f}s."
+        )
+        threading.Thread(
+            target=self._restart, args=(worker.index, delay), daemon=True
+        ).start()
+
+    def _restart(self, index: int, delay: float) -> None:
+        try:
+            if self._closed.wait(delay):
+                return
+
+            replacement = self._spawn(index)
+            replacement.send_lock.acquire()
+            with self._lock:
+                closing = self._closing
+                if not closing:
+                    self._workers[index] = replacement
+                    resend = sorted(self._pending[index].items())
+
+        finally:
+            with self._lock:
+                self._restarting -= 1
+
+        if closing:
+            replacement.process.terminate()
+            replacement.process.join()
+            return
+
+        self._resend(replacement, resend)
+
+    def _resend(self, worker: _Worker, resend: list) -> None:
+        try:
+            for sequence, (event, _) in resend:
+                worker.inbox.send((sequence, event))
+            if self._stopping.is_set():
+                worker.inbox.send(None)
+
+        except OSError:
+            pass
+
+        finally:
+            worker.send_lock.release()
+
+    def _terminate(self, signum, frame) -> None:
+        logger.info("Draining the workers.")
+        self.stop()
+
+    def _stop(self) -> None:
+        self._stopping.set()
+        with self._lock:
+            workers = list(self._workers)
+
+        for worker in workers:
+            with worker.send_lock:
+                try:
+                    worker.inbox.send(None)
+                except OSError:
+                    pass
+
+        deadline = time.monotonic() + self.drain_timeout
+        with self._lock:
+            while any(self._pending) and time.monotonic() < deadline:
+                self._idle.wait(deadline - time.monotonic())
+
+            left = sum(len(pending) for pending in self._pending)
+            self._closing = True
+            self._closed.set()
+            workers = list(self._workers)
+
+        if left:
+            logger.warning(f"{left} events were not handled before the drain timeout.")
+
+        for worker in workers:
+            worker.process.join(max(deadline - time.monotonic(), 1.0))
+            if worker.process.is_alive():
+                worker.process.terminate()
+                worker.process.join()
+
+        if self._monitor is not None:
+            self._monitor.join()
+
+
+def _serve(
+    factory: WorkerFactory,
+    inbox: Connection,
+    outbox: Connection,
+    metrics_interval: float = 0,
+) -> None:
+    """Worker process entry point."""
+
+    # The supervisor decides when workers stop.
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    lock = threading.Lock()
+    sequences: Dict[int, int] = {}
+
+    def done(event: BaseEvent) -> None:
+        with lock:
+            sequence = sequences.pop(id(event), None)
+            if sequence is not None:
+                outbox.send(sequence)
+
+    def send_metrics() -> None:
+        with lock:
+            outbox.send((_METRICS, registry.collect()))
+
+    def report_metrics() -> None:
+        while True:
+            time.sleep(metrics_interval)
+            try:
+                send_metrics()
+            except OSError:
+                return
+
+    dispatcher = factory(done)
+    outbox.send(_READY)
+    if metrics_interval > 0:
+        threading.Thread(target=report_metrics, name="metrics", daemon=True).start()
+
+    dispatcher.run(_receive(inbox, sequences, lock))
+    if metrics_interval > 0:
+        send_metrics()
+
+
+def _receive(
+    inbox: Connection, sequences: Dict[int, int], lock: threading.Lock
+) -> Iterator[BaseEvent]:
+    last = 0
+    while True:
+        try:
+            item = inbox.recv()
+        except EOFError:
+            return
+
+        if item is None:
+            return
+
+        sequence, event = item
+        # Events resent after a restart may arrive twice.
+        if sequence <= last:
+            continue
+
+        last = sequence
+        with lock:
+            sequences[id(event)] = sequence
+
+        yield event
@@ -7,7 +7,10 @@ About:
     Initializing the "handler" module.
 """
 
-from .handler import ButtonHandler
+from .handler import ButtonHandler, AsyncButtonHandler
 
 
-__all__ = ("ButtonHandler",)
+__all__ = (
+    "ButtonHandler",
+    "AsyncButtonHandler",
+)
@@ -0,0 +1,154 @@
+"""Module "handler".
+
+File:
+    dedup.py
+
+About:
+    File describing the filter of repeated button events.
+"""
+
+import asyncio
+import json
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+from funcka_bots.events import BaseEvent
+from cache import WindowSet, RedisWindowSet
+
+
+KeySet = Union[WindowSet, RedisWindowSet]
+# Kind of the key, its set and the key itself.
+Key = Tuple[str, KeySet, str]
+
+
+class Claim:
+    """Keys of an event taken by DuplicateFilter.claim.
+
+    Used as a context manager around handling the event: the
+    keys are remembered when the block exits without an error,
+    and released otherwise.
+    """
+
+    def __init__(
+        self, owner: "DuplicateFilter", keys: List[Key], duplicate: Optional[str]
+    ) -> None:
+        self.duplicate = duplicate
+        self._owner = owner
+        self._keys = keys
+
+    def confirm(self) -> None:
+        self._owner._confirm(self._keys)
+
+    def release(self) -> None:
+        self._owner._release(self._keys)
+
+    def __enter__(self) -> "Claim":
+        return self
+
+    def __exit__(self, kind, error, traceback) -> None:
+        if error is None:
+            self.confirm()
+        else:
+            self.release()
+
+    async def __aenter__(self) -> "Claim":
+        return self
+
+    async def __aexit__(self, kind, error, traceback) -> None:
+        if error is not None:
+            self.release()
+        elif self._owner.remote:
+            await asyncio.to_thread(self.confirm)
+        else:
+            self.confirm()
+
+
+class DuplicateFilter:
+    """Recognizes repeated button events.
+
+    An event is a duplicate when its id was seen within
+    `event_window` seconds (VK retried the callback), or when
+    the same user pressed the same button of the same message
+    within `click_window` seconds. A window of 0 disables the
+    check. Seen keys are kept in memory, at most `maxsize` of
+    each kind, or in the store at `url` shared by the replicas.
+
+    Keys are only remembered once the event was handled, so an
+    event redelivered after a failure or a crash is handled
+    again. Until then they are held by this filter alone: events
+    of the same key handled by two replicas at once both run.
+    """
+
+    def __init__(
+        self,
+        event_window: float,
+        click_window: float,
+        maxsize: int = 10000,
+        url: Optional[str] = None,
+        prefix: str = "button-handler.",
+    ) -> None:
+        self.remote = url is not None
+        self._events = self._keys(event_window, maxsize, url, f"{prefix}event:")
+        self._clicks = self._keys(click_window, maxsize, url, f"{prefix}click:")
+
+        self._lock = threading.Lock()
+        # Keys of the events being handled: {(kind, key)}.
+        self._pending: Set[Tuple[str, str]] = set()
+
+    def claim(
+        self, event: BaseEvent, payload: Dict[str, Any], clicks: bool = True
+    ) -> Claim:
+        """Takes the keys of the event, unless it is a duplicate.
+
+        Args:
+            clicks (bool): Whether repeated clicks are duplicates.
+
+        Returns:
+            Claim: Claim of the keys. Its `duplicate` is "event" or
+                "click" for a duplicate event, after the key it
+                repeats, otherwise None.
+        """
+
+        keys: List[Key] = []
+        if self._events is not None:
+            keys.append(("event", self._events, str(event.button.beid)))
+
+        if clicks and self._clicks is not None:
+            button = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+            keys.append(
+                ("click", self._clicks, f"{event.user.uuid}:{event.button.cmid}:{button}")
+            )
+
+        for kind, seen, key in keys:
+            if seen.contains(key):
+                return Claim(self, [], kind)
+
+        with self._lock:
+            for kind, _, key in keys:
+                if (kind, key) in self._pending:
+                    return Claim(self, [], kind)
+
+            self._pending.update((kind, key) for kind, _, key in keys)
+
+        return Claim(self, keys, None)
+
+    def _confirm(self, keys: List[Key]) -> None:
+        for _, seen, key in keys:
+            seen.add(key)
+
+        self._release(keys)
+
+    def _release(self, keys: List[Key]) -> None:
+        with self._lock:
+            self._pending.difference_update((kind, key) for kind, _, key in keys)
+
+    @staticmethod
+    def _keys(
+        window: float, maxsize: int, url: Optional[str], prefix: str
+    ) -> Optional[KeySet]:
+        if window <= 0:
+            return None
+
+        if url is not None:
+            return RedisWindowSet(url, window, prefix)
+
+        return WindowSet(maxsize, window)
@@ -7,51 +7,150 @@ About:
     File describing button handler class.
 """
 
-from typing import NoReturn, Optional, Any, Union, Dict
+import asyncio
+import time
+from typing import NoReturn, Optional, Any, Union, Dict, Tuple
 from loguru import logger
-from vk_api import VkApi
 from funcka_bots.events import BaseEvent
 from funcka_bots.handler import ABCHandler
-from actions import action_list
+from actions import action_list, build_registry, coalesced_actions, click_coalescer
+from api import VkSession, AsyncVkSession, ExecuteBatcher, RateLimiter
+from tracing import trace, span, tag
+from metrics import actions_total, action_seconds, duplicates_total, events_in_flight
+from logs import sampled
+from .dedup import DuplicateFilter
 import config
 
 
 Payload = Dict[str, Union[str, int]]
 ExecResult = Optional[Union[bool, NoReturn]]
+# Action name and result of the handled event.
+Outcome = Tuple[str, str]
 
 
 class ButtonHandler(ABCHandler):
     """Button handler class"""
 
+    def __init__(self) -> None:
+        super().__init__()
+        self.limiter = None
+        if config.VK_RATE_LIMIT > 0:
+            self.limiter = RateLimiter(config.VK_RATE_LIMIT, config.VK_RATE_BURST)
+
+        self._session = VkSession(
+            token=config.VK_GROUP_TOKEN,
+            api_version=config.VK_API_VERSION,
+            pool_size=config.VK_API_POOL_SIZE,
+            base_url=config.VK_API_URL,
+            limiter=self.limiter,
+            timeout=config.VK_API_TIMEOUT,
+        )
+        if config.VK_BATCH_WINDOW > 0:
+            batcher = ExecuteBatcher(
+                self._session,
+                window=config.VK_BATCH_WINDOW,
+                max_calls=config.VK_BATCH_SIZE,
+                timeout=config.VK_BATCH_TIMEOUT,
+            )
+            self._api = batcher.get_api()
+        else:
+            self._api = self._session.get_api()
+
+        self._actions = build_registry(action_list, self._get_api())
+        self._duplicates = DuplicateFilter(
+            event_window=config.DEDUP_EVENT_WINDOW,
+            click_window=config.DEDUP_CLICK_WINDOW,
+            maxsize=config.DEDUP_SIZE,
+            url=config.DEDUP_URL,
+        )
+
     def __call__(self, event: BaseEvent) -> None:
+        events_in_flight.inc()
+        start = time.perf_counter()
         try:
-            payload = self._get_payload(event)
+            with trace("event", bpid=event.peer.bpid):
+                outcome = self._handle(event)
+            self._observe(event, outcome, start)
+
+        finally:
+            events_in_flight.dec()
 
-            self._check_owner(payload, event)
+    def _handle(self, event: BaseEvent) -> Outcome:
+        action_name = None
+        try:
+            with span("payload"):
+                payload = self._get_payload(event)
 
             action_name = payload.get("action_name")
-            if self._execute(action_name, event):
-                logger.info(f"Action '{action_name}' executed.")
-                return
+            with span("dedup"):
+                claim = self._duplicates.claim(event, payload, self._clicks(action_name))
+            if claim.duplicate is not None:
+                duplicates_total.inc(claim.duplicate)
+                return action_name, "duplicate"
+
+            # The event counts as seen only once it was handled.
+            with claim:
+                with span("check_owner"):
+                    self._check_owner(payload, event)
+
+                tag(action_name=action_name)
+                executed = self._execute(action_name, event)
+
+            if executed:
+                return action_name, "executed"
 
         except PermissionError as error:
             self._execute("reject_access", event)
-            logger.error(f"Access rejected: {error}")
+            self._log_failure("Access rejected: {reason}", event, action_name, error)
+            return action_name, "rejected"
 
         except Exception as error:
             self._execute("error", event)
-            logger.error(error)
+            self._log_failure("{reason}", event, action_name, error)
+            return action_name, "errored"
 
         else:
-            logger.info("Not a single action was executed.")
+            return action_name, "skipped"
 
     def _execute(self, action_name: str, event: BaseEvent) -> ExecResult:
-        selected = action_list.get(action_name)
-        if selected is None:
+        action = self._actions.get(action_name)
+        if action is None:
             raise ValueError(f"Could not call action '{action_name}'.")
 
-        action_obj = selected(self._get_api())
-        return action_obj(event)
+        with span("action.handle", action_name=action_name):
+            return action(event)
+
+    @staticmethod
+    def _observe(event: BaseEvent, outcome: Outcome, start: float) -> None:
+        action_name, result = outcome
+        duration = time.perf_counter() - start
+
+        # Payloads are user input: keep label values bounded.
+        label = action_name if action_name in action_list else "unknown"
+        actions_total.inc(label, result)
+        action_seconds.observe(duration, label)
+
+        if sampled(config.LOG_SAMPLE_RATE):
+            logger.info(
+                "Action '{action_name}' {result}.",
+                action_name=action_name,
+                result=result,
+                bpid=event.peer.bpid,
+                uuid=event.user.uuid,
+                duration=round(duration, 6),
+            )
+
+    @staticmethod
+    def _log_failure(
+        message: str, event: BaseEvent, action_name: Optional[str], error: Exception
+    ) -> None:
+        logger.error(
+            message,
+            reason=str(error),
+            action_name=action_name,
+            bpid=event.peer.bpid,
+            uuid=event.user.uuid,
+        )
 
     @staticmethod
     def _get_payload(event: BaseEvent):
@@ -61,15 +160,117 @@ class ButtonHandler(ABCHandler):
 
         return payload
 
+    @staticmethod
+    def _clicks(action_name: Optional[str]) -> bool:
+        # Repeated +/- clicks are merged by the action, not dropped.
+        return config.COALESCE_WINDOW <= 0 or action_name not in coalesced_actions
+
     @staticmethod
     def _check_owner(payload: Payload, event: BaseEvent):
         owner = payload.get("keyboard_owner")
         if owner != event.user.uuid:
             raise PermissionError("The user is not the owner of the message.")
 
+    def warm(self) -> None:
+        """Opens the pooled VK API connection ahead of the first event."""
+
+        self._session.warm()
+
+    def close(self) -> None:
+        """Commits the clicks still being merged, once the events are handled."""
+
+        click_coalescer.flush()
+
     def _get_api(self) -> Any:
-        session = VkApi(
+        return self._api
+
+
+class AsyncButtonHandler(ButtonHandler):
+    """Non-blocking button handler class.
+
+    Actions derived from AsyncBaseAction run on the event loop
+    with the non-blocking API session. Synchronous actions run
+    in worker threads through SyncActionAdapter.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._async_session = AsyncVkSession(
             token=config.VK_GROUP_TOKEN,
             api_version=config.VK_API_VERSION,
+            pool_size=config.VK_API_ASYNC_POOL_SIZE,
+            base_url=config.VK_API_URL,
+            limiter=self.limiter,
+            timeout=config.VK_API_TIMEOUT,
         )
-        return session.get_api()
+        self._async_api = self._async_session.get_api()
+        self._actions = build_registry(action_list, self._get_api(), self._async_api)
+
+    async def __call__(self, event: BaseEvent) -> None:
+        events_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            with trace("event", bpid=event.peer.bpid):
+                outcome = await self._handle(event)
+            self._observe(event, outcome, start)
+
+        finally:
+            events_in_flight.dec()
+
+    async def _handle(self, event: BaseEvent) -> Outcome:
+        action_name = None
+        try:
+            with span("payload"):
+                payload = self._get_payload(event)
+
+            action_name = payload.get("action_name")
+            with span("dedup"):
+                clicks = self._clicks(action_name)
+                if self._duplicates.remote:
+                    claim = await asyncio.to_thread(
+                        self._duplicates.claim, event, payload, clicks
+                    )
+                else:
+                    claim = self._duplicates.claim(event, payload, clicks)
+            if claim.duplicate is not None:
+                duplicates_total.inc(claim.duplicate)
+                return action_name, "duplicate"
+
+            async with claim:
+                with span("check_owner"):
+                    self._check_owner(payload, event)
+
+                tag(action_name=action_name)
+                executed = await self._execute(action_name, event)
+
+            if executed:
+                return action_name, "executed"
+
+        except PermissionError as error:
+            await self._execute("reject_access", event)
+            self._log_failure("Access rejected: {reason}", event, action_name, error)
+            return action_name, "rejected"
+
+        except Exception as error:
+            await self._execute("error", event)
+            self._log_failure("{reason}", event, action_name, error)
+            return action_name, "errored"
+
+        else:
+            return action_name, "skipped"
+
+    async def _execute(self, action_name: str, event: BaseEvent) -> ExecResult:
+        action = self._actions.get(action_name)
+        if action is None:
+            raise ValueError(f"Could not call action '{action_name}'.")
+
+        with span("action.handle", action_name=action_name):
+            return await action(event)
+
+    def warm(self) -> None:
+        super().warm()
+        self._async_session.warm()
+
+    async def close(self) -> None:
+        await asyncio.to_thread(super().close)
+        await self._async_session.close()
@@ -0,0 +1,18 @@
+"""Module "logs".
+
+File:
+    __init__.py
+
+About:
+    Initializing the "logs" module.
+"""
+
+from .setup import setup_logger, sampled
+from .sink import QueueSink
+
+
+__all__ = (
+    "setup_logger",
+    "sampled",
+    "QueueSink",
+)
@@ -0,0 +1,73 @@
+"""Module "logs".
+
+File:
+    setup.py
+
+About:
+    File describing the logging setup of the service:
+    colored text or JSON lines, written to stdout by a
+    background thread.
+"""
+
+import json
+import random
+import sys
+from loguru import logger
+from .sink import QueueSink
+
+
+TEXT_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | "
+    "<red>{module}</red> | <level>{level}</level> | {message}"
+)
+
+
+def _json_format(record: dict) -> str:
+    fields = {
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "module": record["module"],
+        "message": record["message"],
+    }
+    fields.update(record["extra"])
+    if record["exception"] is not None:
+        fields["exception"] = str(record["exception"].value)
+
+    record["extra"]["serialized"] = json.dumps(fields, ensure_ascii=False, default=str)
+    return "{extra[serialized]}\n"
+
+
+def setup_logger(
+    level: str = "DEBUG", format: str = "text", queue_size: int = 10000
+) -> QueueSink:
+    """Replaces the default sink with the service one.
+
+    Records are formatted by the logging thread and written to
+    stdout by a background thread, so slow stdout writes stay
+    off the event path. Keyword arguments of a logging call
+    become fields of its JSON record.
+
+    Args:
+        level (str): Minimal level written.
+        format (str): "text" or "json".
+        queue_size (int): Records waiting to be written,
+            more are dropped.
+
+    Returns:
+        QueueSink: Installed sink.
+    """
+
+    sink = QueueSink(sys.stdout, queue_size)
+    logger.remove()
+    if format == "json":
+        logger.add(sink, format=_json_format, level=level)
+    else:
+        logger.add(sink, colorize=True, format=TEXT_FORMAT, level=level)
+
+    return sink
+
+
+def sampled(rate: float) -> bool:
+    """Tells whether to write a record logged at `rate`, 0 to 1."""
+
+    return rate >= 1 or random.random() < rate
@@ -0,0 +1,61 @@
+"""Module "logs".
+
+File:
+    sink.py
+
+About:
+    File describing the queue-backed log sink.
+"""
+
+import queue
+import threading
+from typing import TextIO
+
+
+class QueueSink:
+    """Log sink handing formatted records to a background writer.
+
+    The logging thread only puts the record into a bounded queue.
+    When the writer falls behind and the queue is full, records
+    are dropped and counted instead of blocking event handling.
+    """
+
+    # Records written per stream write.
+    BATCH = 256
+
+    def __init__(self, stream: TextIO, maxsize: int = 10000) -> None:
+        self.stream = stream
+        self.dropped = 0
+        self._queue: "queue.Queue" = queue.Queue(maxsize)
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._write, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, message: str) -> None:
+        try:
+            self._queue.put_nowait(message)
+
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def stop(self) -> None:
+        """Writes the queued records and stops the writer."""
+
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    def _write(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = None in batch
+            self.stream.write("".join(message for message in batch if message is not None))
+            self.stream.flush()
+            if stop:
+                return
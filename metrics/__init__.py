@@ -0,0 +1,72 @@
+"""Module "metrics".
+
+File:
+    __init__.py
+
+About:
+    Initializing the "metrics" module.
+    Declares the service metrics.
+"""
+
+from .metrics import (
+    Registry,
+    Counter,
+    Gauge,
+    CallbackGauge,
+    Histogram,
+)
+from .server import serve
+
+
+registry = Registry()
+
+actions_total = registry.register(
+    Counter(
+        "button_actions_total",
+        "Handled button events by action and result.",
+        ("action", "result"),
+    )
+)
+action_seconds = registry.register(
+    Histogram(
+        "button_action_seconds",
+        "Button event handling time by action.",
+        ("action",),
+    )
+)
+dependency_seconds = registry.register(
+    Histogram(
+        "button_dependency_seconds",
+        "External call time by dependency and call.",
+        ("dependency", "call"),
+    )
+)
+duplicates_total = registry.register(
+    Counter(
+        "button_duplicates_total",
+        "Suppressed repeated button events by the key they repeat.",
+        ("key",),
+    )
+)
+events_in_flight = registry.register(
+    Gauge(
+        "button_events_in_flight",
+        "Button events being handled.",
+    )
+)
+events_in_flight.set(0)
+
+
+__all__ = (
+    "registry",
+    "serve",
+    "actions_total",
+    "action_seconds",
+    "dependency_seconds",
+    "duplicates_total",
+    "events_in_flight",
+    "Counter",
+    "Gauge",
+    "CallbackGauge",
+    "Histogram",
+)
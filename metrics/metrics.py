@@ -0,0 +1,230 @@
+"""Module "metrics".
+
+File:
+    metrics.py
+
+About:
+    File describing metric types and the registry
+    rendering them in the Prometheus text format.
+"""
+
+import bisect
+import threading
+from typing import Callable, Dict, Iterable, List, Tuple
+
+
+Labels = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]
+# Metric name, help, type and samples.
+Family = Tuple[str, str, str, List[Sample]]
+
+# Seconds, from a cached lookup to a slow VK request.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class _Child:
+    __slots__ = ("_lock", "value")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class _HistogramChild:
+    __slots__ = ("_lock", "buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]) -> None:
+        self._lock = threading.Lock()
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            if index < len(self.counts):
+                self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+
+class Metric:
+    """Base class of a labelled metric.
+
+    Children are created once per label set; after that an
+    update only takes the child's own lock.
+    """
+
+    TYPE = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._children: Dict[Labels, object] = {}
+        self._lock = threading.Lock()
+
+    def child(self, *values: str):
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+
+        return child
+
+    def _new_child(self):
+        return _Child()
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        return [
+            (self.name, dict(zip(self.labels, values)), child.value)
+            for values, child in list(self._children.items())
+        ]
+
+
+class Counter(Metric):
+    TYPE = "counter"
+
+    def inc(self, *values: str, amount: float = 1) -> None:
+        self.child(*values).inc(amount)
+
+
+class Gauge(Metric):
+    TYPE = "gauge"
+
+    def inc(self, *values: str) -> None:
+        self.child(*values).inc()
+
+    def dec(self, *values: str) -> None:
+        self.child(*values).dec()
+
+    def set(self, value: float, *values: str) -> None:
+        self.child(*values).set(value)
+
+
+class CallbackGauge(Metric):
+    """Gauge read from a callback at collection time.
+
+    The callback returns {label values: value}.
+    """
+
+    TYPE = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Iterable[str],
+        callback: Callable[[], Dict[Labels, float]],
+    ) -> None:
+        super().__init__(name, help, labels)
+        self.callback = callback
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        return [
+            (self.name, dict(zip(self.labels, values)), value)
+            for values, value in self.callback().items()
+        ]
+
+
+class Histogram(Metric):
+    TYPE = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Iterable[str] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labels)
+        self.buckets = buckets
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float, *values: str) -> None:
+        self.child(*values).observe(value)
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        samples = []
+        for values, child in list(self._children.items()):
+            labels = dict(zip(self.labels, values))
+            cumulative = 0
+            for bound, count in zip(child.buckets, child.counts):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", {**labels, "le": str(bound)}, cumulative))
+
+            samples.append((f"{self.name}_bucket", {**labels, "le": "+Inf"}, child.count))
+            samples.append((f"{self.name}_sum", labels, child.sum))
+            samples.append((f"{self.name}_count", labels, child.count))
+
+        return samples
+
+
+class Registry:
+    """Collection of the service metrics.
+
+    Sources add metrics collected elsewhere, e.g. in other
+    processes: their samples join the metric of the same name.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Metric] = {}
+        self._sources: List[Callable[[], Iterable[Family]]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def add_source(self, source: Callable[[], Iterable[Family]]) -> None:
+        self._sources.append(source)
+
+    def collect(self) -> List[Family]:
+        """Returns all metrics with their current samples."""
+
+        families: Dict[str, Family] = {}
+        for metric in list(self._metrics.values()):
+            families[metric.name] = (metric.name, metric.help, metric.TYPE, metric.samples())
+
+        for source in self._sources:
+            for name, help, type, samples in source():
+                if name in families:
+                    families[name][3].extend(samples)
+                else:
+                    families[name] = (name, help, type, list(samples))
+
+        return list(families.values())
+
+    def render(self) -> str:
+        """Returns all metrics in the Prometheus text format."""
+
+        lines = []
+        for metric_name, help, type, samples in self.collect():
+            lines.append(f"# HELP {metric_name} {help}")
+            lines.append(f"# TYPE {metric_name} {type}")
+            for name, labels, value in samples:
+                if labels:
+                    pairs = ",".join(
+                        f'{key}="{_escape(str(label))}"' for key, label in labels.items()
+                    )
+                    name = f"{name}{{{pairs}}}"
+                lines.append(f"{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
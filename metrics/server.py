@@ -0,0 +1,56 @@
+"""Module "metrics".
+
+File:
+    server.py
+
+About:
+    File describing the HTTP endpoint serving
+    the service metrics.
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+from .metrics import Registry
+
+
+def serve(
+    registry: Registry,
+    port: int,
+    host: str = "0.0.0.0",
+    ready: Optional[Callable[[], bool]] = None,
+) -> ThreadingHTTPServer:
+    """Serves `registry` on http://host:port/metrics from a
+    background thread. With `ready`, /ready answers 200 once
+    the service is ready and 503 before.
+
+    Returns:
+        ThreadingHTTPServer: Running server.
+    """
+
+    class MetricsRequestHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path == "/ready" and ready is not None:
+                self.send_response(200 if ready() else 503)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsRequestHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
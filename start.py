@@ -10,31 +10,311 @@ About:
     button action name specified in the payload.
 """
 
-import sys
-from loguru import logger
-from toaster import broker
-from handler import ButtonHandler
-import config
+import importlib
+import signal
+import threading
+from typing import Iterable, Iterator, Optional
+from startup import ImportProfiler, Readiness, tcp_probe
 
+# Installed before any other import of the service to time them all.
+imports = ImportProfiler().install()
 
-def setup_logger() -> None:
-    logger.remove()
-    logger.add(
-        sys.stdout,
-        colorize=True,
-        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <red>{module}</red> | <level>{level}</level> | {message}",
-        level="DEBUG",
+from loguru import logger  # noqa: E402
+from logs import QueueSink, setup_logger  # noqa: E402
+from handler import ButtonHandler, AsyncButtonHandler  # noqa: E402
+from dispatch import dispatcher_list, Supervisor  # noqa: E402
+from consumer import Consumer, PikaChannel  # noqa: E402
+from db import connect_invalidation  # noqa: E402
+from actions.menus import rendered_keyboards  # noqa: E402
+import db  # noqa: E402
+import metrics  # noqa: E402
+import tracing  # noqa: E402
+import config  # noqa: E402
+
+
+def register_process_metrics(handler, dispatcher, log_sink: QueueSink) -> None:
+    """Registers the gauges read from the dispatcher, the log sink
+    and, if the process handles events, the handler and caches."""
+
+    def lanes():
+        return {
+            (str(index), state): lane[state]
+            for index, lane in enumerate(dispatcher.stats())
+            for state in ("queued", "busy")
+        }
+
+    def lane_wait():
+        return {
+            (str(index), stat): lane[f"wait_{stat}"]
+            for index, lane in enumerate(dispatcher.stats())
+            for stat in ("avg", "max")
+        }
+
+    def caches():
+        return {
+            ("keyboards",): rendered_keyboards.stats()["hit_ratio"],
+            ("settings",): db.settings.stats()["hit_ratio"],
+            ("marks",): db.marks.stats()["hit_ratio"],
+            ("permissions",): db.permissions.stats()["hit_ratio"],
+        }
+
+    metrics.registry.register(
+        metrics.CallbackGauge(
+            "button_broker_lag",
+            "Events taken from the broker and waiting for a worker.",
+            (),
+            lambda: {(): sum(lane["queued"] for lane in dispatcher.stats())},
+        )
+    )
+    metrics.registry.register(
+        metrics.CallbackGauge(
+            "button_lane_events",
+            "Queued and running events by dispatch lane.",
+            ("lane", "state"),
+            lanes,
+        )
+    )
+    metrics.registry.register(
+        metrics.CallbackGauge(
+            "button_lane_wait_seconds",
+            "Time events wait in a dispatch lane.",
+            ("lane", "stat"),
+            lane_wait,
+        )
+    )
+    metrics.registry.register(
+        metrics.CallbackGauge(
+            "button_log_records_dropped",
+            "Log records dropped while the log writer fell behind.",
+            (),
+            lambda: {(): log_sink.dropped},
+        )
+    )
+    if handler is None:
+        return
+
+    metrics.registry.register(
+        metrics.CallbackGauge(
+            "button_cache_hit_ratio",
+            "Hit ratio of the in-process caches.",
+            ("cache",),
+            caches,
+        )
+    )
+    if handler.limiter is not None:
+        metrics.registry.register(
+            metrics.CallbackGauge(
+                "button_vk_rate_limiter",
+                "VK rate limiter bucket level, waiters and wait time.",
+                ("stat",),
+                lambda: {(k,): v for k, v in handler.limiter.stats().items()},
+            )
+        )
+
+
+def setup_metrics(
+    handler,
+    dispatcher,
+    readiness: Readiness,
+    log_sink: QueueSink,
+    consumer: Optional[Consumer],
+) -> None:
+    register_process_metrics(handler, dispatcher, log_sink)
+    if consumer is not None:
+        metrics.registry.register(
+            metrics.CallbackGauge(
+                "button_broker_deliveries",
+                "Broker deliveries read, acknowledged and unacknowledged.",
+                ("state",),
+                lambda: {(k,): v for k, v in consumer.stats().items()},
+            )
+        )
+    if isinstance(dispatcher, Supervisor):
+        # The workers handle the events and report their metrics.
+        metrics.registry.add_source(dispatcher.metrics)
+
+    metrics.serve(metrics.registry, config.METRICS_PORT, ready=readiness.is_ready)
+
+
+def setup_readiness(handler, dispatcher) -> Readiness:
+    readiness = Readiness(config.READINESS_PATH)
+
+    def warm_broker() -> None:
+        importlib.import_module("toaster.broker")
+        if config.BROKER_HOST is not None:
+            tcp_probe(config.BROKER_HOST, config.BROKER_PORT)()
+
+    readiness.add("broker", warm_broker)
+    readiness.add("db", db.backend.warm)
+    if isinstance(dispatcher, Supervisor):
+        # Workers warm their own clients before reporting ready.
+        readiness.add("workers", dispatcher.start)
+    else:
+        readiness.add("vk", handler.warm)
+
+    return readiness
+
+
+def setup_consumer() -> Optional[Consumer]:
+    if config.BROKER_PREFETCH <= 0:
+        return None
+
+    channel = PikaChannel(
+        config.BROKER_HOST,
+        config.BROKER_PORT,
+        config.BROKER_VHOST,
+        config.BROKER_USER,
+        config.BROKER_PASSWORD,
+    )
+    return Consumer(
+        channel,
+        config.BROKER_QUEUE_NAME,
+        prefetch=config.BROKER_PREFETCH,
+        ack_batch=config.BROKER_ACK_BATCH,
+        ack_interval=config.BROKER_ACK_INTERVAL,
+    )
+
+
+def stop_on_sigterm(consumer: Optional[Consumer]) -> threading.Event:
+    """Makes SIGTERM stop reading the broker. The dispatcher then
+    finishes the events read, and the handler commits the merged
+    clicks, before the consumer sends the final acks.
+
+    Returns:
+        threading.Event: Set on SIGTERM.
+    """
+
+    stopping = threading.Event()
+
+    def terminate(signum, frame) -> None:
+        logger.info("Stopping.")
+        stopping.set()
+        if consumer is not None:
+            consumer.stop()
+
+    signal.signal(signal.SIGTERM, terminate)
+    return stopping
+
+
+def until(stopping: threading.Event, events: Iterable) -> Iterator:
+    """Yields the events until `stopping` is set, checked
+    after every event."""
+
+    for event in events:
+        yield event
+        if stopping.is_set():
+            return
+
+
+def report_imports(limit: int = 10) -> None:
+    logger.info(f"Imports took {imports.total * 1e3:.0f}ms, slowest:")
+    for name, total, own in imports.report(limit):
+        logger.info(f"  {name:<40} {total * 1e3:8.1f}ms (self {own * 1e3:.1f}ms)")
+
+
+def setup_process() -> QueueSink:
+    """Sets up logging, tracing and cache invalidation
+    of a service process."""
+
+    log_sink = setup_logger(config.LOG_LEVEL, config.LOG_FORMAT, config.LOG_QUEUE_SIZE)
+    if config.TRACING_PATH is not None:
+        tracing.configure(tracing.JsonlExporter(config.TRACING_PATH))
+
+    if config.CACHE_INVALIDATION_URL is not None:
+        connect_invalidation(
+            config.CACHE_INVALIDATION_URL,
+            config.CACHE_INVALIDATION_CHANNEL,
+        )
+
+    return log_sink
+
+
+def build_handler() -> ButtonHandler:
+    if config.DISPATCH_MODE == "asyncio":
+        return AsyncButtonHandler()
+
+    return ButtonHandler()
+
+
+def build_dispatcher(handler: ButtonHandler, done=None):
+    return dispatcher_list[config.DISPATCH_MODE](
+        handler,
+        workers=config.DISPATCH_WORKERS,
+        queue_size=config.DISPATCH_QUEUE_SIZE,
+        backpressure=config.DISPATCH_BACKPRESSURE,
+        ordering=config.DISPATCH_ORDERING,
+        done=done,
     )
 
 
+def serve_worker(done):
+    """Builds the dispatcher of a worker process."""
+
+    log_sink = setup_process()
+    imports.uninstall()
+
+    # The group token's rate limit is shared by the workers.
+    config.VK_RATE_LIMIT /= config.WORKER_PROCESSES
+    config.VK_RATE_BURST = max(1, config.VK_RATE_BURST // config.WORKER_PROCESSES)
+
+    handler = build_handler()
+    handler.warm()
+    dispatcher = build_dispatcher(handler, done)
+    if config.METRICS_PORT > 0:
+        register_process_metrics(handler, dispatcher, log_sink)
+
+    return dispatcher
+
+
 def main():
     """Programm entry point."""
 
-    setup_logger()
-    handler = ButtonHandler()
+    log_sink = setup_process()
+    consumer = setup_consumer()
+    done = consumer.done if consumer is not None else None
+
+    if config.WORKER_PROCESSES > 0:
+        handler = None
+        # Workers only report metrics when they are served.
+        metrics_interval = config.WORKER_METRICS_INTERVAL if config.METRICS_PORT > 0 else 0
+        dispatcher = Supervisor(
+            serve_worker,
+            config.WORKER_PROCESSES,
+            ordering=config.DISPATCH_ORDERING,
+            done=done,
+            drain_timeout=config.WORKER_DRAIN_TIMEOUT,
+            metrics_interval=metrics_interval,
+            restart_limit=config.WORKER_RESTART_LIMIT,
+            restart_window=config.WORKER_RESTART_WINDOW,
+            restart_backoff=config.WORKER_RESTART_BACKOFF,
+            interrupt=consumer.stop if consumer is not None else None,
+        )
+    else:
+        handler = build_handler()
+        dispatcher = build_dispatcher(handler, done)
+
+    readiness = setup_readiness(handler, dispatcher)
+    if config.METRICS_PORT > 0:
+        setup_metrics(handler, dispatcher, readiness, log_sink, consumer)
+
+    readiness.start()
+    readiness.wait()
+    imports.uninstall()
+    report_imports()
+
+    # The supervisor handles SIGTERM itself while it runs.
+    stopping = stop_on_sigterm(consumer)
+
+    if consumer is not None:
+        try:
+            dispatcher.run(consumer.events())
+        finally:
+            consumer.close()
+        return
+
+    from toaster import broker
 
-    for event in broker.listen(queue_name=config.BROKER_QUEUE_NAME):
-        handler(event)
+    dispatcher.run(until(stopping, broker.listen(queue_name=config.BROKER_QUEUE_NAME)))
 
 
 if __name__ == "__main__":
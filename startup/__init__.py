@@ -0,0 +1,18 @@
+"""Module "startup".
+
+File:
+    __init__.py
+
+About:
+    Initializing the "startup" module.
+"""
+
+from .imports import ImportProfiler
+from .readiness import Readiness, tcp_probe
+
+
+__all__ = (
+    "ImportProfiler",
+    "Readiness",
+    "tcp_probe",
+)
@@ -0,0 +1,103 @@
+"""Module "startup".
+
+File:
+    imports.py
+
+About:
+    File describing the profiler of module import time.
+"""
+
+import sys
+import threading
+import time
+from importlib.abc import MetaPathFinder
+from typing import Dict, List, Tuple
+
+
+class ImportProfiler(MetaPathFinder):
+    """Measures the import time of every module imported
+    while it is installed.
+
+    For each module it records the cumulative time, nested
+    imports included, and the self time, nested imports
+    excluded. Builtin and frozen modules are not measured.
+    """
+
+    def __init__(self) -> None:
+        self.cumulative: Dict[str, float] = {}
+        self.own: Dict[str, float] = {}
+        self._local = threading.local()
+
+    def install(self) -> "ImportProfiler":
+        sys.meta_path.insert(0, self)
+        return self
+
+    def uninstall(self) -> None:
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path, target=None):
+        if getattr(self._local, "finding", False):
+            return None
+
+        self._local.finding = True
+        try:
+            spec = self._find(fullname, path, target)
+        finally:
+            self._local.finding = False
+
+        loader = getattr(spec, "loader", None)
+        # Builtin and frozen importers are classes shared by all modules.
+        if loader is not None and not isinstance(loader, type):
+            loader.exec_module = self._timed(fullname, loader.exec_module)
+
+        return spec
+
+    def report(self, limit: int = 10) -> List[Tuple[str, float, float]]:
+        """Returns the slowest imports.
+
+        Args:
+            limit (int): Number of modules.
+
+        Returns:
+            List[Tuple[str, float, float]]: Module name, cumulative
+            and self time in seconds, slowest first.
+        """
+
+        slowest = sorted(self.cumulative.items(), key=lambda item: -item[1])
+        return [(name, total, self.own[name]) for name, total in slowest[:limit]]
+
+    @property
+    def total(self) -> float:
+        """Time spent importing, in seconds."""
+
+        return sum(self.own.values())
+
+    def _find(self, fullname, path, target):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                return spec
+
+        return None
+
+    def _timed(self, fullname: str, exec_module):
+        def timed_exec_module(module) -> None:
+            stack = self._local.__dict__.setdefault("stack", [])
+            stack.append(0.0)
+            start = time.perf_counter()
+            try:
+                exec_module(module)
+            finally:
+                elapsed = time.perf_counter() - start
+                nested = stack.pop()
+                if stack:
+                    stack[-1] += elapsed
+
+                self.cumulative[fullname] = elapsed
+                self.own[fullname] = elapsed - nested
+
+        return timed_exec_module
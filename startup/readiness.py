@@ -0,0 +1,109 @@
+"""Module "startup".
+
+File:
+    readiness.py
+
+About:
+    File describing the readiness signal of the service,
+    raised once all warm-up checks have passed.
+"""
+
+import os
+import socket
+import threading
+import time
+from typing import Callable, Dict, Optional
+from loguru import logger
+
+
+Check = Callable[[], None]
+
+
+def tcp_probe(host: str, port: int, timeout: float = 5) -> Check:
+    """Check passing once `host:port` accepts connections."""
+
+    def probe() -> None:
+        socket.create_connection((host, port), timeout=timeout).close()
+
+    return probe
+
+
+class Readiness:
+    """Warm-up checks run at the same time, each retried
+    with backoff until it passes.
+
+    Once all of them have passed, the service is ready:
+    `wait` returns and the file at `path`, if any, is created
+    for the container health check.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        retry_delay: float = 0.5,
+        max_retry_delay: float = 30,
+    ) -> None:
+        self.path = path
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.durations: Dict[str, float] = {}
+
+        self._checks: Dict[str, Check] = {}
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._started = 0.0
+
+        if path is not None and os.path.exists(path):
+            os.remove(path)
+
+    def add(self, name: str, check: Check) -> None:
+        self._checks[name] = check
+
+    def start(self) -> None:
+        """Starts every check in a background thread."""
+
+        self._started = time.perf_counter()
+        if not self._checks:
+            self._set_ready()
+
+        for name, check in self._checks.items():
+            threading.Thread(
+                target=self._run,
+                args=(name, check),
+                name=f"warm-{name}",
+                daemon=True,
+            ).start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def is_ready(self) -> bool:
+        return self._ready.is_set()
+
+    def _run(self, name: str, check: Check) -> None:
+        delay = self.retry_delay
+        while True:
+            try:
+                check()
+                break
+
+            except Exception as error:
+                logger.warning(f"Warm-up '{name}' failed, retrying in {delay:.1f}s: {error}")
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_retry_delay)
+
+        with self._lock:
+            self.durations[name] = time.perf_counter() - self._started
+            done = len(self.durations) == len(self._checks)
+
+        logger.info(f"Warm-up '{name}' done in {self.durations[name] * 1e3:.0f}ms.")
+        if done:
+            self._set_ready()
+
+    def _set_ready(self) -> None:
+        if self.path is not None:
+            with open(self.path, "w", encoding="utf-8") as file:
+                file.write(str(os.getpid()))
+
+        self._ready.set()
+        logger.info(f"Ready in {(time.perf_counter() - self._started) * 1e3:.0f}ms.")
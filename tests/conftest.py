@@ -0,0 +1,27 @@
+"""Module "tests".
+
+File:
+    conftest.py
+
+About:
+    Shared setup of the tests: the environment the
+    "config" module requires, and a local database.
+"""
+
+import os
+
+os.environ.setdefault("vk_group_token", "")
+os.environ.setdefault("vk_group_id", "0")
+
+import pytest  # noqa: E402
+from db import backend  # noqa: E402
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    """File SQLite database used as the service's engine."""
+
+    engine = backend.create_engine(f"sqlite:///{tmp_path / 'toaster.sqlite'}")
+    monkeypatch.setattr(backend, "engine", engine)
+    yield engine
+    engine.dispose()
@@ -0,0 +1,105 @@
+"""Module "tests".
+
+File:
+    test_backend.py
+
+About:
+    Tests of the data sources of the "db" module.
+"""
+
+import asyncio
+import threading
+import time
+import pytest
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from db import aio, backend
+import config
+
+
+def test_engine_pool_is_bounded(tmp_path):
+    engine = backend.create_engine(
+        f"sqlite:///{tmp_path / 'pool.sqlite'}", pool_size=2, pool_timeout=0.1
+    )
+
+    assert engine.pool.size() == 2
+    assert engine.pool._pre_ping
+    with engine.connect(), engine.connect():
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+
+
+def test_engine_sets_timeout_on_connect(tmp_path):
+    engine = backend.create_engine(
+        f"sqlite:///{tmp_path / 'timeout.sqlite'}", statement_timeout=1.5
+    )
+
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA busy_timeout").scalar() == 1500
+
+
+def test_transaction_commits_or_rolls_back(engine):
+    with backend.transaction("create") as connection:
+        connection.exec_driver_sql("CREATE TABLE t (x INTEGER)")
+
+    with pytest.raises(RuntimeError):
+        with backend.transaction("insert") as connection:
+            connection.exec_driver_sql("INSERT INTO t VALUES (1)")
+            raise RuntimeError
+
+    with backend.transaction("insert") as connection:
+        connection.exec_driver_sql("INSERT INTO t VALUES (2)")
+
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("SELECT x FROM t").scalars().all() == [2]
+
+
+class Source:
+    """toaster.scripts stand-in counting the calls in flight."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def get_peer_mark(self, bpid: int) -> None:
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+        time.sleep(0.02)
+        with self.lock:
+            self.active -= 1
+
+
+def test_call_caps_calls_in_flight(monkeypatch):
+    source = Source()
+    monkeypatch.setattr(backend, "scripts", source)
+    monkeypatch.setattr(backend, "_slots", threading.BoundedSemaphore(2))
+
+    threads = [
+        threading.Thread(target=backend.call, args=("get_peer_mark",), kwargs={"bpid": 1})
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert source.peak == 2
+
+
+def test_aio_caps_calls_in_flight(monkeypatch):
+    source = Source()
+    monkeypatch.setattr(backend, "scripts", source)
+    monkeypatch.setattr(config, "DB_POOL_SIZE", 2)
+
+    async def clicks() -> list:
+        return await asyncio.gather(
+            *(aio.get_peer_mark(bpid=bpid) for bpid in range(3000000001, 3000000009))
+        )
+
+    # Each loop gets its own slots.
+    asyncio.run(clicks())
+    asyncio.run(clicks())
+
+    assert source.peak == 2
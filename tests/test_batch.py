@@ -0,0 +1,116 @@
+"""Module "tests".
+
+File:
+    test_batch.py
+
+About:
+    Tests of the merging of VK API calls into "execute" requests.
+"""
+
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from vk_api.exceptions import ApiError
+from api import ExecuteBatcher
+
+
+class Session:
+    """VkSession stand-in running "execute" requests locally.
+
+    A call with "fail" fails, one with "false" returns false.
+    """
+
+    pool_size = 4
+    limiter = None
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.batches = []
+
+    def method(self, method, values=None, raw=False, priority=None):
+        if method != "execute":
+            with self.lock:
+                self.batches.append(1)
+            return values["n"]
+
+        calls = re.findall(r"API\.([\w.]+)\((\{.*?\})\)", values["code"])
+        with self.lock:
+            self.batches.append(len(calls))
+
+        results, errors = [], []
+        for name, arguments in calls:
+            arguments = json.loads(arguments)
+            if arguments.get("fail"):
+                results.append(False)
+                errors.append({"method": name, "error_code": 15, "error_msg": "Access denied"})
+            elif arguments.get("false"):
+                results.append(False)
+            else:
+                results.append(arguments["n"])
+
+        return {"response": results, "execute_errors": errors}
+
+
+def call_all(batcher: ExecuteBatcher, calls: list) -> list:
+    """Makes the calls at once, returns results or errors in order."""
+
+    def call(arguments):
+        method, values = arguments
+        try:
+            return batcher.method(method, values)
+        except ApiError as error:
+            return error
+
+    with ThreadPoolExecutor(len(calls)) as pool:
+        return list(pool.map(call, calls))
+
+
+def test_calls_are_split_into_batches_of_25():
+    session = Session()
+    batcher = ExecuteBatcher(session, window=0.5, max_calls=100, timeout=5)
+
+    results = call_all(batcher, [("messages.edit", {"n": n}) for n in range(60)])
+
+    assert results == list(range(60))
+    assert sum(session.batches) == 60
+    assert max(session.batches) == 25
+    assert len(session.batches) >= 3
+
+
+def test_failed_calls_get_their_own_errors():
+    session = Session()
+    batcher = ExecuteBatcher(session, window=0.5, timeout=5)
+
+    results = call_all(
+        batcher,
+        [
+            ("messages.edit", {"n": 1}),
+            ("messages.edit", {"n": 2, "fail": True}),
+            ("groups.isMember", {"n": 3, "false": True}),
+            ("messages.sendMessageEventAnswer", {"n": 4}),
+        ],
+    )
+
+    assert session.batches == [4]
+    assert results[0] == 1
+    assert isinstance(results[1], ApiError)
+    assert results[1].code == 15
+    # False without an execute_errors entry is a result.
+    assert results[2] is False
+    assert results[3] == 4
+
+
+def test_failed_request_fails_every_call():
+    class Down(Session):
+        def method(self, method, values=None, raw=False, priority=None):
+            raise ConnectionError("VK is unreachable")
+
+    batcher = ExecuteBatcher(Down(), window=0.2, timeout=5)
+
+    with ThreadPoolExecutor(3) as pool:
+        futures = [pool.submit(batcher.method, "messages.edit", {"n": n}) for n in range(3)]
+        for future in futures:
+            with pytest.raises(ConnectionError):
+                future.result()
@@ -0,0 +1,136 @@
+"""Module "tests".
+
+File:
+    test_coalesce.py
+
+About:
+    Tests of the merging of rapid setting increments.
+"""
+
+import functools
+import pickle
+import random
+import threading
+import time
+import pytest
+from actions.coalesce import Coalescer, Step, _clamp
+from consumer import Consumer, MemoryBroker
+from dispatch import dispatcher_list
+from handler import handler as handler_module
+
+
+QUEUE_NAME = "events"
+
+
+class Clicks(handler_module.ButtonHandler):
+    """Handler adding a +1 step per event to the shared coalescer."""
+
+    def __init__(self, commits: list) -> None:
+        self.commits = commits
+
+    def __call__(self, event) -> None:
+        handler_module.click_coalescer.add("slow_mode", Step(1), event, self.commit)
+
+    def commit(self, key, step: Step, event) -> None:
+        self.commits.append((key, step))
+
+
+@pytest.mark.parametrize("mode", ["serial", "thread", "asyncio"])
+def test_pending_steps_survive_shutdown(mode, monkeypatch):
+    monkeypatch.setattr(handler_module, "click_coalescer", Coalescer(window=60))
+    broker = MemoryBroker()
+    for number in range(5):
+        broker.publish(QUEUE_NAME, pickle.dumps({"number": number}))
+
+    commits = []
+    consumer = Consumer(broker.channel(), QUEUE_NAME, ack_interval=0.05)
+    dispatcher = dispatcher_list[mode](
+        Clicks(commits), workers=2, ordering="none", done=consumer.done
+    )
+    # As SIGTERM does, once the events were read.
+    threading.Timer(0.3, consumer.stop).start()
+
+    dispatcher.run(consumer.events())
+
+    # Committed before the final acks.
+    assert commits == [("slow_mode", Step(5))]
+    consumer.close()
+    assert broker.acked == 5
+
+
+def bound():
+    return random.choice([None, random.randint(-20, 20)])
+
+
+def random_step() -> Step:
+    minimum, maximum = bound(), bound()
+    if minimum is not None and maximum is not None and minimum > maximum:
+        minimum, maximum = maximum, minimum
+
+    return Step(random.randint(-15, 15), minimum, maximum)
+
+
+def apply(value: int, step: Step) -> int:
+    return _clamp(value + step.delta, step.minimum, step.maximum)
+
+
+def test_merged_steps_equal_steps_applied_in_turn():
+    random.seed(25)
+    for _ in range(2000):
+        steps = [random_step() for _ in range(random.randint(1, 6))]
+        merged = functools.reduce(Step.then, steps)
+
+        for value in range(-40, 41, 3):
+            expected = functools.reduce(apply, steps, value)
+            assert apply(value, merged) == expected, (steps, value)
+
+
+def test_steps_within_the_window_are_merged():
+    coalescer = Coalescer(window=0.2)
+    commits = []
+    committed = threading.Event()
+
+    def commit(key, step, event):
+        commits.append((key, step, event))
+        committed.set()
+
+    for event in range(4):
+        coalescer.add("slow_mode", Step(1, 0, 10), event, commit)
+    coalescer.add("red_zone", Step(-1, 0, 10), 9, commit)
+
+    assert committed.wait(2)
+    time.sleep(0.1)
+    assert sorted(commits) == [
+        ("red_zone", Step(-1, 0, 10), 9),
+        ("slow_mode", Step(4, 3, 10), 3),
+    ]
+    assert coalescer.merged == 3
+
+
+def test_flush_commits_pending_steps_now():
+    coalescer = Coalescer(window=60)
+    commits = []
+    coalescer.add("slow_mode", Step(1), 0, lambda *args: commits.append(args))
+    coalescer.add("slow_mode", Step(1), 1, lambda *args: commits.append(args))
+
+    coalescer.flush()
+
+    assert commits == [("slow_mode", Step(2), 1)]
+    coalescer.flush()
+    assert len(commits) == 1
+
+
+def test_failed_commit_pauses_merging():
+    coalescer = Coalescer(window=60, pause=0.2)
+
+    def fail(key, step, event):
+        raise ConnectionError("database is gone")
+
+    coalescer.add("slow_mode", Step(1), 0, fail)
+    assert coalescer.healthy
+
+    coalescer.flush()
+
+    assert not coalescer.healthy
+    time.sleep(0.25)
+    assert coalescer.healthy
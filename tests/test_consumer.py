@@ -0,0 +1,140 @@
+"""Module "tests".
+
+File:
+    test_consumer.py
+
+About:
+    Tests of the broker consumer against the in-memory broker.
+"""
+
+import pickle
+import queue
+import threading
+from consumer import Consumer, MemoryBroker
+
+
+QUEUE_NAME = "events"
+
+
+def publish(broker: MemoryBroker, events: int) -> None:
+    for number in range(events):
+        broker.publish(QUEUE_NAME, pickle.dumps({"number": number}))
+
+
+def read(consumer: Consumer) -> queue.Queue:
+    """Reads the events on a thread, as the dispatchers do."""
+
+    events = queue.Queue()
+    threading.Thread(
+        target=lambda: [events.put(event) for event in consumer.events()], daemon=True
+    ).start()
+
+    return events
+
+
+def take(events: queue.Queue, timeout: float = 2):
+    """Returns the next event, or None when none came in time."""
+
+    try:
+        return events.get(timeout=timeout)
+    except queue.Empty:
+        return None
+
+
+def test_acks_are_batched():
+    broker = MemoryBroker()
+    publish(broker, 40)
+    broker.close()
+    channel = broker.channel()
+    consumer = Consumer(channel, QUEUE_NAME, prefetch=40, ack_batch=10, ack_interval=60)
+
+    for event in consumer.events():
+        consumer.done(event)
+    consumer.close()
+
+    assert broker.acked == 40
+    assert channel.acks == 4
+    assert consumer.stats() == {"delivered": 40, "acked": 40, "unacked": 0}
+
+
+def test_deliveries_are_bounded_by_prefetch():
+    broker = MemoryBroker()
+    publish(broker, 10)
+    channel = broker.channel()
+    consumer = Consumer(channel, QUEUE_NAME, prefetch=4, ack_batch=1, ack_interval=60)
+    events = read(consumer)
+
+    held = [take(events) for _ in range(4)]
+    assert None not in held
+    assert take(events, timeout=0.2) is None
+    assert len(channel.unacked()) == 4
+
+    consumer.done(held[0])
+    assert take(events) is not None
+    assert len(channel.unacked()) == 4
+
+    broker.close()
+    channel.close()
+
+
+def test_slow_event_does_not_stall_the_consumer():
+    broker = MemoryBroker()
+    publish(broker, 10)
+    broker.close()
+    channel = broker.channel()
+    consumer = Consumer(channel, QUEUE_NAME, prefetch=4, ack_batch=1, ack_interval=60)
+    events = read(consumer)
+
+    slow = take(events)
+    for _ in range(9):
+        event = take(events)
+        assert event is not None
+        consumer.done(event)
+
+    assert channel.unacked() == [1]
+    consumer.done(slow)
+    consumer.close()
+
+    assert broker.acked == 10
+    assert broker.redelivered == 0
+
+
+def test_unfinished_events_are_redelivered_after_close():
+    broker = MemoryBroker()
+    publish(broker, 10)
+    broker.close()
+    channel = broker.channel()
+    consumer = Consumer(channel, QUEUE_NAME, prefetch=5, ack_batch=100, ack_interval=60)
+    events = read(consumer)
+
+    taken = [take(events) for _ in range(5)]
+    for event in taken[:3]:
+        consumer.done(event)
+    consumer.close()
+
+    # The final ack is sent before the channel closes.
+    assert broker.acked == 3
+    assert broker.redelivered == 2
+
+    consumer = Consumer(broker.channel(), QUEUE_NAME, prefetch=5)
+    numbers = []
+    for event in consumer.events():
+        numbers.append(event["number"])
+        consumer.done(event)
+    consumer.close()
+
+    assert numbers == [3, 4, 5, 6, 7, 8, 9]
+
+
+def test_stop_ends_an_idle_read():
+    broker = MemoryBroker()
+    publish(broker, 1)
+    consumer = Consumer(broker.channel(), QUEUE_NAME, ack_interval=0.05)
+    events = consumer.events()
+    consumer.done(next(events))
+
+    threading.Timer(0.1, consumer.stop).start()
+
+    assert next(events, None) is None
+    consumer.close()
+    assert broker.acked == 1
@@ -0,0 +1,108 @@
+"""Module "tests".
+
+File:
+    test_dedup.py
+
+About:
+    Tests of the filter of repeated button events.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+import pytest
+from handler.dedup import DuplicateFilter
+
+
+PAYLOAD = {"action_name": "change_delay", "setting_name": "slow_mode"}
+
+
+def click(beid: str, uuid: int = 1, cmid: int = 7) -> SimpleNamespace:
+    return SimpleNamespace(
+        button=SimpleNamespace(beid=beid, cmid=cmid),
+        user=SimpleNamespace(uuid=uuid),
+    )
+
+
+def handle(duplicates: DuplicateFilter, event, clicks: bool = True):
+    claim = duplicates.claim(event, PAYLOAD, clicks)
+    if claim.duplicate is None:
+        with claim:
+            pass
+
+    return claim.duplicate
+
+
+def test_event_window():
+    duplicates = DuplicateFilter(event_window=0.1, click_window=0)
+
+    assert handle(duplicates, click("a")) is None
+    assert handle(duplicates, click("a")) == "event"
+    assert handle(duplicates, click("b")) is None
+
+    time.sleep(0.15)
+    assert handle(duplicates, click("a")) is None
+
+
+def test_click_window():
+    duplicates = DuplicateFilter(event_window=0, click_window=0.1)
+
+    assert handle(duplicates, click("a")) is None
+    # Another event id, the same button of the same message.
+    assert handle(duplicates, click("b")) == "click"
+    assert handle(duplicates, click("c", uuid=2)) is None
+    assert handle(duplicates, click("d", cmid=8)) is None
+
+    time.sleep(0.15)
+    assert handle(duplicates, click("e")) is None
+
+
+def test_repeated_clicks_pass_without_clicks():
+    duplicates = DuplicateFilter(event_window=60, click_window=60)
+
+    assert handle(duplicates, click("a"), clicks=False) is None
+    assert handle(duplicates, click("b"), clicks=False) is None
+    # Retried callbacks are still recognized.
+    assert handle(duplicates, click("b"), clicks=False) == "event"
+
+
+def test_failed_event_is_released():
+    duplicates = DuplicateFilter(event_window=60, click_window=60)
+
+    claim = duplicates.claim(click("a"), PAYLOAD)
+    with pytest.raises(RuntimeError):
+        with claim:
+            raise RuntimeError("handling failed")
+
+    # Redelivered after the failure.
+    assert handle(duplicates, click("a")) is None
+    assert handle(duplicates, click("a")) == "event"
+
+
+def test_failed_event_is_released_async():
+    duplicates = DuplicateFilter(event_window=60, click_window=60)
+
+    async def fail() -> None:
+        async with duplicates.claim(click("a"), PAYLOAD):
+            raise RuntimeError("handling failed")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(fail())
+
+    assert handle(duplicates, click("a")) is None
+
+
+def test_concurrent_claims_of_one_key():
+    duplicates = DuplicateFilter(event_window=60, click_window=0)
+
+    with ThreadPoolExecutor(16) as pool:
+        claims = list(pool.map(lambda _: duplicates.claim(click("a"), PAYLOAD), range(64)))
+
+    assert sum(claim.duplicate is None for claim in claims) == 1
+    # Held while being handled, remembered once handled.
+    winner = next(claim for claim in claims if claim.duplicate is None)
+    assert duplicates.claim(click("a"), PAYLOAD).duplicate == "event"
+    with winner:
+        pass
+    assert duplicates.claim(click("a"), PAYLOAD).duplicate == "event"
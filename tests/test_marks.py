@@ -0,0 +1,64 @@
+"""Module "tests".
+
+File:
+    test_marks.py
+
+About:
+    Tests of the cached peer marks.
+"""
+
+import threading
+from db import backend, marks
+
+
+BPID = 2000000001
+
+
+class Source:
+    """Data source whose reads can be held mid-flight."""
+
+    def __init__(self) -> None:
+        self.mark = "old"
+        self.reading = threading.Event()
+        self.release = threading.Event()
+
+    def get_peer_mark(self, bpid: int):
+        mark = self.mark
+        self.reading.set()
+        self.release.wait(5)
+        return mark
+
+    def set_peer_mark(self, mark, bpid: int, name: str) -> None:
+        self.mark = mark
+
+    def drop_peer_mark(self, bpid: int) -> None:
+        self.mark = None
+
+
+def test_read_racing_a_change_is_not_cached(monkeypatch):
+    source = Source()
+    monkeypatch.setattr(backend, "scripts", source)
+    marks._cache.clear()
+
+    reader = threading.Thread(target=marks.get_peer_mark, args=(BPID,))
+    reader.start()
+    source.reading.wait(5)
+    marks.set_peer_mark("new", BPID, "peer")
+    source.release.set()
+    reader.join()
+
+    assert marks.get_peer_mark(BPID) == "new"
+
+
+def test_read_is_cached(monkeypatch):
+    source = Source()
+    source.release.set()
+    monkeypatch.setattr(backend, "scripts", source)
+    marks._cache.clear()
+
+    assert marks.get_peer_mark(BPID) == "old"
+    source.mark = "changed elsewhere"
+    assert marks.get_peer_mark(BPID) == "old"
+
+    marks.drop_peer_mark(BPID)
+    assert marks.get_peer_mark(BPID) is None
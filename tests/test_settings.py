@@ -0,0 +1,131 @@
+"""Module "tests".
+
+File:
+    test_settings.py
+
+About:
+    Tests of the setting increments against a local database.
+"""
+
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from sqlalchemy import insert, select
+from db import backend, settings, tables
+
+
+BPID = 2000000001
+
+
+@pytest.fixture
+def setting(engine):
+    tables.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(
+            insert(tables.settings), {"bpid": BPID, "name": "slow_mode", "delay": 0}
+        )
+
+    return engine
+
+
+def stored(engine, column: str) -> int:
+    table = tables.settings
+    with engine.connect() as connection:
+        return connection.execute(
+            select(table.c[column]).where(table.c.bpid == BPID)
+        ).scalar_one()
+
+
+def test_concurrent_clicks_are_not_lost(setting):
+    with ThreadPoolExecutor(16) as pool:
+        results = list(
+            pool.map(
+                lambda _: settings.increment_setting_delay("slow_mode", BPID, 1),
+                range(200),
+            )
+        )
+
+    assert stored(setting, "delay") == 200
+    # Every click saw its own value.
+    assert sorted(results) == list(range(1, 201))
+
+
+def test_concurrent_clicks_are_clamped(setting):
+    with ThreadPoolExecutor(16) as pool:
+        ups = pool.map(
+            lambda _: settings.increment_setting_points(BPID, "slow_mode", 3, 0, 50),
+            range(100),
+        )
+        assert all(0 <= points <= 50 for points in ups)
+
+    assert stored(setting, "points") == 50
+
+    with ThreadPoolExecutor(16) as pool:
+        downs = pool.map(
+            lambda _: settings.increment_setting_points(BPID, "slow_mode", -7, 0, 50),
+            range(100),
+        )
+        assert all(0 <= points <= 50 for points in downs)
+
+    assert stored(setting, "points") == 0
+
+
+def click(url: str, clicks: int) -> None:
+    backend.use_engine(backend.create_engine(url))
+    for _ in range(clicks):
+        settings.increment_setting_delay("slow_mode", BPID, 1)
+
+
+def test_clicks_from_several_processes(setting):
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=click, args=(str(setting.url), 25)) for _ in range(4)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+
+    assert [process.exitcode for process in processes] == [0] * 4
+    assert stored(setting, "delay") == 100
+
+
+def test_increment_drops_the_cached_value(setting):
+    settings._write(BPID, ("delay", "slow_mode"), 0)
+
+    settings.increment_setting_delay("slow_mode", BPID, 5)
+
+    value, _ = settings._read(BPID, ("delay", "slow_mode"))
+    assert value is settings.MISSING
+
+
+class Scripts:
+    """toaster.scripts stand-in for the rows the engine lacks."""
+
+    @staticmethod
+    def get_peer_mark(bpid):
+        return None
+
+    @staticmethod
+    def get_setting_delay(name, bpid):
+        return 0
+
+
+def test_increment_of_a_missing_row_changes_nothing(setting, monkeypatch):
+    monkeypatch.setattr(backend, "scripts", Scripts)
+
+    delay = settings.increment_setting_delay("account_age", BPID, -3, minimum=0)
+
+    assert delay == 0
+    assert stored(setting, "delay") == 0
+
+
+def test_warm_checks_the_columns(setting, monkeypatch):
+    monkeypatch.setattr(backend, "scripts", Scripts)
+    backend.warm()
+
+    with setting.begin() as connection:
+        connection.exec_driver_sql("ALTER TABLE settings DROP COLUMN points")
+
+    with pytest.raises(LookupError, match="points"):
+        backend.warm()
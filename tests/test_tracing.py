@@ -0,0 +1,116 @@
+"""Module "tests".
+
+File:
+    test_tracing.py
+
+About:
+    Tests of the event traces and their export.
+"""
+
+import asyncio
+import json
+import pytest
+import tracing
+from tracing import InMemoryExporter, JsonlExporter, span, tag, trace
+
+
+@pytest.fixture
+def exporter():
+    exporter = InMemoryExporter()
+    tracing.configure(exporter)
+    yield exporter
+    tracing.configure(tracing.NullExporter())
+
+
+def test_spans_nest_under_the_event(exporter):
+    with trace("event", bpid=1):
+        with span("dedup"):
+            pass
+        with span("action.handle", action_name="close_menu"):
+            tag(result="executed")
+            with span("vk.messages.delete"):
+                pass
+
+    # Spans are exported as they finish, children first.
+    names = [finished.name for finished in exporter.spans]
+    assert names == ["dedup", "vk.messages.delete", "action.handle", "event"]
+
+    spans = {finished.name: finished for finished in exporter.spans}
+    root = spans["event"]
+    assert root.parent_id is None
+    assert {finished.trace_id for finished in exporter.spans} == {root.trace_id}
+    assert spans["dedup"].parent_id == root.span_id
+    assert spans["action.handle"].parent_id == root.span_id
+    assert spans["vk.messages.delete"].parent_id == spans["action.handle"].span_id
+    # Tags are inherited by the spans opened after them.
+    assert spans["vk.messages.delete"].tags == {
+        "bpid": 1,
+        "action_name": "close_menu",
+        "result": "executed",
+    }
+
+
+def test_error_is_recorded(exporter):
+    with pytest.raises(ValueError):
+        with trace("event"):
+            with span("payload"):
+                raise ValueError("no payload")
+
+    assert [finished.error for finished in exporter.spans] == [
+        "ValueError('no payload')",
+        "ValueError('no payload')",
+    ]
+
+
+def test_span_outside_an_event_does_nothing(exporter):
+    with span("db.get_peer_mark") as opened:
+        assert opened is None
+
+    assert exporter.spans == []
+
+
+def test_concurrent_events_have_their_own_traces(exporter):
+    async def event(bpid: int) -> None:
+        with trace("event", bpid=bpid):
+            await asyncio.sleep(0.01)
+            with span("action.handle"):
+                await asyncio.sleep(0.01)
+
+    async def events() -> None:
+        await asyncio.gather(event(1), event(2))
+
+    asyncio.run(events())
+
+    roots = {
+        finished.tags["bpid"]: finished
+        for finished in exporter.spans
+        if finished.name == "event"
+    }
+    children = [finished for finished in exporter.spans if finished.name == "action.handle"]
+    assert len(roots) == len(children) == 2
+    for child in children:
+        assert child.parent_id == roots[child.tags["bpid"]].span_id
+        assert child.trace_id == roots[child.tags["bpid"]].trace_id
+
+
+def test_disabled_tracer_exports_nothing():
+    with trace("event") as root:
+        assert root is None
+
+
+def test_jsonl_export(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    exporter = JsonlExporter(str(path))
+    tracing.configure(exporter)
+    try:
+        with trace("event", bpid=1):
+            with span("dedup"):
+                pass
+    finally:
+        tracing.configure(tracing.NullExporter())
+        exporter.close()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["name"] for line in lines] == ["dedup", "event"]
+    assert lines[0]["parent_id"] == lines[1]["span_id"]
+    assert lines[0]["tags"] == {"bpid": 1}
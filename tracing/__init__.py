@@ -0,0 +1,26 @@
+"""Module "tracing".
+
+File:
+    __init__.py
+
+About:
+    Initializing the "tracing" module.
+"""
+
+from .tracer import configure, trace, span, tag
+from .exporters import (
+    NullExporter,
+    InMemoryExporter,
+    JsonlExporter,
+)
+
+
+__all__ = (
+    "configure",
+    "trace",
+    "span",
+    "tag",
+    "NullExporter",
+    "InMemoryExporter",
+    "JsonlExporter",
+)
@@ -0,0 +1,62 @@
+"""Module "tracing".
+
+File:
+    exporters.py
+
+About:
+    File describing span exporters.
+"""
+
+import json
+import threading
+from abc import ABC, abstractmethod
+from typing import List
+from .span import Span
+
+
+class BaseExporter(ABC):
+    """Base class of the finished span exporter."""
+
+    @abstractmethod
+    def export(self, span: Span) -> None:
+        """Exports a finished span.
+
+        Args:
+            span (Span): Finished span.
+        """
+
+
+class NullExporter(BaseExporter):
+    """Discards spans. Tracing is disabled with this exporter."""
+
+    def export(self, span: Span) -> None:
+        pass
+
+
+class InMemoryExporter(BaseExporter):
+    """Keeps finished spans in a list."""
+
+    def __init__(self) -> None:
+        self.spans: List[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+
+class JsonlExporter(BaseExporter):
+    """Appends finished spans to a JSON Lines file."""
+
+    def __init__(self, path: str) -> None:
+        self._lock = threading.Lock()
+        self._file = open(path, "a", buffering=1, encoding="utf-8")
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.as_dict(), ensure_ascii=False, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def close(self) -> None:
+        self._file.close()
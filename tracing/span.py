@@ -0,0 +1,59 @@
+"""Module "tracing".
+
+File:
+    span.py
+
+About:
+    File describing the trace span.
+"""
+
+import secrets
+import time
+from typing import Any, Dict, Optional
+
+
+class Span:
+    """Timed operation of the event handling."""
+
+    __slots__ = (
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "name",
+        "tags",
+        "start",
+        "duration",
+        "error",
+        "_started",
+    )
+
+    def __init__(self, name: str, parent: Optional["Span"], tags: Dict[str, Any]) -> None:
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(8)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.name = name
+        self.tags = {**parent.tags, **tags} if parent else tags
+        self.start = time.time()
+        self.duration = 0.0
+        self.error: Optional[str] = None
+        self._started = time.perf_counter()
+
+    def tag(self, **tags: Any) -> None:
+        """Adds tags to the span and to its future children."""
+
+        self.tags.update(tags)
+
+    def finish(self) -> None:
+        self.duration = time.perf_counter() - self._started
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "tags": self.tags,
+            "start": self.start,
+            "duration_ms": self.duration * 1e3,
+            "error": self.error,
+        }
@@ -0,0 +1,97 @@
+"""Module "tracing".
+
+File:
+    tracer.py
+
+About:
+    File describing the tracer: one root span
+    per event with child spans of its operations.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+from .span import Span
+from .exporters import BaseExporter, NullExporter
+
+
+_current: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """Creates spans and hands finished ones to the exporter."""
+
+    def __init__(self, exporter: BaseExporter) -> None:
+        self.exporter = exporter
+        self.enabled = not isinstance(exporter, NullExporter)
+
+    @contextmanager
+    def trace(self, name: str, **tags) -> Iterator[Optional[Span]]:
+        """Opens the root span of an event."""
+
+        if not self.enabled:
+            yield None
+            return
+
+        with self._open(name, None, tags) as span:
+            yield span
+
+    @contextmanager
+    def span(self, name: str, **tags) -> Iterator[Optional[Span]]:
+        """Opens a child span of the current span.
+        Does nothing outside of a traced event.
+        """
+
+        parent = _current.get()
+        if parent is None:
+            yield None
+            return
+
+        with self._open(name, parent, tags) as span:
+            yield span
+
+    @contextmanager
+    def _open(self, name: str, parent: Optional[Span], tags: dict) -> Iterator[Span]:
+        span = Span(name, parent, tags)
+        token = _current.set(span)
+        try:
+            yield span
+
+        except BaseException as error:
+            span.error = repr(error)
+            raise
+
+        finally:
+            _current.reset(token)
+            span.finish()
+            self.exporter.export(span)
+
+
+tracer = Tracer(NullExporter())
+
+
+def configure(exporter: BaseExporter) -> None:
+    """Sets the exporter of the service tracer.
+
+    Args:
+        exporter (BaseExporter): Span exporter.
+    """
+
+    global tracer
+    tracer = Tracer(exporter)
+
+
+def trace(name: str, **tags):
+    return tracer.trace(name, **tags)
+
+
+def span(name: str, **tags):
+    return tracer.span(name, **tags)
+
+
+def tag(**tags) -> None:
+    """Adds tags to the current span and to its future children."""
+
+    current = _current.get()
+    if current is not None:
+        current.tag(**tags)